@@ -1,224 +1,257 @@
+import argparse
 import pygame
 import math
 import random
-import colorsys
+import numpy as np
+from lissajous_colors import make_hue_palette, palette_colors, gradient_colors
+from lissajous_layout import Layout, SampleTrail
+from lissajous_ui import Slider, Button, WidgetPanel
+from lissajous_replay import InputSession, add_replay_arguments, SLIDER, BUTTON, RESIZE
+from lissajous_period import ClosedCurveTracker, dense_step
+
+# Command line: optional recording or headless replay of the input
+parser = argparse.ArgumentParser(description="Animated Lissajous figure")
+add_replay_arguments(parser)
+parser.add_argument("--tolerance", type=float, default=1e-9,
+                    help="relative tolerance for treating the frequency ratio as rational (default 1e-9, float noise only)")
+parser.add_argument("--max-denominator", type=int, default=50,
+                    help="largest denominator of a rational frequency ratio, 0 disables closed-curve detection")
+args = parser.parse_args()
+session = InputSession.from_args(args)
 
 # Initialize PyGame
 pygame.init()
 
 # Window size and colors
-width, height = 1000, 1000  # You can try different sizes
+width, height = 1000, 1000  # You can try different sizes, the window is also resizable
 black = (0, 0, 0)
 white = (255, 255, 255)
 
-screen = pygame.display.set_mode((width, height))
+screen = pygame.display.set_mode((width, height), pygame.RESIZABLE)
 pygame.display.set_caption("Animated Lissajous Figure: Frequencies and Color")
 
-# Layout calculations:
-drawing_area_height = int(height * 0.8)       # Drawing area occupies 80% of the window height
-control_area_height = height - drawing_area_height  # Control area occupies the bottom 20%
-slider_area_y = drawing_area_height           # Top of the control area
-
-slider_row_gap = int(0.05 * control_area_height)
-slider_margin_x = int(0.05 * width)
-slider_width = int(0.4 * width)
-slider_height = 20
-
-# Frequency sliders row (for X and Y frequencies)
-freq_slider_y = slider_area_y + slider_row_gap
-
-# Button row 1 (Reset and Randomize)
-button_width = int(0.12 * width)
-button_height = 30
-button_row1_y = freq_slider_y + slider_height + slider_row_gap
-gap = int(0.05 * width)
-row1_total_width = 2 * button_width + gap
-start_x_row1 = (width - row1_total_width) // 2
-reset_button_x = start_x_row1
-random_button_x = start_x_row1 + button_width + gap
-
-# Button row 2 (Color Cycle, Gradient, Reset Mode)
-button_row2_y = button_row1_y + button_height + slider_row_gap
-row2_total_width = 3 * button_width + 2 * gap
-start_x_row2 = (width - row2_total_width) // 2
-color_cycle_button_x = start_x_row2
-gradient_button_x = start_x_row2 + button_width + gap
-reset_mode_button_x = start_x_row2 + 2 * (button_width + gap)
-
-# Helper functions for color conversion and gradient calculation
-def hsv_to_rgb(h):
-    """Convert a hue value (0-1) with full saturation and brightness to an RGB tuple."""
-    r, g, b = colorsys.hsv_to_rgb(h % 1.0, 1, 1)
-    return (int(r * 255), int(g * 255), int(b * 255))
-
-def get_gradient_color(x, y):
-    """Compute a gradient color based on the dot's position."""
-    r = int(x / width * 255)
-    g = int(y / drawing_area_height * 255)
-    b = int(((x / width) + (y / drawing_area_height)) / 2 * 255)
-    return (r, g, b)
+# Layout calculations (recomputed only when the window is resized):
+# two button rows, (Reset, Randomize) and (Color Cycle, Gradient, Reset Mode)
+layout = Layout(width, height, button_rows=(2, 3))
+
+# Precomputed hue palette for the color cycle mode (one lookup per dot instead of colorsys)
+hue_palette = make_hue_palette(1024)
 
 # Global drawing mode: 0 = white, 1 = color cycle, 2 = gradient
 drawing_mode = 0
 hue = 0  # global hue for color cycle
-
-# Slider class
-class Slider:
-    def __init__(self, x, y, w, h, min_val, max_val, initial, label):
-        self.x = x
-        self.y = y
-        self.w = w
-        self.h = h
-        self.min_val = min_val
-        self.max_val = max_val
-        self.value = initial
-        self.label = label
-        self.handle_radius = h // 4  # 50% of previous size
-        self.handle_x = self.x + (self.value - self.min_val) / (self.max_val - self.min_val) * self.w
-        self.dragging = False
-
-    def draw(self, screen, font):
-        # Draw the slider line as a red bar 2 pixels high
-        line_y = self.y + self.h // 2 - 1
-        pygame.draw.rect(screen, (255, 0, 0), (self.x, line_y, self.w, 2))
-        # Draw the handle as a yellow circle
-        pygame.draw.circle(screen, (255, 255, 0), (int(self.handle_x), self.y + self.h // 2), self.handle_radius)
-        # Draw the label and current value
-        text = font.render(f"{self.label}: {self.value:.2f}", True, white)
-        screen.blit(text, (self.x, self.y - 25))
-
-    def update(self, mouse_x):
-        self.handle_x = max(self.x, min(mouse_x, self.x + self.w))
-        ratio = (self.handle_x - self.x) / self.w
-        self.value = self.min_val + ratio * (self.max_val - self.min_val)
-
-    def update_handle(self):
-        self.handle_x = self.x + (self.value - self.min_val) / (self.max_val - self.min_val) * self.w
-
-# Button class
-class Button:
-    def __init__(self, x, y, w, h, text):
-        self.rect = pygame.Rect(x, y, w, h)
-        self.text = text
-
-    def draw(self, screen, font):
-        pygame.draw.rect(screen, (180, 180, 180), self.rect)
-        text_surf = font.render(self.text, True, black)
-        text_rect = text_surf.get_rect(center=self.rect.center)
-        screen.blit(text_surf, text_rect)
-
-    def is_clicked(self, pos):
-        return self.rect.collidepoint(pos)
+hue_step = 0.001  # slower hue cycle
 
 # Font for labels and buttons
 font = pygame.font.SysFont(None, 24)
 
-# Frequency sliders with starting values: X = 2.7, Y = 3.3; range [0.1, 9]
-slider_freq_x = Slider(slider_margin_x, freq_slider_y, slider_width, slider_height, 0.1, 9, 2.7, "Frequency X")
-slider_freq_y = Slider(slider_margin_x * 2 + slider_width, freq_slider_y, slider_width, slider_height, 0.1, 9, 3.3, "Frequency Y")
-sliders = [slider_freq_x, slider_freq_y]
+# The panel owns all controls of the bottom area, routes mouse events to them
+# and redraws only the widgets whose state changed
+def control_area_rect():
+    return (0, layout.slider_area_y, layout.width, layout.control_area_height)
 
-# Instantiate buttons
-reset_button = Button(reset_button_x, button_row1_y, button_width, button_height, "Reset")
-random_button = Button(random_button_x, button_row1_y, button_width, button_height, "Randomize")
-color_cycle_button = Button(color_cycle_button_x, button_row2_y, button_width, button_height, "Color Cycle")
-gradient_button = Button(gradient_button_x, button_row2_y, button_width, button_height, "Gradient")
-reset_mode_button = Button(reset_mode_button_x, button_row2_y, button_width, button_height, "Reset Mode")
+panel = WidgetPanel(font, control_area_rect(), background=black)
 
-# Fixed amplitudes (as in the original code)
-amplitude_x = width // 3
-amplitude_y = drawing_area_height // 3
+# Frequency sliders with starting values: X = 2.7, Y = 3.3; range [0.1, 9]
+slider_freq_x = Slider(layout.freq_slider_x[0], layout.freq_slider_y, layout.slider_width, layout.slider_height, 0.1, 9, 2.7, "Frequency X")
+slider_freq_y = Slider(layout.freq_slider_x[1], layout.freq_slider_y, layout.slider_width, layout.slider_height, 0.1, 9, 3.3, "Frequency Y")
+sliders = [slider_freq_x, slider_freq_y]
+panel.add(*sliders)
+
+# Instantiate buttons, one list per button row
+reset_button = Button(0, 0, 0, 0, "Reset")
+random_button = Button(0, 0, 0, 0, "Randomize")
+color_cycle_button = Button(0, 0, 0, 0, "Color Cycle")
+gradient_button = Button(0, 0, 0, 0, "Gradient")
+reset_mode_button = Button(0, 0, 0, 0, "Reset Mode")
+button_rows = [[reset_button, random_button], [color_cycle_button, gradient_button, reset_mode_button]]
+
+def place_buttons():
+    """Position every button according to the current layout."""
+    for row, row_y, row_x in zip(button_rows, layout.button_rows_y, layout.button_rows_x):
+        for button, x in zip(row, row_x):
+            button.move(x, row_y, layout.button_width, layout.button_height)
+
+place_buttons()
+for row in button_rows:
+    panel.add(*row)
+
+# Names used for the controls in input recordings
+controls = {
+    "freq_x": slider_freq_x, "freq_y": slider_freq_y,
+    "reset": reset_button, "randomize": random_button,
+    "color_cycle": color_cycle_button, "gradient": gradient_button, "reset_mode": reset_mode_button,
+}
+control_names = {widget: name for name, widget in controls.items()}
+
+# Keyboard automation: arrow keys nudge the frequencies, letters press buttons
+slider_keys = {
+    pygame.K_LEFT: ("freq_x", -0.05), pygame.K_RIGHT: ("freq_x", 0.05),
+    pygame.K_DOWN: ("freq_y", -0.05), pygame.K_UP: ("freq_y", 0.05),
+}
+button_keys = {
+    pygame.K_r: "reset", pygame.K_SPACE: "randomize",
+    pygame.K_c: "color_cycle", pygame.K_g: "gradient", pygame.K_w: "reset_mode",
+}
+
+def key_action(key):
+    """Translate a key press into an input action, or None."""
+    if key in slider_keys:
+        name, step = slider_keys[key]
+        slider = controls[name]
+        return (SLIDER, name, max(slider.min_val, min(slider.value + step, slider.max_val)), 0.0)
+    if key in button_keys:
+        return (BUTTON, button_keys[key], 0.0, 0.0)
+    return None
+
+def press(button):
+    """Button actions."""
+    global drawing_mode, hue
+    if button is reset_button:
+        clear_canvas()
+    elif button is random_button:
+        slider_freq_x.set_value(random.uniform(slider_freq_x.min_val, slider_freq_x.max_val))
+        slider_freq_y.set_value(random.uniform(slider_freq_y.min_val, slider_freq_y.max_val))
+        clear_canvas()
+    elif button is color_cycle_button:
+        drawing_mode = 1
+        hue = 0
+        clear_canvas()
+    elif button is gradient_button:
+        drawing_mode = 2
+        clear_canvas()
+    elif button is reset_mode_button:
+        drawing_mode = 0
+        clear_canvas()
 
 # Constant phase shift (set to 2)
 phase_shift = 2
 
-# Time variable and clock
+# Time variable, time step per dot and number of dots drawn per frame
 t = 0
+t_step = 0.02
+samples_per_frame = 1  # raise this to trace the figure faster
 clock = pygame.time.Clock()
 
-# Create a surface as a canvas for the Lissajous points
-canvas = pygame.Surface((width, drawing_area_height))
-canvas.fill(black)
+# Once a rational figure has been drawn for a whole period it only repeats
+# itself, so plotting stops and just an animated cursor follows the curve.
+# That single period is drawn with dots at most a pixel apart.
+period_tracker = ClosedCurveTracker(args.tolerance, args.max_denominator)
+cursor_color = (255, 0, 0)
 
+# Create a surface as a canvas for the Lissajous points, plus the retained
+# dots so the canvas can be re-rasterized when the window is resized
+canvas = pygame.Surface((layout.width, layout.drawing_area_height))
+canvas.fill(black)
+trail = SampleTrail()
+
+def draw_dot(surface, color, pos):
+    # Smaller dots: radius 1
+    pygame.draw.circle(surface, color, pos, 1)
+
+def clear_canvas():
+    canvas.fill(black)
+    trail.clear()
+    period_tracker.restart(t)
+
+def resize(new_width, new_height):
+    """Recompute the layout for a new window size and re-rasterize the canvas."""
+    global screen, layout, canvas
+    screen = pygame.display.set_mode((new_width, new_height), pygame.RESIZABLE)
+    layout = Layout(new_width, new_height, button_rows=(2, 3))
+    for slider, x in zip(sliders, layout.freq_slider_x):
+        slider.move(x, layout.freq_slider_y, layout.slider_width)
+    place_buttons()
+    panel.relayout(control_area_rect())
+    canvas = pygame.Surface((layout.width, layout.drawing_area_height))
+    canvas.fill(black)
+    trail.rasterize(canvas, layout, draw_dot)
+
+frame = 0
 running = True
 while running:
+    live_actions = []
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
 
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            mouse_pos = pygame.mouse.get_pos()
-            # Check if any slider is clicked
-            for slider in sliders:
-                if slider.x <= mouse_pos[0] <= slider.x + slider.w and slider.y <= mouse_pos[1] <= slider.y + slider.h:
-                    slider.dragging = True
-            # Button actions
-            if reset_button.is_clicked(mouse_pos):
-                canvas.fill(black)
-            if random_button.is_clicked(mouse_pos):
-                slider_freq_x.value = random.uniform(slider_freq_x.min_val, slider_freq_x.max_val)
-                slider_freq_y.value = random.uniform(slider_freq_y.min_val, slider_freq_y.max_val)
-                slider_freq_x.update_handle()
-                slider_freq_y.update_handle()
-                canvas.fill(black)
-            if color_cycle_button.is_clicked(mouse_pos):
-                drawing_mode = 1
-                hue = 0
-                canvas.fill(black)
-            if gradient_button.is_clicked(mouse_pos):
-                drawing_mode = 2
-                canvas.fill(black)
-            if reset_mode_button.is_clicked(mouse_pos):
-                drawing_mode = 0
-                canvas.fill(black)
-
-        elif event.type == pygame.MOUSEBUTTONUP:
-            for slider in sliders:
-                slider.dragging = False
-
-        elif event.type == pygame.MOUSEMOTION:
-            mouse_x, _ = event.pos
-            for slider in sliders:
-                if slider.dragging:
-                    slider.update(mouse_x)
-
-    # Get frequency parameters from sliders
+        elif session.replaying:
+            # A replay only applies the recorded actions
+            continue
+
+        elif event.type == pygame.VIDEORESIZE:
+            live_actions.append((RESIZE, "window", event.w, event.h))
+
+        elif event.type == pygame.KEYDOWN:
+            action = key_action(event.key)
+            if action is not None:
+                live_actions.append(action)
+
+        else:
+            widget = panel.handle_event(event)
+            if isinstance(widget, Slider):
+                live_actions.append((SLIDER, control_names[widget], widget.value, 0.0))
+            elif widget is not None:
+                live_actions.append((BUTTON, control_names[widget], 0.0, 0.0))
+
+    # Apply this frame's actions (recorded ones when replaying)
+    for kind, name, value, value_b in session.actions(frame, live_actions):
+        if kind == SLIDER:
+            controls[name].set_value(value)
+        elif kind == BUTTON:
+            press(controls[name])
+        elif kind == RESIZE:
+            resize(int(value), int(value_b))
+
+    # Get frequency parameters from sliders (freq_y snapped when the ratio is near-rational)
     freq_x = slider_freq_x.value
-    freq_y = slider_freq_y.value
-
-    # Compute new coordinates for the Lissajous figure
-    x = int(width / 2 + amplitude_x * math.sin(freq_x * t + phase_shift))
-    y = int(drawing_area_height / 2 + amplitude_y * math.cos(freq_y * t))
-    
-    # Determine the dot color based on the drawing mode
+    freq_y = period_tracker.update(freq_x, slider_freq_y.value, t)
+
+    # Compute a batch of new unit coordinates (-1..1) for the Lissajous figure:
+    # samples_per_frame dots of an open figure, or the dense dots of a closed
+    # one over the same stretch of t, up to the end of its period
+    dense = dense_step(freq_x, freq_y, layout.amplitude_x, layout.amplitude_y)
+    t_vals = period_tracker.sample_times(t, t_step * samples_per_frame, t_step, dense)
+    n = len(t_vals)
+    us = np.sin(freq_x * t_vals + phase_shift)
+    vs = np.cos(freq_y * t_vals)
+    xs, ys = layout.to_screen(us, vs)
+
+    # Determine the dot colors based on the drawing mode
     if drawing_mode == 0:
-        dot_color = white
+        dot_colors = np.broadcast_to(white, (n, 3))
     elif drawing_mode == 1:
-        dot_color = hsv_to_rgb(hue)
-        hue += 0.001  # slower hue cycle
+        dot_colors = palette_colors(hue_palette, hue + hue_step * np.arange(n))
+        hue += hue_step * n
     elif drawing_mode == 2:
-        dot_color = get_gradient_color(x, y)
-    
-    # Draw the point on the canvas (smaller dots: radius 1)
-    pygame.draw.circle(canvas, dot_color, (x, y), 1)
-    
+        dot_colors = gradient_colors(xs, ys, layout.width, layout.drawing_area_height)
+
+    # Draw the points on the canvas and remember them for re-rasterizing
+    for x, y, dot_color in zip(xs.tolist(), ys.tolist(), dot_colors.tolist()):
+        draw_dot(canvas, dot_color, (x, y))
+    if n:
+        trail.append(us, vs, dot_colors)
+
     # Increase the time variable
-    t += 0.02
-    
+    t += t_step * samples_per_frame
+
     # Blit the canvas onto the upper area of the screen
     screen.blit(canvas, (0, 0))
-    
-    # Redraw the control area (bottom)
-    pygame.draw.rect(screen, black, (0, slider_area_y, width, control_area_height))
-    for slider in sliders:
-        slider.draw(screen, font)
-    reset_button.draw(screen, font)
-    random_button.draw(screen, font)
-    color_cycle_button.draw(screen, font)
-    gradient_button.draw(screen, font)
-    reset_mode_button.draw(screen, font)
-    
-    pygame.display.flip()
-    clock.tick(120)
+    if period_tracker.closed(t):
+        cursor_x, cursor_y = layout.to_screen(math.sin(freq_x * t + phase_shift), math.cos(freq_y * t))
+        pygame.draw.circle(screen, cursor_color, (int(cursor_x), int(cursor_y)), 4)
+
+    # Redraw the controls that changed (bottom)
+    dirty_rects = panel.draw(screen)
+
+    # Only the canvas and the changed controls are sent to the display
+    pygame.display.update([(0, 0, layout.width, layout.drawing_area_height)] + dirty_rects)
+
+    frame += 1
+    if session.finished(frame):
+        running = False
+    elif not session.replaying:
+        clock.tick(120)  # Replays run as fast as possible
 
+session.close(frame)
 pygame.quit()
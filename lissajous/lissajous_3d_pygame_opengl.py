@@ -2,11 +2,34 @@
 # pip install PyOpenGL PyOpenGL_accelerate
 # 
 
+import argparse
 import pygame
 from pygame.locals import *
+from lissajous_gl_offscreen import FrameRecorder, add_offscreen_arguments, enable_headless
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="3D Lissajous sculpture (PyOpenGL)")
+    parser.add_argument("--uniform", action="store_true", help="sample the curve uniformly instead of adaptively")
+    parser.add_argument("--shader", action="store_true", help="evaluate the curve on the GPU in a vertex shader")
+    parser.add_argument("--gallery", type=int, default=0, metavar="N",
+                        help="draw a gallery of N curves with instanced rendering")
+    add_offscreen_arguments(parser)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    # Parsed before OpenGL.GL is imported, so that --headless can still select EGL
+    args = parse_arguments()
+    if args.headless:
+        enable_headless()
+
 from OpenGL.GL import *
 from OpenGL.GLU import *
 import math
+import numpy as np
+from lissajous_sampling import AdaptiveSampler, lissajous_points
+from lissajous_camera import Camera
+from lissajous_gl_shader import CurveShader
+from lissajous_gl_gallery import GLSL_VERSION, InstancedGallery, glsl_version, make_gallery
 
 # Window dimensions
 width, height = 1000, 800
@@ -18,22 +41,38 @@ def init_gl():
     glEnable(GL_POINT_SMOOTH)
     glPointSize(8.0)
 
-def draw_lissajous(t_offset):
-    # 3D Lissajous parameters
-    A, B, C = 200, 200, 200  # Amplitudes
-    freq_x, freq_y, freq_z = 3, 4, 5  # Frequencies (integers -> closed loop)
-    delta_x, delta_y, delta_z = 0, math.pi/2, math.pi/4  # Phase shifts
+# 3D Lissajous parameters
+A, B, C = 200, 200, 200  # Amplitudes
+freq_x, freq_y, freq_z = 3, 4, 5  # Frequencies (integers -> closed loop)
+delta_x, delta_y, delta_z = 0, math.pi/2, math.pi/4  # Phase shifts
+num_points = 800
 
-    num_points = 800
+def curve(ts):
+    return lissajous_points(ts, (A, B, C), (freq_x, freq_y, freq_z), (delta_x, delta_y, delta_z))
+
+def draw_lissajous(t_offset, sampler=None, project=None, shader=None):
+    # With a shader the curve is evaluated on the GPU, with a sampler the line
+    # strip is refined adaptively in screen space, otherwise the curve is
+    # sampled uniformly every 0.01
     glColor3f(1.0, 1.0, 1.0)
-    glBegin(GL_LINE_STRIP)
-    for i in range(num_points):
-        t = t_offset + i * 0.01
-        x = A * math.sin(freq_x * t + delta_x)
-        y = B * math.sin(freq_y * t + delta_y)
-        z = C * math.sin(freq_z * t + delta_z)
-        glVertex3f(x, y, z)
-    glEnd()
+    if shader is not None:
+        shader.draw(t_offset, (A, B, C), (freq_x, freq_y, freq_z), (delta_x, delta_y, delta_z))
+    elif sampler is None:
+        glBegin(GL_LINE_STRIP)
+        for i in range(num_points):
+            t = t_offset + i * 0.01
+            x = A * math.sin(freq_x * t + delta_x)
+            y = B * math.sin(freq_y * t + delta_y)
+            z = C * math.sin(freq_z * t + delta_z)
+            glVertex3f(x, y, z)
+        glEnd()
+    else:
+        ts, _ = sampler.sample(t_offset, t_offset + (num_points - 1) * 0.01, curve, project)
+        vertices = np.ascontiguousarray(curve(ts), dtype=np.float32)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, vertices)
+        glDrawArrays(GL_LINE_STRIP, 0, len(vertices))
+        glDisableClientState(GL_VERTEX_ARRAY)
 
     # Compute red ball position along the curve
     ball_index = int((t_offset * 100) % num_points)
@@ -51,16 +90,41 @@ def draw_lissajous(t_offset):
     gluDeleteQuadric(quadric)
     glPopMatrix()
 
-def main():
+def main(args):
     pygame.init()
     display = (width, height)
-    pygame.display.set_mode(display, DOUBLEBUF | OPENGL)
+    pygame.display.set_mode(display, DOUBLEBUF | OPENGL | RESIZABLE)
     pygame.display.set_caption("3D Lissajous Sculpture (PyOpenGL with Zoom)")
+
+    gallery_mode = args.gallery > 0
+    if gallery_mode and not InstancedGallery.supported():
+        major, minor = glsl_version()
+        print(f"--gallery needs GLSL {GLSL_VERSION[0]}.{GLSL_VERSION[1]}, this driver offers {major}.{minor:02d}; "
+              f"drawing the single curve instead")
+        gallery_mode = False
+    sampler = None if args.uniform or args.shader or gallery_mode else AdaptiveSampler(tolerance=0.5, max_vertices=4 * num_points)
     
-    # Set up perspective once (we'll reload each frame)
-    gluPerspective(45, (display[0] / display[1]), 0.1, 2000.0)
+    # Zoom variable controls camera distance (initially -600)
+    zoom = -600.0
+    far = 2000.0
+    if gallery_mode:
+        instances = make_gallery(args.gallery)
+        # Start far enough back to see the whole grid of sculptures
+        extent = np.abs(instances[:, 6:9]).max() + A
+        zoom = -3.0 * extent
+        far = 6.0 * extent
+
+    # Set up perspective once; it is only recomputed when the window is resized
+    camera = Camera(fovy=45, near=0.1, far=far)
+    camera.resize(*display)
 
     init_gl()
+    # The shaders need the GL context, so they are created after set_mode
+    shader = CurveShader(num_points, 0.01) if args.shader else None
+    gallery = InstancedGallery(instances, num_points, 0.01, (A, B, C)) if gallery_mode else None
+    frames = visible_total = draw_calls_total = 0
+    # Optional offscreen rendering of every frame to image files or an encoder
+    recorder = FrameRecorder.from_args(args, *display)
     
     clock = pygame.time.Clock()
     t_offset = 0.0
@@ -70,9 +134,6 @@ def main():
     vel_x, vel_y = 0.0, 0.0
     dragging = False
     last_mouse_x, last_mouse_y = 0, 0
-    
-    # Zoom variable controls camera distance (initially -600)
-    zoom = -600.0
 
     running = True
     while running:
@@ -80,6 +141,12 @@ def main():
             if event.type == QUIT:
                 running = False
 
+            elif event.type == VIDEORESIZE:
+                # While recording the frames keep the recorder's size and aspect;
+                # the window only shows them scaled
+                if recorder is None:
+                    camera.resize(event.w, event.h)
+
             elif event.type == MOUSEBUTTONDOWN:
                 if event.button == 1:  # Left click starts dragging
                     dragging = True
@@ -111,25 +178,41 @@ def main():
             vel_x *= friction
             vel_y *= friction
 
-        # Each frame, reset the modelview matrix to apply zoom and rotation
+        # Each frame, upload one model-view matrix with zoom and rotation
+        if recorder is not None:
+            recorder.begin()
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-        glLoadIdentity()
-        # Reload perspective projection
-        gluPerspective(45, (display[0] / display[1]), 0.1, 2000.0)
-        # Apply zoom translation
-        glTranslatef(0.0, 0.0, zoom)
-
-        glPushMatrix()
-        glRotatef(rot_x, 1, 0, 0)
-        glRotatef(rot_y, 0, 1, 0)
-        draw_lissajous(t_offset)
-        glPopMatrix()
-        
+        model_view = camera.view(zoom) @ camera.model(rot_x, rot_y)
+        if gallery is not None:
+            # One instanced draw call for every visible sculpture
+            gallery.draw(t_offset, camera.projection @ model_view)
+            frames += 1
+            visible_total += gallery.visible
+            draw_calls_total += gallery.draw_calls
+        else:
+            camera.load(model_view)
+            draw_lissajous(t_offset, sampler, camera.projector(model_view), shader)
+
+        if recorder is not None:
+            recorder.end()
+            if recorder.done():
+                running = False
         pygame.display.flip()
-        clock.tick(60)
+        if recorder is None:
+            clock.tick(60)  # Recording renders as fast as possible
         t_offset += 0.005
 
+    if recorder is not None:
+        recorder.close()
+    if sampler is not None:
+        print(sampler.stats.report())
+    if shader is not None:
+        shader.delete()
+    if gallery is not None:
+        print(f"gallery: {len(instances)} curves, {visible_total / max(frames, 1):.0f} visible and "
+              f"{draw_calls_total / max(frames, 1):.1f} draw calls per frame on average")
+        gallery.delete()
     pygame.quit()
 
 if __name__ == "__main__":
-    main()
+    main(args)
@@ -1,9 +1,38 @@
+import argparse
 import pygame
 from pygame.locals import *
+from lissajous_gl_offscreen import FrameRecorder, add_offscreen_arguments, enable_headless
+
+parser = argparse.ArgumentParser(description="3D Lissajous sculpture with burning particle effects")
+parser.add_argument("--uniform", action="store_true", help="sample the curve uniformly instead of adaptively")
+parser.add_argument("--blend", default="unsorted",
+                    help="particle blending: unsorted (spawn order), sorted back to front, or additive (B cycles at runtime)")
+parser.add_argument("--emitters", default="0:300", metavar="SPEC",
+                    help="comma-separated emitters as curve phase[:particles per second], e.g. 0:300,2.1:150,4.2:150")
+parser.add_argument("--gravity", type=float, default=20.0, help="downward acceleration of the embers")
+parser.add_argument("--drag", type=float, default=0.8, help="linear drag coefficient (1/s)")
+parser.add_argument("--buoyancy", type=float, default=60.0, help="upward acceleration of fresh embers, fading as they cool")
+parser.add_argument("--turbulence", type=float, default=40.0, help="strength of the curl-noise turbulence (0 = off)")
+parser.add_argument("--bounce", action="store_true", help="let the embers bounce off the curve")
+parser.add_argument("--glow", action="store_true", help="light up the embers close to the curve")
+add_offscreen_arguments(parser)
+args = parser.parse_args()
+# Before OpenGL.GL is imported, so that --headless can still select EGL
+if args.headless:
+    enable_headless()
+
 from OpenGL.GL import *
 from OpenGL.GLU import *
 import math
-import random
+import numpy as np
+from lissajous_sampling import AdaptiveSampler, lissajous_points
+from lissajous_camera import Camera, transform_points
+from lissajous_forces import ForceField
+from lissajous_spatial import CurveProximity
+from lissajous_particles import BLEND_MODES, EmitterGroup, ParticlePool, ParticleRenderer, parse_emitters
+
+if args.blend not in BLEND_MODES:
+    parser.error(f"argument --blend: invalid choice: {args.blend!r} (choose from {', '.join(BLEND_MODES)})")
 
 # ---------------------------
 # OpenGL & Pygame Setup
@@ -11,21 +40,26 @@ import random
 width, height = 1000, 800
 pygame.init()
 display = (width, height)
-pygame.display.set_mode(display, DOUBLEBUF | OPENGL)
+pygame.display.set_mode(display, DOUBLEBUF | OPENGL | RESIZABLE)
 pygame.display.set_caption("3D Lissajous Sculpture with Burning Particle Effects")
 
 # Enable blending for particles (smooth alpha fade)
 glEnable(GL_BLEND)
 glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
 
-gluPerspective(45, (display[0] / display[1]), 0.1, 2000.0)
-glTranslatef(0.0, 0.0, -600)
+# Projection is computed once (and again only on resize); the camera sits 600 units back
+camera = Camera(fovy=45, near=0.1, far=2000.0)
+camera.resize(*display)
+view = camera.view(-600)
 glClearColor(0.0, 0.0, 0.0, 1.0)
 glEnable(GL_DEPTH_TEST)
 glShadeModel(GL_SMOOTH)
 
 clock = pygame.time.Clock()
 
+# Optional offscreen rendering of every frame to image files or an encoder
+recorder = FrameRecorder.from_args(args, *display)
+
 # ---------------------------
 # Global Variables for Interactive Rotation
 # ---------------------------
@@ -48,101 +82,69 @@ t_offset = 0.0
 dt = 0.01
 num_points = 800
 
+# Adaptive sampling of the line strip in screen space (see lissajous_sampling)
+sampler = None if args.uniform else AdaptiveSampler(tolerance=0.5, max_vertices=4 * num_points)
+
 # ---------------------------
 # Particle System Setup
 # ---------------------------
-# Each particle is a dict with position, velocity, age, and lifetime.
-particles = []  
-particle_spawn_rate = 5  # spawn 5 particles per frame
+# Particles live in a preallocated NumPy pool (see lissajous_particles)
+pool = ParticlePool()
+renderer = ParticleRenderer(args.blend)
 particle_lifetime = 1.5  # seconds
-
-def update_particles(dt):
-    global particles
-    # Update each particle
-    new_particles = []
-    for p in particles:
-        p['age'] += dt
-        if p['age'] < p['lifetime']:
-            # Update position
-            p['pos'][0] += p['vel'][0] * dt
-            p['pos'][1] += p['vel'][1] * dt
-            p['pos'][2] += p['vel'][2] * dt
-            new_particles.append(p)
-    particles = new_particles
-
-def draw_particles():
-    glPointSize(6.0)
-    glBegin(GL_POINTS)
-    for p in particles:
-        # Compute alpha (fades from 1 to 0 over lifetime)
-        alpha = max(0.0, 1 - (p['age'] / p['lifetime']))
-        # We'll use an orange color for embers.
-        glColor4f(1.0, 0.5, 0.0, alpha)
-        glVertex3f(p['pos'][0], p['pos'][1], p['pos'][2])
-    glEnd()
-
-def spawn_particles(emitter_pos):
-    # Spawn a few particles at the emitter (red ball) position with small random velocities.
-    for _ in range(particle_spawn_rate):
-        particle = {
-            'pos': [emitter_pos[0], emitter_pos[1], emitter_pos[2]],
-            'vel': [random.uniform(-20, 20), random.uniform(10, 40), random.uniform(-20, 20)],
-            'age': 0.0,
-            'lifetime': particle_lifetime
-        }
-        particles.append(particle)
-
-# ---------------------------
-# Utility: 3D Rotation Functions
-# ---------------------------
-def rotateY(x, y, z, angle):
-    cosA = math.cos(angle)
-    sinA = math.sin(angle)
-    x_new = x * cosA + z * sinA
-    z_new = -x * sinA + z * cosA
-    return x_new, y, z_new
-
-def rotateX(x, y, z, angle):
-    cosA = math.cos(angle)
-    sinA = math.sin(angle)
-    y_new = y * cosA - z * sinA
-    z_new = y * sinA + z * cosA
-    return x, y_new, z_new
+# Emitters sit at curve parameters relative to the red ball (phase 0 is the ball itself)
+emitters = EmitterGroup(pool, parse_emitters(args.emitters, particle_lifetime))
+# Gravity, drag, buoyancy and curl-noise turbulence (see lissajous_forces)
+forces = ForceField((0.0, -args.gravity, 0.0), args.drag, args.buoyancy, args.turbulence)
 
 # ---------------------------
 # Utility: Compute Red Ball Position on Lissajous Curve
 # ---------------------------
-def get_red_ball_position(t_offset, rot_x, rot_y):
-    # Compute red ball position using same parameters as the curve.
+def get_red_ball_t(t_offset):
+    # Curve parameter of the red ball
     ball_index = int((t_offset * 100) % num_points)
-    t = t_offset + ball_index * 0.01
+    return t_offset + ball_index * 0.01
+
+def get_red_ball_position(t_offset):
+    # Compute red ball position (in model space) using same parameters as the curve.
+    # The rotation is applied by the model-view matrix only.
+    t = get_red_ball_t(t_offset)
     x = A * math.sin(freq_x * t + delta_x)
     y = B * math.sin(freq_y * t + delta_y)
     z = C * math.sin(freq_z * t + delta_z)
-    # Apply interactive rotations
-    x, y, z = rotateY(x, y, z, rot_y)
-    x, y, z = rotateX(x, y, z, rot_x)
     return (x, y, z)
 
 # ---------------------------
 # Draw the 3D Lissajous Curve and Red Ball
 # ---------------------------
-def draw_lissajous(t_offset, rot_x, rot_y):
+def curve(ts):
+    return lissajous_points(ts, (A, B, C), (freq_x, freq_y, freq_z), (delta_x, delta_y, delta_z))
+
+# Spatial index of the curve for bounce and glow; integer frequencies close after 2*pi
+proximity = CurveProximity(curve, 2 * math.pi, bounce=args.bounce) if args.bounce or args.glow else None
+
+def draw_lissajous(t_offset, project):
+    # Vertices are in model space, the current model-view matrix rotates them
     glColor3f(1.0, 1.0, 1.0)
-    glBegin(GL_LINE_STRIP)
-    for i in range(num_points):
-        t = t_offset + i * dt
-        x = A * math.sin(freq_x * t + delta_x)
-        y = B * math.sin(freq_y * t + delta_y)
-        z = C * math.sin(freq_z * t + delta_z)
-        # Apply rotation
-        x, y, z = rotateY(x, y, z, rot_y)
-        x, y, z = rotateX(x, y, z, rot_x)
-        glVertex3f(x, y, z)
-    glEnd()
+    if sampler is None:
+        glBegin(GL_LINE_STRIP)
+        for i in range(num_points):
+            t = t_offset + i * dt
+            x = A * math.sin(freq_x * t + delta_x)
+            y = B * math.sin(freq_y * t + delta_y)
+            z = C * math.sin(freq_z * t + delta_z)
+            glVertex3f(x, y, z)
+        glEnd()
+    else:
+        ts, _ = sampler.sample(t_offset, t_offset + (num_points - 1) * dt, curve, project)
+        vertices = np.ascontiguousarray(curve(ts), dtype=np.float32)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, vertices)
+        glDrawArrays(GL_LINE_STRIP, 0, len(vertices))
+        glDisableClientState(GL_VERTEX_ARRAY)
     
     # Draw red ball
-    ball_pos = get_red_ball_position(t_offset, rot_x, rot_y)
+    ball_pos = get_red_ball_position(t_offset)
     glColor3f(1.0, 0.0, 0.0)
     glPushMatrix()
     glTranslatef(ball_pos[0], ball_pos[1], ball_pos[2])
@@ -158,12 +160,24 @@ def draw_lissajous(t_offset, rot_x, rot_y):
 # ---------------------------
 running = True
 while running:
-    dt_sec = clock.tick(60) / 1000.0  # seconds elapsed since last frame
+    if recorder is None:
+        dt_sec = clock.tick(60) / 1000.0  # seconds elapsed since last frame
+    else:
+        dt_sec = 1.0 / args.fps  # Recorded animations advance by a fixed step
     
     for event in pygame.event.get():
         if event.type == QUIT:
             running = False
 
+        elif event.type == VIDEORESIZE:
+            # While recording the frames keep the recorder's size and aspect;
+            # the window only shows them scaled
+            if recorder is None:
+                camera.resize(event.w, event.h)
+
+        elif event.type == KEYDOWN and event.key == K_b:
+            print("particle blending:", renderer.next_mode())
+
         elif event.type == MOUSEBUTTONDOWN:
             if event.button == 1:  # left click
                 dragging = True
@@ -191,28 +205,47 @@ while running:
         vel_x *= friction
         vel_y *= friction
 
+    if recorder is not None:
+        recorder.begin()
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-    glLoadIdentity()
-    # Maintain camera setup
-    gluPerspective(45, (display[0] / display[1]), 0.1, 2000.0)
-    glTranslatef(0.0, 0.0, -600)
 
-    glPushMatrix()
-    glRotatef(rot_x, 1, 0, 0)
-    glRotatef(rot_y, 0, 1, 0)
-    
-    # Draw the Lissajous curve and red ball; get red ball position
-    red_ball_pos = draw_lissajous(t_offset, rot_x, rot_y)
-    
-    # Spawn particles at the red ball position
-    spawn_particles(red_ball_pos)
+    # One model-view matrix per frame: camera translation and sculpture rotation
+    model = camera.model(rot_x, rot_y)
+    model_view = view @ model
+    camera.load(model_view)
+
+    # Draw the Lissajous curve and red ball
+    draw_lissajous(t_offset, camera.projector(model_view))
+
+    # Particles live in world space: they are spawned at the rotated emitter
+    # positions once and then drawn with the camera view only (no second rotation)
+    emitter_positions = curve(get_red_ball_t(t_offset) + emitters.phases)
+    emitters.emit(transform_points(model, emitter_positions), dt_sec)
+    camera.load(view)
     # Update and draw particles
-    update_particles(dt_sec)
-    draw_particles()
-    
-    glPopMatrix()
-    
+    forces.apply(pool, dt_sec)
+    emitters.update(dt_sec)
+    glow = None
+    if proximity is not None:
+        # Only re-indexed when the curve changes; bounces take effect in the next step
+        proximity.rebuild((freq_x, freq_y, freq_z, delta_x, delta_y, delta_z))
+        glow = proximity.apply(pool, model)
+    renderer.draw(pool, view, glow if args.glow else None)
+
+    if recorder is not None:
+        recorder.end()
+        if recorder.done():
+            running = False
     pygame.display.flip()
     t_offset += 0.005
 
+if recorder is not None:
+    recorder.close()
+if sampler is not None:
+    print(sampler.stats.report())
+print(emitters.report())
+print(forces.report())
+if proximity is not None:
+    print(proximity.report())
+print(renderer.timings.report())
 pygame.quit()
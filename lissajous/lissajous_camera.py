@@ -0,0 +1,92 @@
+import math
+import numpy as np
+from OpenGL.GL import *
+
+# Camera and transform matrices for the OpenGL scenes.
+#
+# The projection is computed with NumPy and loaded once per window size, and
+# each frame builds a single model-view matrix and uploads it with one
+# glLoadMatrixf call, instead of rebuilding both through glLoadIdentity,
+# gluPerspective, glTranslatef and glRotatef. Matrices are row-major NumPy
+# arrays acting on column vectors, transposed on upload for OpenGL.
+
+
+def perspective(fovy, aspect, near, far):
+    """Same matrix as gluPerspective(fovy, aspect, near, far)."""
+    f = 1.0 / math.tan(math.radians(fovy) / 2)
+    return np.array([
+        [f / aspect, 0.0, 0.0, 0.0],
+        [0.0, f, 0.0, 0.0],
+        [0.0, 0.0, (far + near) / (near - far), 2 * far * near / (near - far)],
+        [0.0, 0.0, -1.0, 0.0],
+    ])
+
+
+def translate(x, y, z):
+    m = np.identity(4)
+    m[:3, 3] = (x, y, z)
+    return m
+
+
+def rotate_x(degrees):
+    """Same matrix as glRotatef(degrees, 1, 0, 0)."""
+    c, s = math.cos(math.radians(degrees)), math.sin(math.radians(degrees))
+    return np.array([[1.0, 0.0, 0.0, 0.0], [0.0, c, -s, 0.0], [0.0, s, c, 0.0], [0.0, 0.0, 0.0, 1.0]])
+
+
+def rotate_y(degrees):
+    """Same matrix as glRotatef(degrees, 0, 1, 0)."""
+    c, s = math.cos(math.radians(degrees)), math.sin(math.radians(degrees))
+    return np.array([[c, 0.0, s, 0.0], [0.0, 1.0, 0.0, 0.0], [-s, 0.0, c, 0.0], [0.0, 0.0, 0.0, 1.0]])
+
+
+def transform_points(matrix, points):
+    """Apply a 4x4 affine matrix to an (n, 3) array of points."""
+    return points @ matrix[:3, :3].T + matrix[:3, 3]
+
+
+class Camera:
+    def __init__(self, fovy=45, near=0.1, far=2000.0):
+        self.fovy = fovy
+        self.near = near
+        self.far = far
+        self.width = self.height = None
+        self.projection = None
+
+    def resize(self, width, height):
+        """Compute and load the projection for a new window size (call once per resize)."""
+        self.width, self.height = width, height
+        self.projection = perspective(self.fovy, width / height, self.near, self.far)
+        glViewport(0, 0, width, height)
+        glMatrixMode(GL_PROJECTION)
+        glLoadMatrixf(np.ascontiguousarray(self.projection.T, dtype=np.float32))
+        glMatrixMode(GL_MODELVIEW)
+
+    @staticmethod
+    def view(zoom):
+        """View matrix of a camera looking down -z with the scene moved `zoom` along z."""
+        return translate(0.0, 0.0, zoom)
+
+    @staticmethod
+    def model(rot_x, rot_y):
+        """Model rotation, same as glRotatef(rot_x, 1, 0, 0) followed by glRotatef(rot_y, 0, 1, 0)."""
+        return rotate_x(rot_x) @ rotate_y(rot_y)
+
+    @staticmethod
+    def load(model_view):
+        """Upload a model-view matrix (one call per frame instead of the fixed-function stack)."""
+        glLoadMatrixf(np.ascontiguousarray(model_view.T, dtype=np.float32))
+
+    def projector(self, model_view):
+        """Return a function mapping (n, 3) model points to (n, 2) pixel positions."""
+        mvp = self.projection @ model_view
+        width, height = self.width, self.height
+
+        def project(points):
+            clip = points @ mvp[:3, :3].T + mvp[:3, 3]
+            w = np.maximum(points @ mvp[3, :3] + mvp[3, 3], 1e-6)
+            sx = (clip[:, 0] / w + 1) * 0.5 * width
+            sy = (1 - clip[:, 1] / w) * 0.5 * height
+            return np.stack((sx, sy), axis=-1)
+
+        return project
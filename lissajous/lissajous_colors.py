@@ -0,0 +1,45 @@
+import numpy as np
+
+# Vectorized versions of the per-dot color helpers used by the Lissajous apps.
+# Every function takes whole arrays of samples and returns an (n, 3) uint8
+# array of RGB colors, so coloring a batch of dots is a single NumPy call.
+
+
+def hsv_to_rgb_array(h):
+    """Convert hue values (0-1) with full saturation and brightness to an (n, 3) RGB array.
+
+    Matches colorsys.hsv_to_rgb followed by int(c * 255) for every element.
+    """
+    h = np.asarray(h, dtype=np.float64) % 1.0
+    sector = np.floor(h * 6.0)
+    f = h * 6.0 - sector
+    sector = sector.astype(np.int64) % 6
+    one = np.ones_like(f)
+    zero = np.zeros_like(f)
+    q = 1.0 - f
+    # Same sector table as colorsys with s = v = 1 (so p = 0, q = 1 - f, t = f)
+    r = np.choose(sector, [one, q, zero, zero, f, one])
+    g = np.choose(sector, [f, one, one, q, zero, zero])
+    b = np.choose(sector, [zero, zero, f, one, one, q])
+    rgb = np.stack((r, g, b), axis=-1)
+    return (rgb * 255).astype(np.uint8)
+
+
+def gradient_colors(x, y, width, height):
+    """Compute the position gradient color for arrays of dot coordinates."""
+    fx = np.asarray(x, dtype=np.float64) / width
+    fy = np.asarray(y, dtype=np.float64) / height
+    rgb = np.stack((fx, fy, (fx + fy) / 2), axis=-1) * 255
+    return np.clip(rgb.astype(np.int64), 0, 255).astype(np.uint8)
+
+
+def make_hue_palette(size=1024):
+    """Precompute a lookup table of `size` fully saturated colors around the hue circle."""
+    return hsv_to_rgb_array(np.arange(size) / size)
+
+
+def palette_colors(palette, hues):
+    """Look up the colors for an array of hue values (0-1, wrapping) in a hue palette."""
+    size = len(palette)
+    index = (np.asarray(hues, dtype=np.float64) % 1.0 * size).astype(np.int64) % size
+    return palette[index]
@@ -0,0 +1,103 @@
+import time
+import numpy as np
+
+# Forces acting on the particle pool of lissajous_particles.
+#
+# Every step the accelerations of all live particles are summed as arrays:
+# gravity, linear drag, buoyancy (hot embers rise, less so as they cool down
+# over their lifetime) and turbulence from a curl-noise field. The curl noise
+# is precomputed once on a periodic 3D grid and sampled with vectorized
+# trilinear interpolation, so its cost per particle is eight gathers whatever
+# the noise looks like. The curl of a vector field is divergence free, which
+# makes the embers swirl instead of bunching up or spreading out.
+#
+# To bound the cost at high particle counts, at most `max_noise_samples`
+# particles sample the noise per step: the pool is split into k interleaved
+# slices, one slice per step, and each sampled particle receives k times the
+# impulse, so the average force stays the same.
+
+
+def curl_noise_grid(resolution=32, smoothness=4.0, seed=0):
+    """Divergence-free noise on a periodic grid; returns a (res, res, res, 3) float32 array with unit RMS.
+
+    A random vector potential is low-pass filtered and its curl is taken, both
+    in the frequency domain. `smoothness` is the filter width in cells.
+    """
+    rng = np.random.default_rng(seed)
+    potential = rng.standard_normal((3, resolution, resolution, resolution))
+    k = 2 * np.pi * np.fft.fftfreq(resolution)
+    kx, ky, kz = np.meshgrid(k, k, k, indexing="ij")
+    spectrum = np.fft.fftn(potential, axes=(1, 2, 3)) * np.exp(-0.5 * (kx ** 2 + ky ** 2 + kz ** 2) * smoothness ** 2)
+    ax, ay, az = spectrum
+    curl = np.stack([1j * (ky * az - kz * ay), 1j * (kz * ax - kx * az), 1j * (kx * ay - ky * ax)])
+    field = np.fft.ifftn(curl, axes=(1, 2, 3)).real
+    field /= np.sqrt(np.mean(np.sum(field ** 2, axis=0)))
+    return np.ascontiguousarray(np.moveaxis(field, 0, -1), dtype=np.float32)
+
+
+class CurlNoiseField:
+    def __init__(self, resolution=32, cell_size=16.0, smoothness=4.0, seed=0):
+        self.resolution = resolution
+        self.cell_size = cell_size
+        # One extra wrapped layer on each axis, so the upper corners of a cell
+        # never need a modulo; one flat array per component for np.take
+        grid = np.pad(curl_noise_grid(resolution, smoothness, seed), ((0, 1), (0, 1), (0, 1), (0, 0)), mode="wrap")
+        self.components = [np.ascontiguousarray(grid[..., c]).ravel() for c in range(3)]
+        side = resolution + 1
+        self.corners = [dx * side * side + dy * side + dz for dx in (0, 1) for dy in (0, 1) for dz in (0, 1)]
+
+    def sample(self, positions):
+        """Trilinearly interpolated field vectors at (n, 3) positions (the grid repeats in space)."""
+        side = self.resolution + 1
+        u = positions * np.float32(1.0 / self.cell_size)
+        base = np.floor(u)
+        fx, fy, fz = (u - base).T
+        gx, gy, gz = 1 - fx, 1 - fy, 1 - fz
+        cell = base.astype(np.int32) % self.resolution
+        index = (cell[:, 0] * side + cell[:, 1]) * side + cell[:, 2]
+        weights = [gx * gy * gz, gx * gy * fz, gx * fy * gz, gx * fy * fz,
+                   fx * gy * gz, fx * gy * fz, fx * fy * gz, fx * fy * fz]
+        result = np.zeros((3, len(positions)), dtype=np.float32)
+        for corner, weight in zip(self.corners, weights):
+            corner_index = index + corner
+            for c in range(3):
+                result[c] += self.components[c].take(corner_index) * weight
+        return result.T
+
+
+class ForceField:
+    def __init__(self, gravity=(0.0, -20.0, 0.0), drag=0.8, buoyancy=60.0, turbulence=40.0, noise=None,
+                 max_noise_samples=25000):
+        self.gravity = np.asarray(gravity, dtype=np.float32)
+        self.drag = drag              # 1/s, velocity lost per second relative to the current velocity
+        self.buoyancy = buoyancy      # Upward acceleration of a freshly spawned ember
+        self.turbulence = turbulence  # Acceleration scale of the curl noise
+        self.noise = noise if noise is not None or turbulence == 0 else CurlNoiseField()
+        self.max_noise_samples = max_noise_samples
+        self.steps = 0
+        self.seconds = 0.0
+        self.particles = 0
+
+    def apply(self, pool, dt):
+        """Add the forces of one time step of dt seconds to the velocities of the live particles."""
+        start = time.perf_counter()
+        n = pool.count
+        if n:
+            velocities = pool.velocities[:n]
+            acceleration = self.gravity - self.drag * velocities
+            if self.buoyancy:
+                heat = 1.0 - pool.ages[:n] / pool.lifetimes[:n]
+                acceleration[:, 1] += self.buoyancy * heat
+            if self.turbulence:
+                slices = -(-n // self.max_noise_samples)
+                sampled = slice(self.steps % slices, n, slices)
+                acceleration[sampled] += (slices * self.turbulence) * self.noise.sample(pool.positions[sampled])
+            velocities += acceleration * dt
+        self.steps += 1
+        self.particles += n
+        self.seconds += time.perf_counter() - start
+
+    def report(self):
+        steps = max(self.steps, 1)
+        return (f"forces: {self.particles / steps:.0f} particles, "
+                f"{1000 * self.seconds / steps:.3f} ms per step on average")
@@ -0,0 +1,166 @@
+import math
+import re
+import numpy as np
+from OpenGL.GL import *
+from OpenGL.GL.shaders import compileProgram, compileShader
+from lissajous_colors import hsv_to_rgb_array
+
+# Gallery of many Lissajous sculptures drawn with instancing.
+#
+# Every sculpture shares the same static buffer of t values (as in
+# lissajous_gl_shader); its frequencies, phases, position, scale and color are
+# per-instance attributes. Each frame the instances outside the view frustum
+# are culled on the CPU, the visible ones are copied into the instance buffer
+# and the whole gallery is drawn with a single glDrawArraysInstanced call.
+# The shaders need GLSL 3.30; check InstancedGallery.supported() before
+# creating a gallery, as the display is not created with a requested version.
+
+GLSL_VERSION = (3, 30)
+
+VERTEX_SHADER = """
+#version 330
+layout(location = 0) in float t_rel;
+layout(location = 1) in vec3 frequencies;
+layout(location = 2) in vec3 phases;
+layout(location = 3) in vec4 offset_scale;  // xyz = position, w = scale
+layout(location = 4) in vec3 instance_color;
+uniform mat4 model_view_projection;
+uniform float t_offset;
+uniform vec3 amplitudes;
+out vec3 color;
+
+void main() {
+    float t = t_offset + t_rel;
+    vec3 position = offset_scale.xyz + offset_scale.w * amplitudes * sin(frequencies * t + phases);
+    gl_Position = model_view_projection * vec4(position, 1.0);
+    color = instance_color;
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 330
+in vec3 color;
+out vec4 frag_color;
+
+void main() {
+    frag_color = vec4(color, 1.0);
+}
+"""
+
+# Per-instance record: frequencies (3), phases (3), offset + scale (4), color (3)
+INSTANCE_FLOATS = 13
+
+
+def make_gallery(count, spacing=500.0, seed=0):
+    """Random integer frequency triples and phases laid out on a cubic grid.
+
+    Returns an (count, INSTANCE_FLOATS) float32 array of instance attributes.
+    """
+    rng = np.random.default_rng(seed)
+    side = math.ceil(count ** (1 / 3))
+    index = np.arange(count)
+    grid = np.stack((index % side, (index // side) % side, index // (side * side)), axis=-1)
+    offsets = (grid - (side - 1) / 2) * spacing
+    instances = np.empty((count, INSTANCE_FLOATS), dtype=np.float32)
+    instances[:, 0:3] = rng.integers(1, 10, size=(count, 3))
+    instances[:, 3:6] = rng.uniform(0, 2 * math.pi, size=(count, 3))
+    instances[:, 6:9] = offsets
+    instances[:, 9] = 1.0
+    instances[:, 10:13] = hsv_to_rgb_array(rng.uniform(0, 1, count)) / 255.0
+    return instances
+
+
+def frustum_planes(mvp):
+    """The six clip planes (a, b, c, d) of a model-view-projection matrix, normalized."""
+    planes = np.array([mvp[3] + mvp[0], mvp[3] - mvp[0],
+                       mvp[3] + mvp[1], mvp[3] - mvp[1],
+                       mvp[3] + mvp[2], mvp[3] - mvp[2]])
+    return planes / np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+
+
+def glsl_version():
+    """(major, minor) of the current context's GLSL, e.g. (4, 60) for "4.60 NVIDIA"."""
+    match = re.search(r"(\d+)\.(\d+)", (glGetString(GL_SHADING_LANGUAGE_VERSION) or b"").decode(errors="replace"))
+    if match is None:
+        return (0, 0)
+    return int(match.group(1)), int(match.group(2).ljust(2, "0")[:2])
+
+
+class InstancedGallery:
+    @staticmethod
+    def supported():
+        """True when the current context can compile the gallery shaders."""
+        return glsl_version() >= GLSL_VERSION
+
+    def __init__(self, instances, num_points, dt, amplitudes=(200, 200, 200)):
+        self.program = compileProgram(compileShader(VERTEX_SHADER, GL_VERTEX_SHADER),
+                                      compileShader(FRAGMENT_SHADER, GL_FRAGMENT_SHADER))
+        self.instances = np.ascontiguousarray(instances, dtype=np.float32)
+        self.num_points = num_points
+        self.amplitudes = amplitudes
+        self.uniforms = {name: glGetUniformLocation(self.program, name)
+                         for name in ("model_view_projection", "t_offset", "amplitudes")}
+        # Bounding spheres for frustum culling
+        self.centers = self.instances[:, 6:9].astype(np.float64)
+        self.radii = self.instances[:, 9] * np.linalg.norm(amplitudes)
+        self.integer_frequencies = bool(np.all(self.instances[:, 0:3] == np.round(self.instances[:, 0:3])))
+        # Stats of the last frame
+        self.visible = 0
+        self.draw_calls = 0
+
+        self.vao = glGenVertexArrays(1)
+        glBindVertexArray(self.vao)
+        # Static t values shared by all instances
+        t_rel = (np.arange(num_points) * dt).astype(np.float32)
+        self.t_vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.t_vbo)
+        glBufferData(GL_ARRAY_BUFFER, t_rel.nbytes, t_rel, GL_STATIC_DRAW)
+        glEnableVertexAttribArray(0)
+        glVertexAttribPointer(0, 1, GL_FLOAT, GL_FALSE, 0, None)
+        # Instance attributes, rewritten with the visible instances every frame
+        self.instance_vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_vbo)
+        glBufferData(GL_ARRAY_BUFFER, self.instances.nbytes, None, GL_DYNAMIC_DRAW)
+        stride = INSTANCE_FLOATS * 4
+        for location, size, first in ((1, 3, 0), (2, 3, 3), (3, 4, 6), (4, 3, 10)):
+            glEnableVertexAttribArray(location)
+            glVertexAttribPointer(location, size, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(first * 4))
+            glVertexAttribDivisor(location, 1)
+        glBindVertexArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def cull(self, mvp):
+        """Indices of the instances whose bounding sphere touches the view frustum."""
+        planes = frustum_planes(mvp)
+        distances = self.centers @ planes[:, :3].T + planes[:, 3]
+        return np.nonzero(np.all(distances > -self.radii[:, None], axis=1))[0]
+
+    def draw(self, t_offset, mvp):
+        """Draw all visible sculptures; `mvp` is the row-major model-view-projection matrix."""
+        visible = self.cull(mvp)
+        self.visible = len(visible)
+        self.draw_calls = 0
+        if self.visible == 0:
+            return
+        if self.integer_frequencies:
+            # Closed loops repeat every 2*pi; keeping t small preserves float32 precision
+            t_offset = math.fmod(t_offset, 2 * math.pi)
+        data = np.ascontiguousarray(self.instances[visible])
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_vbo)
+        glBufferSubData(GL_ARRAY_BUFFER, 0, data.nbytes, data)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+        glUseProgram(self.program)
+        glUniformMatrix4fv(self.uniforms["model_view_projection"], 1, GL_TRUE, mvp.astype(np.float32))
+        glUniform1f(self.uniforms["t_offset"], t_offset)
+        glUniform3f(self.uniforms["amplitudes"], *self.amplitudes)
+        glBindVertexArray(self.vao)
+        glDrawArraysInstanced(GL_LINE_STRIP, 0, self.num_points, self.visible)
+        self.draw_calls += 1
+        glBindVertexArray(0)
+        glUseProgram(0)
+
+    def delete(self):
+        glDeleteBuffers(2, [self.t_vbo, self.instance_vbo])
+        glDeleteVertexArrays(1, [self.vao])
+        glDeleteProgram(self.program)
@@ -0,0 +1,181 @@
+import ctypes
+import os
+import shlex
+import subprocess
+import sys
+import numpy as np
+import pygame
+
+# Offscreen rendering and frame dumping for the OpenGL scenes.
+#
+# A FrameRecorder renders each frame into a framebuffer object (color and depth
+# renderbuffers) instead of the window, so the output size does not depend on a
+# visible window and the scenes also run on GPU-less servers through SDL's
+# offscreen driver and Mesa's EGL. Frames are read back asynchronously into two
+# pixel buffer objects in turn: the glReadPixels of frame n only queues a copy,
+# and its pixels are mapped one frame later while the GPU works on frame n + 1.
+# The frames go to numbered PPM/PNG files or to the stdin of an encoder process.
+#
+# PyOpenGL chooses its platform (GLX, EGL, ...) when OpenGL.GL is first
+# imported, so this module only imports it inside the recorder, and a
+# headless app calls enable_headless() after parsing its arguments and
+# before importing OpenGL.GL and initializing pygame.
+
+
+def add_offscreen_arguments(parser):
+    """Add the --output/--pipe/--frames/--headless options to an argparse parser."""
+    parser.add_argument("--output", metavar="PATTERN",
+                        help="write every frame to numbered image files, e.g. frames/lissajous_%%05d.png (.ppm or .png)")
+    parser.add_argument("--pipe", metavar="COMMAND",
+                        help="pipe raw RGB frames to COMMAND; {width}, {height} and {fps} are filled in, e.g. "
+                             "\"ffmpeg -y -f rawvideo -pix_fmt rgb24 -s {width}x{height} -r {fps} -i - out.mp4\"")
+    parser.add_argument("--frames", type=int, default=0, help="stop after this many frames (0 = run until closed)")
+    parser.add_argument("--fps", type=int, default=60, help="frame rate of the recorded animation")
+    parser.add_argument("--headless", action="store_true", help="render without a visible window (EGL)")
+
+
+def enable_headless():
+    """Switch SDL to its offscreen driver and PyOpenGL to EGL, for --headless."""
+    if "OpenGL.platform" in sys.modules:
+        raise RuntimeError("enable_headless() has to be called before OpenGL.GL is imported")
+    os.environ.setdefault("SDL_VIDEODRIVER", "offscreen")
+    os.environ.setdefault("PYOPENGL_PLATFORM", "egl")
+
+
+class ImageSequence:
+    """Writes frames to numbered .ppm or .png files."""
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.index = 0
+        directory = os.path.dirname(pattern)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def write(self, frame):
+        path = self.pattern % self.index
+        self.index += 1
+        if path.lower().endswith(".ppm"):
+            height, width = frame.shape[:2]
+            with open(path, "wb") as f:
+                f.write(b"P6\n%d %d\n255\n" % (width, height))
+                f.write(frame.tobytes())
+        else:
+            pygame.image.save(pygame.surfarray.make_surface(frame.swapaxes(0, 1)), path)
+
+    def close(self):
+        pass
+
+
+class EncoderPipe:
+    """Streams raw rgb24 frames to the stdin of an encoder process such as ffmpeg."""
+
+    def __init__(self, command, width, height, fps):
+        command = command.format(width=width, height=height, fps=fps)
+        self.process = subprocess.Popen(shlex.split(command), stdin=subprocess.PIPE)
+
+    def write(self, frame):
+        self.process.stdin.write(frame.tobytes())
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
+
+
+class FrameRecorder:
+    def __init__(self, width, height, sink, max_frames=0, show=True):
+        from OpenGL import GL as gl
+        self.width, self.height = width, height
+        self.sink = sink
+        self.max_frames = max_frames
+        self.show = show         # Copy every frame to the window as well
+        self.frames_queued = 0
+        self.frames_written = 0
+
+        # Framebuffer with color and depth renderbuffers
+        self.fbo = gl.glGenFramebuffers(1)
+        self.color, self.depth = gl.glGenRenderbuffers(2)
+        gl.glBindRenderbuffer(gl.GL_RENDERBUFFER, self.color)
+        gl.glRenderbufferStorage(gl.GL_RENDERBUFFER, gl.GL_RGBA8, width, height)
+        gl.glBindRenderbuffer(gl.GL_RENDERBUFFER, self.depth)
+        gl.glRenderbufferStorage(gl.GL_RENDERBUFFER, gl.GL_DEPTH_COMPONENT24, width, height)
+        gl.glBindRenderbuffer(gl.GL_RENDERBUFFER, 0)
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self.fbo)
+        gl.glFramebufferRenderbuffer(gl.GL_FRAMEBUFFER, gl.GL_COLOR_ATTACHMENT0, gl.GL_RENDERBUFFER, self.color)
+        gl.glFramebufferRenderbuffer(gl.GL_FRAMEBUFFER, gl.GL_DEPTH_ATTACHMENT, gl.GL_RENDERBUFFER, self.depth)
+        status = gl.glCheckFramebufferStatus(gl.GL_FRAMEBUFFER)
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, 0)
+        if status != gl.GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError(f"offscreen framebuffer is incomplete (status 0x{status:x})")
+
+        # Two pixel buffers used in turn for the asynchronous readback
+        self.frame_bytes = width * height * 3
+        self.pbos = list(gl.glGenBuffers(2))
+        for pbo in self.pbos:
+            gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, pbo)
+            gl.glBufferData(gl.GL_PIXEL_PACK_BUFFER, self.frame_bytes, None, gl.GL_STREAM_READ)
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, 0)
+
+    @classmethod
+    def from_args(cls, args, width, height):
+        """A recorder for the --output/--pipe options, or None when no frames are to be saved."""
+        if args.pipe:
+            sink = EncoderPipe(args.pipe, width, height, args.fps)
+        elif args.output:
+            sink = ImageSequence(args.output)
+        else:
+            return None
+        return cls(width, height, sink, args.frames, show=not args.headless)
+
+    def begin(self):
+        """Direct the drawing of the next frame into the framebuffer object."""
+        from OpenGL import GL as gl
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self.fbo)
+        gl.glViewport(0, 0, self.width, self.height)
+
+    def end(self):
+        """Queue the readback of the frame just drawn and save the previous one."""
+        from OpenGL import GL as gl
+        gl.glReadBuffer(gl.GL_COLOR_ATTACHMENT0)
+        gl.glPixelStorei(gl.GL_PACK_ALIGNMENT, 1)
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, self.pbos[self.frames_queued % 2])
+        gl.glReadPixels(0, 0, self.width, self.height, gl.GL_RGB, gl.GL_UNSIGNED_BYTE, ctypes.c_void_p(0))
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, 0)
+        self.frames_queued += 1
+        if self.frames_queued > 1:
+            self._write(self.pbos[self.frames_queued % 2])
+
+        if self.show:
+            gl.glBindFramebuffer(gl.GL_READ_FRAMEBUFFER, self.fbo)
+            gl.glBindFramebuffer(gl.GL_DRAW_FRAMEBUFFER, 0)
+            window_width, window_height = pygame.display.get_surface().get_size()
+            gl.glBlitFramebuffer(0, 0, self.width, self.height, 0, 0, window_width, window_height,
+                                 gl.GL_COLOR_BUFFER_BIT, gl.GL_LINEAR)
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, 0)
+
+    def done(self):
+        """True once the requested number of frames has been rendered."""
+        return 0 < self.max_frames <= self.frames_queued
+
+    def _write(self, pbo):
+        from OpenGL import GL as gl
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, pbo)
+        pointer = gl.glMapBuffer(gl.GL_PIXEL_PACK_BUFFER, gl.GL_READ_ONLY)
+        data = (ctypes.c_ubyte * self.frame_bytes).from_address(pointer)
+        # OpenGL rows start at the bottom of the image
+        frame = np.flipud(np.frombuffer(data, dtype=np.uint8).reshape(self.height, self.width, 3)).copy()
+        gl.glUnmapBuffer(gl.GL_PIXEL_PACK_BUFFER)
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, 0)
+        self.sink.write(frame)
+        self.frames_written += 1
+
+    def close(self):
+        """Save the last queued frame, close the output and free the GL objects."""
+        from OpenGL import GL as gl
+        if self.frames_queued > self.frames_written:
+            self._write(self.pbos[(self.frames_queued - 1) % 2])
+        self.sink.close()
+        gl.glDeleteBuffers(2, self.pbos)
+        gl.glDeleteRenderbuffers(2, [self.color, self.depth])
+        gl.glDeleteFramebuffers(1, [self.fbo])
+        print(f"offscreen: {self.frames_written} frames of {self.width}x{self.height} written")
@@ -0,0 +1,74 @@
+import math
+import numpy as np
+from OpenGL.GL import *
+from OpenGL.GL.shaders import compileProgram, compileShader
+
+# GPU-side evaluation of the 3D Lissajous curve.
+#
+# The t values of the line strip (relative to t_offset) are uploaded once into
+# a static vertex buffer and the vertex shader computes A * sin(freq * t + delta)
+# itself, so animating the curve only costs a few uniform updates per frame.
+# GLSL 1.20 reads gl_ModelViewProjectionMatrix, the fixed-function matrix
+# stack that lissajous_camera.Camera loads (resize() for the projection,
+# load() for the model-view), and also runs on Mesa llvmpipe.
+
+VERTEX_SHADER = """
+#version 120
+attribute float t_rel;
+uniform float t_offset;
+uniform vec3 amplitudes;
+uniform vec3 frequencies;
+uniform vec3 phases;
+
+void main() {
+    float t = t_offset + t_rel;
+    vec3 position = amplitudes * sin(frequencies * t + phases);
+    gl_Position = gl_ModelViewProjectionMatrix * vec4(position, 1.0);
+    gl_FrontColor = gl_Color;
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 120
+void main() {
+    gl_FragColor = gl_Color;
+}
+"""
+
+
+class CurveShader:
+    def __init__(self, num_points, dt):
+        self.program = compileProgram(compileShader(VERTEX_SHADER, GL_VERTEX_SHADER),
+                                      compileShader(FRAGMENT_SHADER, GL_FRAGMENT_SHADER))
+        self.num_points = num_points
+        self.t_rel_location = glGetAttribLocation(self.program, "t_rel")
+        self.uniforms = {name: glGetUniformLocation(self.program, name)
+                         for name in ("t_offset", "amplitudes", "frequencies", "phases")}
+        # Static buffer of t values, uploaded once
+        t_rel = (np.arange(num_points) * dt).astype(np.float32)
+        self.vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, t_rel.nbytes, t_rel, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def draw(self, t_offset, amplitudes, frequencies, phases):
+        """Draw the line strip for the given curve parameters with the current matrices and color."""
+        if all(float(f).is_integer() for f in frequencies):
+            # Integer frequencies repeat every 2*pi; keeping t small preserves float32 precision
+            t_offset = math.fmod(t_offset, 2 * math.pi)
+        glUseProgram(self.program)
+        glUniform1f(self.uniforms["t_offset"], t_offset)
+        glUniform3f(self.uniforms["amplitudes"], *amplitudes)
+        glUniform3f(self.uniforms["frequencies"], *frequencies)
+        glUniform3f(self.uniforms["phases"], *phases)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glEnableVertexAttribArray(self.t_rel_location)
+        glVertexAttribPointer(self.t_rel_location, 1, GL_FLOAT, GL_FALSE, 0, None)
+        glDrawArrays(GL_LINE_STRIP, 0, self.num_points)
+        glDisableVertexAttribArray(self.t_rel_location)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glUseProgram(0)
+
+    def delete(self):
+        glDeleteBuffers(1, [self.vbo])
+        glDeleteProgram(self.program)
@@ -1,52 +1,32 @@
+import argparse
 import pygame
 import math
 import numpy as np
+from lissajous_ui import Slider, WidgetPanel
+from lissajous_replay import InputSession, add_replay_arguments, SLIDER, ROTATE, DRAG, RESIZE
+from lissajous_sampling import AdaptiveSampler, lissajous_points, rotate_points
+from lissajous_picking import CurvePicker
+
+# Command line: optional recording or headless replay of the input
+parser = argparse.ArgumentParser(description="3D Lissajous sculpture")
+add_replay_arguments(parser)
+parser.add_argument("--uniform", action="store_true", help="sample the curve uniformly instead of adaptively")
+args = parser.parse_args()
+session = InputSession.from_args(args)
 
 pygame.init()
 
 # -------------------
 # Window & Layout Setup
 # -------------------
-width, height = 1000, 800
-screen = pygame.display.set_mode((width, height))
+width, height = 1000, 800  # The window is resizable, the layout follows its size
+screen = pygame.display.set_mode((width, height), pygame.RESIZABLE)
 pygame.display.set_caption("3D Lissajous Sculpture (Closed Loop)")
 
 # Define drawing and control areas
 drawing_area_height = int(height * 0.8)
 control_area_height = height - drawing_area_height
 
-# -------------------
-# Slider Class Definition
-# -------------------
-class Slider:
-    def __init__(self, x, y, w, h, min_val, max_val, initial, label):
-        self.x = x
-        self.y = y
-        self.w = w
-        self.h = h
-        self.min_val = min_val
-        self.max_val = max_val
-        self.value = initial  # We'll round this value when using it.
-        self.label = label
-        self.handle_radius = h // 4
-        self.handle_x = self.x + (self.value - self.min_val) / (self.max_val - self.min_val) * self.w
-        self.dragging = False
-
-    def draw(self, screen, font):
-        line_y = self.y + self.h // 2 - 1
-        pygame.draw.rect(screen, (255, 0, 0), (self.x, line_y, self.w, 2))
-        pygame.draw.circle(screen, (255, 255, 0), (int(self.handle_x), self.y + self.h // 2), self.handle_radius)
-        text = font.render(f"{self.label}: {self.value:.2f}", True, (255, 255, 255))
-        screen.blit(text, (self.x, self.y - 25))
-
-    def update(self, mouse_x):
-        self.handle_x = max(self.x, min(mouse_x, self.x + self.w))
-        ratio = (self.handle_x - self.x) / self.w
-        self.value = self.min_val + ratio * (self.max_val - self.min_val)
-
-    def update_handle(self):
-        self.handle_x = self.x + (self.value - self.min_val) / (self.max_val - self.min_val) * self.w
-
 # -------------------
 # Projection and Rotation Functions
 # -------------------
@@ -59,6 +39,11 @@ def project(x, y, z):
     proj_y = center_y - y * factor
     return int(proj_x), int(proj_y)
 
+def project_array(points):
+    # Vectorized project() for an (n, 3) array, keeping sub-pixel precision
+    factor = d / (points[:, 2] + d)
+    return np.stack((center_x + points[:, 0] * factor, center_y - points[:, 1] * factor), axis=-1)
+
 def rotateY(x, y, z, angle):
     cosA = math.cos(angle)
     sinA = math.sin(angle)
@@ -76,7 +61,8 @@ def rotateX(x, y, z, angle):
 # -------------------
 # 3D Lissajous Parameters
 # -------------------
-A, B, C = 200, 200, 200  # Amplitudes
+base_amplitude = 200  # Amplitude at the original 1000x800 window size
+A, B, C = base_amplitude, base_amplitude, base_amplitude  # Amplitudes
 # Fixed phase shifts
 delta_x, delta_y, delta_z = 0, math.pi/2, math.pi/4
 
@@ -88,8 +74,17 @@ rot_y = 0.0
 vel_x = 0.0
 vel_y = 0.0
 dragging_sculpture = False
+live_dragging = False  # Mouse state; dragging_sculpture follows it through the input actions
 mouse_last_x, mouse_last_y = 0, 0
 
+# -------------------
+# Picking: the curve sample under the mouse is highlighted, a click without
+# dragging prints its parameter t and 3D position
+# -------------------
+picker = CurvePicker(cell_size=16, max_distance=12)
+hover_pos = None
+press_pos = None
+
 # -------------------
 # Slider Setup (One Slider in the Control Area)
 # -------------------
@@ -103,6 +98,34 @@ slider_y = drawing_area_height + (control_area_height - slider_height) // 2
 # Slider range is from 1 to 9. The slider value is rounded to integer.
 base_freq_slider = Slider(left_margin, slider_y, slider_width, slider_height, 1, 9, 3, "Base Frequency")
 
+# The panel owns the control area and only redraws the slider when it changes
+control_background = (30, 30, 30)
+panel = WidgetPanel(font, (0, drawing_area_height, width, control_area_height), background=control_background)
+panel.add(base_freq_slider)
+
+def resize(new_width, new_height):
+    """Recompute the layout, projection and amplitudes for a new window size."""
+    global screen, width, height, drawing_area_height, control_area_height
+    global center_x, center_y, d, A, B, C
+    screen = pygame.display.set_mode((new_width, new_height), pygame.RESIZABLE)
+    width, height = new_width, new_height
+    drawing_area_height = int(height * 0.8)
+    control_area_height = height - drawing_area_height
+    center_x, center_y = width // 2, drawing_area_height // 2
+    # Scale the sculpture and the projection distance with the drawing area
+    scale = min(width / 1000, drawing_area_height / 640)
+    d = 500 * scale
+    A = B = C = base_amplitude * scale
+    slider_width = int(width * 0.5)
+    base_freq_slider.move((width - slider_width) // 2,
+                          drawing_area_height + (control_area_height - slider_height) // 2,
+                          slider_width)
+    panel.relayout((0, drawing_area_height, width, control_area_height))
+
+def curve_position(t):
+    """Position of the (unrotated) curve at parameter t."""
+    return lissajous_points([t], (A, B, C), (freq_x, freq_y, freq_z), (delta_x, delta_y, delta_z))[0]
+
 # -------------------
 # Animation Variables
 # -------------------
@@ -110,41 +133,81 @@ t_offset = 0.0
 num_points = 800
 dt = 0.01
 
+# Adaptive sampling spends vertices only where the projected curve bends,
+# at most max_vertices per frame and within half a pixel of the exact curve
+sampler = AdaptiveSampler(tolerance=0.5, max_vertices=4 * num_points)
+
 clock = pygame.time.Clock()
 
+# Keyboard automation: left/right arrows step the base frequency
+frequency_keys = {pygame.K_LEFT: -1, pygame.K_RIGHT: 1}
+
+frame = 0
 running = True
 while running:
+    live_actions = []
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
 
+        if session.replaying:
+            # A replay only applies the recorded actions
+            continue
+
+        if event.type == pygame.VIDEORESIZE:
+            live_actions.append((RESIZE, "window", event.w, event.h))
+
         # Distinguish clicks in drawing area vs. control area
         if event.type == pygame.MOUSEBUTTONDOWN:
             if event.pos[1] < drawing_area_height:
-                dragging_sculpture = True
+                press_pos = event.pos
+                live_dragging = True
+                live_actions.append((DRAG, "sculpture", 1.0, 0.0))
                 mouse_last_x, mouse_last_y = event.pos
             else:
-                if base_freq_slider.x <= event.pos[0] <= base_freq_slider.x + base_freq_slider.w and \
-                   base_freq_slider.y <= event.pos[1] <= base_freq_slider.y + base_freq_slider.h:
-                    base_freq_slider.dragging = True
+                panel.handle_event(event)
 
         if event.type == pygame.MOUSEMOTION:
-            if dragging_sculpture:
+            hover_pos = event.pos if event.pos[1] < drawing_area_height else None
+            if live_dragging:
                 dx = event.pos[0] - mouse_last_x
                 dy = event.pos[1] - mouse_last_y
-                sensitivity = 0.005
-                rot_y += dx * sensitivity
-                rot_x += dy * sensitivity
-                vel_y = dx * sensitivity
-                vel_x = dy * sensitivity
+                live_actions.append((ROTATE, "sculpture", dx, dy))
                 mouse_last_x, mouse_last_y = event.pos
-            else:
-                if base_freq_slider.dragging:
-                    base_freq_slider.update(event.pos[0])
-                    
+            elif panel.handle_event(event) is base_freq_slider:
+                live_actions.append((SLIDER, "base_freq", base_freq_slider.value, 0.0))
+
         if event.type == pygame.MOUSEBUTTONUP:
-            dragging_sculpture = False
-            base_freq_slider.dragging = False
+            if live_dragging and event.pos == press_pos:
+                picked = picker.pick(*event.pos)
+                if picked is not None:
+                    t_picked = picked[0]
+                    position = curve_position(t_picked)
+                    print(f"picked t = {t_picked:.4f}, position = ({position[0]:.1f}, {position[1]:.1f}, {position[2]:.1f})")
+            if live_dragging:
+                live_dragging = False
+                live_actions.append((DRAG, "sculpture", 0.0, 0.0))
+            panel.handle_event(event)
+
+        if event.type == pygame.KEYDOWN and event.key in frequency_keys:
+            value = round(base_freq_slider.value) + frequency_keys[event.key]
+            value = max(base_freq_slider.min_val, min(value, base_freq_slider.max_val))
+            live_actions.append((SLIDER, "base_freq", value, 0.0))
+
+    # Apply this frame's actions (recorded ones when replaying)
+    for kind, name, a, b in session.actions(frame, live_actions):
+        if kind == SLIDER:
+            base_freq_slider.set_value(a)
+        elif kind == DRAG:
+            dragging_sculpture = a > 0
+        elif kind == RESIZE:
+            resize(int(a), int(b))
+        elif kind == ROTATE:
+            sensitivity = 0.005
+            rot_y += a * sensitivity
+            rot_x += b * sensitivity
+            vel_y = a * sensitivity
+            vel_x = b * sensitivity
 
     # Apply momentum when not dragging
     if not dragging_sculpture:
@@ -163,33 +226,67 @@ while running:
     # -------------------
     # Compute 3D Lissajous Points with Interactive Rotation
     # -------------------
-    points = []
-    for i in range(num_points):
-        t = t_offset + i * dt
-        x = A * math.sin(freq_x * t + delta_x)
-        y = B * math.sin(freq_y * t + delta_y)
-        z = C * math.sin(freq_z * t + delta_z)
-        # Apply rotations
-        x, y, z = rotateY(x, y, z, rot_y)
-        x, y, z = rotateX(x, y, z, rot_x)
-        p = project(x, y, z)
-        points.append(p)
+    if args.uniform:
+        points = []
+        for i in range(num_points):
+            t = t_offset + i * dt
+            x = A * math.sin(freq_x * t + delta_x)
+            y = B * math.sin(freq_y * t + delta_y)
+            z = C * math.sin(freq_z * t + delta_z)
+            # Apply rotations
+            x, y, z = rotateY(x, y, z, rot_y)
+            x, y, z = rotateX(x, y, z, rot_x)
+            p = project(x, y, z)
+            points.append(p)
+        picker.update(t_offset + np.arange(num_points) * dt, np.array(points))
+    else:
+        def curve(ts):
+            return rotate_points(lissajous_points(ts, (A, B, C), (freq_x, freq_y, freq_z), (delta_x, delta_y, delta_z)),
+                                 rot_x, rot_y)
+        ts, screen_points = sampler.sample(t_offset, t_offset + (num_points - 1) * dt, curve, project_array)
+        points = screen_points.astype(int).tolist()
+        # Picking reuses this frame's projected samples
+        picker.update(ts, screen_points)
 
     # -------------------
     # Drawing
     # -------------------
+    # Only the drawing area is cleared and redrawn every frame
+    drawing_rect = pygame.Rect(0, 0, width, drawing_area_height)
+    screen.set_clip(drawing_rect)
     screen.fill((0, 0, 0))
     if len(points) > 1:
         pygame.draw.lines(screen, (255, 255, 255), False, points, 2)
     # Draw red ball along the curve
     ball_index = int((t_offset * 100) % num_points)
-    pygame.draw.circle(screen, (255, 0, 0), points[ball_index], 8)
-    # Draw control area background and slider
-    pygame.draw.rect(screen, (30, 30, 30), (0, drawing_area_height, width, control_area_height))
-    base_freq_slider.draw(screen, font)
+    t = t_offset + ball_index * dt
+    x, y, z = A * math.sin(freq_x * t + delta_x), B * math.sin(freq_y * t + delta_y), C * math.sin(freq_z * t + delta_z)
+    x, y, z = rotateY(x, y, z, rot_y)
+    x, y, z = rotateX(x, y, z, rot_x)
+    pygame.draw.circle(screen, (255, 0, 0), project(x, y, z), 8)
+    # Highlight the sample under the mouse
+    picked = picker.pick(*hover_pos) if hover_pos is not None and not dragging_sculpture else None
+    if picked is not None:
+        t_picked, screen_point = picked
+        position = curve_position(t_picked)
+        pygame.draw.circle(screen, (255, 220, 0), (int(screen_point[0]), int(screen_point[1])), 6, 2)
+        label = font.render(f"t = {t_picked:.3f}  ({position[0]:.0f}, {position[1]:.0f}, {position[2]:.0f})",
+                            True, (255, 220, 0))
+        screen.blit(label, (10, 10))
+    screen.set_clip(None)
+    # Draw the control area where it changed
+    dirty_rects = panel.draw(screen)
 
-    pygame.display.flip()
-    clock.tick(60)
+    pygame.display.update([drawing_rect] + dirty_rects)
     t_offset += 0.01
 
+    frame += 1
+    if session.finished(frame):
+        running = False
+    elif not session.replaying:
+        clock.tick(60)  # Replays run as fast as possible
+
+session.close(frame)
+if not args.uniform:
+    print(sampler.stats.report())
 pygame.quit()
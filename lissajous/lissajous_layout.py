@@ -0,0 +1,107 @@
+import numpy as np
+
+# -------------------
+# Layout for the 2D Lissajous apps
+# -------------------
+class Layout:
+    """Window layout of the 2D apps for one window size.
+
+    All positions are derived from the window size, so a new Layout is only
+    computed when the window is resized (VIDEORESIZE) instead of every frame.
+    `button_rows` lists how many buttons sit in each row under the sliders.
+    """
+
+    def __init__(self, width, height, button_rows=(2, 3)):
+        self.width = width
+        self.height = height
+        self.drawing_area_height = int(height * 0.8)       # Drawing area occupies 80% of the window height
+        self.control_area_height = height - self.drawing_area_height  # Control area occupies the bottom 20%
+        self.slider_area_y = self.drawing_area_height      # Top of the control area
+
+        self.slider_row_gap = int(0.05 * self.control_area_height)
+        self.slider_margin_x = int(0.05 * width)
+        self.slider_width = int(0.4 * width)
+        self.slider_height = 20
+
+        # Frequency sliders row (for X and Y frequencies)
+        self.freq_slider_y = self.slider_area_y + self.slider_row_gap
+        self.freq_slider_x = [self.slider_margin_x, self.slider_margin_x * 2 + self.slider_width]
+
+        # Button rows, each one centered horizontally below the previous row
+        self.button_width = int(0.12 * width)
+        self.button_height = 30
+        self.gap = int(0.05 * width)
+        self.button_rows_y = []
+        self.button_rows_x = []
+        row_y = self.freq_slider_y + self.slider_height + self.slider_row_gap
+        for count in button_rows:
+            row_total_width = count * self.button_width + (count - 1) * self.gap
+            start_x = (width - row_total_width) // 2
+            self.button_rows_y.append(row_y)
+            self.button_rows_x.append([start_x + i * (self.button_width + self.gap) for i in range(count)])
+            row_y += self.button_height + self.slider_row_gap
+
+        # Amplitudes follow the size of the drawing area
+        self.amplitude_x = width // 3
+        self.amplitude_y = self.drawing_area_height // 3
+
+    def to_screen(self, u, v):
+        """Map unit curve coordinates (-1..1) to integer pixel positions on the canvas."""
+        xs = (self.width / 2 + self.amplitude_x * np.asarray(u)).astype(int)
+        ys = (self.drawing_area_height / 2 + self.amplitude_y * np.asarray(v)).astype(int)
+        return xs, ys
+
+
+# -------------------
+# Retained sample data for re-rasterizing the canvas
+# -------------------
+class SampleTrail:
+    """Keeps the drawn dots in resolution-independent form.
+
+    Each dot is stored as its unit curve coordinates (u, v) in -1..1 plus its
+    color, so after a resize the canvas can be re-rasterized at the new
+    resolution instead of being stretched or lost. Only the newest
+    `capacity` dots are kept.
+    """
+
+    def __init__(self, capacity=200000):
+        self.capacity = capacity
+        self.u = np.zeros(capacity, dtype=np.float32)
+        self.v = np.zeros(capacity, dtype=np.float32)
+        self.colors = np.zeros((capacity, 3), dtype=np.uint8)
+        self.count = 0   # number of valid dots
+        self.head = 0    # next write position in the ring buffer
+
+    def clear(self):
+        self.count = 0
+        self.head = 0
+
+    def append(self, u, v, colors):
+        """Store one dot or a batch of dots (scalars or arrays, colors as RGB rows)."""
+        u = np.atleast_1d(u)
+        v = np.atleast_1d(v)
+        colors = np.asarray(colors, dtype=np.uint8).reshape(-1, 3)
+        n = len(u)
+        if n > self.capacity:
+            u, v, colors = u[-self.capacity:], v[-self.capacity:], colors[-self.capacity:]
+            n = self.capacity
+        index = (self.head + np.arange(n)) % self.capacity
+        self.u[index] = u
+        self.v[index] = v
+        self.colors[index] = colors
+        self.head = (self.head + n) % self.capacity
+        self.count = min(self.count + n, self.capacity)
+
+    def ordered(self):
+        """Return (u, v, colors) of the retained dots, oldest first."""
+        if self.count < self.capacity:
+            return self.u[:self.count], self.v[:self.count], self.colors[:self.count]
+        index = (self.head + np.arange(self.capacity)) % self.capacity
+        return self.u[index], self.v[index], self.colors[index]
+
+    def rasterize(self, canvas, layout, draw_dot):
+        """Redraw every retained dot onto `canvas` using `layout` for the new resolution."""
+        u, v, colors = self.ordered()
+        xs, ys = layout.to_screen(u, v)
+        for x, y, color in zip(xs.tolist(), ys.tolist(), colors.tolist()):
+            draw_dot(canvas, color, (x, y))
@@ -0,0 +1,227 @@
+import time
+import numpy as np
+from OpenGL.GL import *
+
+# Particle pool and blending for the ember effect of the OpenGL particle test.
+#
+# Particles are stored as rows of preallocated NumPy arrays (position,
+# velocity, age, lifetime, emitter); the first `count` rows are alive.
+# Updating and culling the whole pool are a few array operations, and drawing
+# is one glDrawArrays call from vertex and color arrays. Emitters spawn at a
+# per-second rate, and an EmitterGroup spawns the particles of all its
+# emitters as one batch.
+#
+# Fading embers are translucent, so the draw order matters:
+#   unsorted  - standard alpha blending in spawn order (cheapest, but a near
+#               ember drawn first hides the ones behind it)
+#   sorted    - standard alpha blending, drawn back to front after an argsort
+#               on the view-space depth
+#   additive  - GL_ONE destination factor with depth writes disabled; the
+#               result does not depend on the order, so no sort is needed
+
+BLEND_MODES = ("unsorted", "sorted", "additive")
+
+EMBER_COLOR = (1.0, 0.5, 0.0)
+GLOW_COLOR = (1.0, 0.95, 0.6)
+
+
+class ParticlePool:
+    def __init__(self, capacity=50000):
+        self.capacity = capacity
+        self.positions = np.zeros((capacity, 3), dtype=np.float32)
+        self.velocities = np.zeros((capacity, 3), dtype=np.float32)
+        self.ages = np.zeros(capacity, dtype=np.float32)
+        self.lifetimes = np.ones(capacity, dtype=np.float32)
+        self.owners = np.zeros(capacity, dtype=np.int16)   # Index of the emitter that spawned the particle
+        self.count = 0
+        self.dropped = 0   # Spawns refused because the pool was full
+
+    def spawn(self, positions, velocities, lifetimes, owners=0):
+        """Add a batch of particles; returns the number actually added."""
+        n = min(len(positions), self.capacity - self.count)
+        self.dropped += len(positions) - n
+        new = slice(self.count, self.count + n)
+        self.positions[new] = positions[:n]
+        self.velocities[new] = velocities[:n]
+        self.ages[new] = 0.0
+        self.lifetimes[new] = lifetimes[:n] if np.ndim(lifetimes) else lifetimes
+        self.owners[new] = owners[:n] if np.ndim(owners) else owners
+        self.count += n
+        return n
+
+    def update(self, dt):
+        """Age and move all particles, then drop the expired ones; returns the owners of the removed particles."""
+        live = slice(0, self.count)
+        self.ages[live] += dt
+        self.positions[live] += self.velocities[live] * dt
+        expired = self.ages[live] >= self.lifetimes[live]
+        removed = self.owners[live][expired]
+        if len(removed):
+            # Compact the survivors to the front, keeping their order
+            alive = np.nonzero(~expired)[0]
+            for array in (self.positions, self.velocities, self.ages, self.lifetimes, self.owners):
+                array[:len(alive)] = array[alive]
+            self.count = len(alive)
+        return removed
+
+    def alphas(self):
+        """Opacity of the live particles, fading from 1 to 0 over their lifetime."""
+        live = slice(0, self.count)
+        return np.clip(1.0 - self.ages[live] / self.lifetimes[live], 0.0, 1.0)
+
+
+class Emitter:
+    """Spawns particles at a point of the curve, `phase` ahead of the red ball in curve parameter t."""
+
+    def __init__(self, phase=0.0, rate=300.0, lifetime=1.5,
+                 velocity_min=(-20, 10, -20), velocity_max=(20, 40, 20)):
+        self.phase = phase
+        self.rate = rate                  # Particles per second, independent of the frame rate
+        self.lifetime = lifetime
+        self.velocity_min = velocity_min
+        self.velocity_max = velocity_max
+        self.pending = 0.0                # Fraction of a particle carried over to the next frame
+        self.spawned = 0
+        self.culled = 0
+
+    def due(self, dt):
+        """Number of particles to spawn for a time step of dt seconds."""
+        self.pending += self.rate * dt
+        n = int(self.pending)
+        self.pending -= n
+        return n
+
+
+def parse_emitters(spec, lifetime=1.5):
+    """Emitters from a string like "0:300,2.1:150" (curve phase, optionally ":" particles per second)."""
+    emitters = []
+    for item in spec.split(","):
+        phase, _, rate = item.partition(":")
+        emitters.append(Emitter(float(phase), float(rate) if rate else 300.0, lifetime))
+    return emitters
+
+
+class EmitterGroup:
+    """Several emitters feeding one shared pool, spawning all their particles as a single batch."""
+
+    def __init__(self, pool, emitters, rng=None):
+        self.pool = pool
+        self.emitters = emitters
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.elapsed = 0.0
+        self.velocity_min = np.array([e.velocity_min for e in emitters], dtype=np.float32)
+        self.velocity_max = np.array([e.velocity_max for e in emitters], dtype=np.float32)
+        self.lifetimes = np.array([e.lifetime for e in emitters], dtype=np.float32)
+
+    @property
+    def phases(self):
+        return np.array([e.phase for e in self.emitters])
+
+    def emit(self, positions, dt):
+        """Spawn the particles due this frame; `positions` holds one (x, y, z) per emitter."""
+        counts = np.array([e.due(dt) for e in self.emitters])
+        total = int(counts.sum())
+        if total == 0:
+            return
+        owners = np.repeat(np.arange(len(self.emitters), dtype=np.int16), counts)
+        low, high = self.velocity_min[owners], self.velocity_max[owners]
+        velocities = low + (high - low) * self.rng.random((total, 3), dtype=np.float32)
+        added = self.pool.spawn(np.asarray(positions, dtype=np.float32)[owners], velocities,
+                                self.lifetimes[owners], owners)
+        # When the pool is full the batch is cut from the end
+        for emitter, n in zip(self.emitters, np.bincount(owners[:added], minlength=len(self.emitters))):
+            emitter.spawned += int(n)
+
+    def update(self, dt):
+        """Advance the shared pool and count the expired particles of each emitter."""
+        removed = self.pool.update(dt)
+        for emitter, n in zip(self.emitters, np.bincount(removed, minlength=len(self.emitters))):
+            emitter.culled += int(n)
+        self.elapsed += dt
+
+    def live_counts(self):
+        return np.bincount(self.pool.owners[:self.pool.count], minlength=len(self.emitters))
+
+    def report(self):
+        seconds = max(self.elapsed, 1e-9)
+        lines = [f"emitter {i} (phase {e.phase:.2f}): {live} live, "
+                 f"{e.spawned / seconds:.0f} spawned/s, {e.culled / seconds:.0f} culled/s"
+                 for i, (e, live) in enumerate(zip(self.emitters, self.live_counts()))]
+        lines.append(f"pool: {self.pool.count} of {self.pool.capacity} in use, {self.pool.dropped} spawns dropped")
+        return "\n".join(lines)
+
+
+class BlendTimings:
+    """Average CPU time per frame spent sorting and drawing, per blend mode."""
+
+    def __init__(self):
+        self.totals = {mode: [0, 0, 0.0, 0.0] for mode in BLEND_MODES}  # frames, particles, sort, draw
+
+    def record(self, mode, particles, sort_seconds, draw_seconds):
+        totals = self.totals[mode]
+        totals[0] += 1
+        totals[1] += particles
+        totals[2] += sort_seconds
+        totals[3] += draw_seconds
+
+    def report(self):
+        lines = []
+        for mode, (frames, particles, sort_seconds, draw_seconds) in self.totals.items():
+            if frames:
+                lines.append(f"{mode:>9}: {particles / frames:7.0f} particles, "
+                             f"sort {1000 * sort_seconds / frames:.3f} ms, draw {1000 * draw_seconds / frames:.3f} ms per frame")
+        return "particle blending:\n" + "\n".join(lines) if lines else "particle blending: no frames drawn"
+
+
+class ParticleRenderer:
+    def __init__(self, mode="unsorted", point_size=6.0, color=EMBER_COLOR):
+        if mode not in BLEND_MODES:
+            raise ValueError(f"unknown blend mode {mode!r}, expected one of {', '.join(BLEND_MODES)}")
+        self.mode = mode
+        self.point_size = point_size
+        self.color = color
+        self.timings = BlendTimings()
+
+    def next_mode(self):
+        self.mode = BLEND_MODES[(BLEND_MODES.index(self.mode) + 1) % len(BLEND_MODES)]
+        return self.mode
+
+    def draw(self, pool, view, glow=None):
+        """Draw the live particles of `pool`; `view` is the current model-view matrix (row-major).
+
+        `glow` optionally blends each particle from the ember color towards
+        GLOW_COLOR (0..1 per live particle).
+        """
+        start = time.perf_counter()
+        positions = pool.positions[:pool.count]
+        colors = np.empty((pool.count, 4), dtype=np.float32)
+        colors[:, :3] = self.color
+        if glow is not None:
+            colors[:, :3] += glow[:, None] * np.subtract(GLOW_COLOR, self.color)
+        colors[:, 3] = pool.alphas()
+        if self.mode == "sorted":
+            # View-space z is negative in front of the camera: most negative = farthest
+            depth = positions @ view[2, :3].astype(np.float32) + view[2, 3]
+            order = np.argsort(depth)
+            positions = positions[order]
+            colors = colors[order]
+        else:
+            positions = np.ascontiguousarray(positions)
+        sorted_at = time.perf_counter()
+
+        additive = self.mode == "additive"
+        if additive:
+            glBlendFunc(GL_SRC_ALPHA, GL_ONE)
+            glDepthMask(GL_FALSE)
+        glPointSize(self.point_size)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, positions)
+        glColorPointer(4, GL_FLOAT, 0, colors)
+        glDrawArrays(GL_POINTS, 0, pool.count)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        if additive:
+            glDepthMask(GL_TRUE)
+            glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        self.timings.record(self.mode, pool.count, sorted_at - start, time.perf_counter() - sorted_at)
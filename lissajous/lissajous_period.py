@@ -0,0 +1,125 @@
+import math
+from fractions import Fraction
+import numpy as np
+
+# Closed-curve detection for the 2D Lissajous figure
+# x = sin(freq_x * t + phase), y = cos(freq_y * t).
+#
+# When freq_x / freq_y is a rational number p / q the figure closes after
+# t = 2 * pi * p / freq_x; after that the curve only retraces itself. Decimal
+# slider values such as 2.7 / 3.3 are not exactly rational as floats, so
+# ratios within a relative tolerance of a fraction with a small denominator
+# are snapped to it. The tolerance is only meant to absorb that float noise:
+# a slightly detuned pair such as 3.0 / 2.001 is not closed but precesses
+# slowly, and has to keep being drawn.
+#
+# An open figure is sampled sparsely, as later passes land between the
+# earlier dots. A closed figure is drawn for one period only, so its samples
+# are spaced by the on-screen speed of the curve: consecutive dots are at
+# most about a pixel apart and the period is drawn as a solid line.
+
+
+def dense_step(freq_x, freq_y, amplitude_x, amplitude_y, spacing=1.0):
+    """Largest t step that keeps consecutive dots at most `spacing` pixels apart.
+
+    The dots of x = amplitude_x * sin(freq_x * t + phase),
+    y = amplitude_y * cos(freq_y * t) move at most
+    hypot(amplitude_x * freq_x, amplitude_y * freq_y) pixels per unit of t.
+    """
+    speed = math.hypot(amplitude_x * freq_x, amplitude_y * freq_y)
+    return spacing / speed if speed > 0 else math.inf
+
+
+def rational_period(freq_x, freq_y, tolerance=1e-9, max_denominator=50):
+    """Return (period, snapped_freq_y) for the figure, or (None, freq_y) if it never closes.
+
+    `tolerance` is the largest relative difference between freq_x / freq_y
+    and the fraction p / q (q <= max_denominator) that still counts as rational.
+    """
+    if freq_x <= 0 or freq_y <= 0 or max_denominator < 1:
+        return None, freq_y
+    ratio = freq_x / freq_y
+    fraction = Fraction(ratio).limit_denominator(max_denominator)
+    if fraction == 0 or abs(ratio - fraction) > tolerance * ratio:
+        return None, freq_y
+    p, q = fraction.numerator, fraction.denominator
+    # Snap freq_y so that freq_x / freq_y is exactly p / q and the curve closes
+    return 2 * math.pi * p / freq_x, freq_x * q / p
+
+
+class ClosedCurveTracker:
+    """Follows the current frequencies and reports when one full period has been drawn."""
+
+    def __init__(self, tolerance=1e-9, max_denominator=50):
+        self.tolerance = tolerance
+        self.max_denominator = max_denominator
+        self.frequencies = None
+        self.period = None
+        self.freq_y = None
+        self.t_start = 0.0
+
+    def update(self, freq_x, freq_y, t):
+        """Recompute the period when the frequencies changed; returns the (snapped) freq_y to use."""
+        if (freq_x, freq_y) != self.frequencies:
+            self.frequencies = (freq_x, freq_y)
+            self.period, self.freq_y = rational_period(freq_x, freq_y, self.tolerance, self.max_denominator)
+            self.t_start = t
+        return self.freq_y
+
+    def restart(self, t):
+        """Draw the period again from `t`, e.g. after the canvas was cleared."""
+        self.t_start = t
+
+    def sample_times(self, t, duration, step, dense):
+        """Times of the dots that cover [t, t + duration).
+
+        An open figure gets a dot every `step`, a closed one every
+        min(step, dense) up to the end of its period.
+        """
+        if self.period is None:
+            return t + step * np.arange(max(int(round(duration / step)), 1))
+        step = min(step, dense)
+        return self.limit(t + step * np.arange(max(math.ceil(duration / step - 1e-9), 1)))
+
+    def closed(self, t):
+        """True once the curve has been drawn for a whole period."""
+        return self.period is not None and t >= self.t_start + self.period
+
+    def limit(self, t_vals):
+        """Drop the sample times that lie beyond the end of the period."""
+        if self.period is None:
+            return t_vals
+        return t_vals[t_vals < self.t_start + self.period]
+
+
+def self_check():
+    """Float noise of decimal slider values is snapped, detuned ratios are not."""
+    for freq_x, freq_y, p, q in ((2.7, 3.3, 9, 11), (3.0, 2.0, 3, 2), (2.75, 3.3, 5, 6), (0.1 * 3, 0.1 * 7, 3, 7)):
+        period, snapped = rational_period(freq_x, freq_y)
+        assert period is not None and math.isclose(period, 2 * math.pi * p / freq_x), (freq_x, freq_y)
+        assert math.isclose(freq_x / snapped, p / q), (freq_x, freq_y)
+    for freq_x, freq_y in ((3.0, 2.001), (2.7, 3.3001), (1.0, math.sqrt(2))):
+        assert rational_period(freq_x, freq_y) == (None, freq_y), (freq_x, freq_y)
+    tracker = ClosedCurveTracker()
+    assert tracker.update(3.0, 2.001, 0.0) == 2.001
+    assert not tracker.closed(1e6)
+    assert len(tracker.sample_times(0.0, 0.02, 0.02, 1e-4)) == 1    # Open: sparse dots
+    # A closed figure drawn frame by frame has no gaps of more than a pixel
+    freq_x, amplitudes = 2.7, (333, 250)
+    freq_y = tracker.update(freq_x, 3.3, 0.0)
+    dense = dense_step(freq_x, freq_y, *amplitudes)
+    t, times = 0.0, []
+    while not tracker.closed(t):
+        times.append(tracker.sample_times(t, 0.02, 0.02, dense))
+        t += 0.02
+    times = np.concatenate(times)
+    x = amplitudes[0] * np.sin(freq_x * times + 2)
+    y = amplitudes[1] * np.cos(freq_y * times)
+    assert np.hypot(np.diff(x), np.diff(y)).max() <= 1.0
+    assert times[-1] < tracker.period <= times[-1] + dense
+    print("self-check passed: decimal slider ratios close, detuned ratios keep precessing, "
+          "closed periods are drawn without gaps")
+
+
+if __name__ == "__main__":
+    self_check()
@@ -0,0 +1,84 @@
+import numpy as np
+
+# Picking of curve samples under the mouse.
+#
+# The samples of the curve are already projected to the screen every frame
+# for drawing, so picking works on those 2D points instead of reprojecting
+# the curve. The points are bucketed into a uniform screen grid (cell index
+# per point, one stable argsort, and the start of every cell's run in the
+# sorted order), and a query only measures the points in the 3x3 cells
+# around the mouse. The index is built lazily, at most once per frame, on the
+# first query.
+
+
+class ScreenPointIndex:
+    def __init__(self, points, cell_size=16):
+        """Index an (n, 2) array of screen points; queries reach at most `cell_size` pixels."""
+        self.points = np.asarray(points, dtype=np.float32)
+        self.cell_size = cell_size
+        cells = np.floor(self.points / cell_size).astype(np.int64)
+        self.origin = cells.min(axis=0) - 1 if len(cells) else np.zeros(2, dtype=np.int64)
+        cells -= self.origin
+        self.columns = int(cells[:, 0].max()) + 2 if len(cells) else 1
+        rows = int(cells[:, 1].max()) + 2 if len(cells) else 1
+        keys = cells[:, 1] * self.columns + cells[:, 0]
+        if rows * self.columns <= np.iinfo(np.uint16).max:
+            # NumPy sorts 16-bit keys with a radix sort
+            keys = keys.astype(np.uint16)
+        self.order = np.argsort(keys, kind="stable")
+        # Start of every cell's run of points in self.order (one extra entry for the end)
+        counts = np.bincount(keys, minlength=rows * self.columns)
+        self.cell_start = np.concatenate(([0], np.cumsum(counts)))
+
+    def nearest(self, x, y, max_distance=None):
+        """Index of the point closest to (x, y), or None if there is none within max_distance pixels."""
+        max_distance = self.cell_size if max_distance is None else min(max_distance, self.cell_size)
+        column, row = np.floor(np.array([x, y]) / self.cell_size).astype(np.int64) - self.origin
+        candidates = []
+        for r in (row - 1, row, row + 1):
+            if 0 <= r and (r + 1) * self.columns < len(self.cell_start):
+                first = max(column - 1, 0)
+                last = min(column + 1, self.columns - 1)
+                if first <= last:
+                    start = self.cell_start[r * self.columns + first]
+                    end = self.cell_start[r * self.columns + last + 1]
+                    candidates.append(self.order[start:end])
+        if not candidates:
+            return None
+        candidates = np.concatenate(candidates)
+        if len(candidates) == 0:
+            return None
+        offsets = self.points[candidates] - (x, y)
+        d2 = offsets[:, 0] ** 2 + offsets[:, 1] ** 2
+        best = int(np.argmin(d2))
+        if d2[best] > max_distance ** 2:
+            return None
+        return int(candidates[best])
+
+
+class CurvePicker:
+    """Finds the curve sample under the mouse among the samples drawn this frame."""
+
+    def __init__(self, cell_size=16, max_distance=12):
+        self.cell_size = cell_size
+        self.max_distance = max_distance
+        self.ts = None
+        self.screen_points = None
+        self.index = None
+
+    def update(self, ts, screen_points):
+        """Hand over this frame's sample parameters and their (n, 2) screen positions."""
+        self.ts = np.asarray(ts)
+        self.screen_points = screen_points
+        self.index = None   # Rebuilt on the next query
+
+    def pick(self, x, y):
+        """Return (t, screen_point) of the sample nearest to (x, y), or None."""
+        if self.ts is None or len(self.ts) == 0:
+            return None
+        if self.index is None:
+            self.index = ScreenPointIndex(self.screen_points, self.cell_size)
+        i = self.index.nearest(x, y, self.max_distance)
+        if i is None:
+            return None
+        return float(self.ts[i]), self.index.points[i]
@@ -0,0 +1,115 @@
+import os
+import random
+import struct
+import time
+
+# Input recording and replay for the Lissajous apps.
+#
+# The apps turn mouse and keyboard input into small actions (a slider value,
+# a button press, a rotation drag, a window resize) and apply them once per
+# frame. An InputSession can log those actions with their frame number and
+# timestamp to a compact binary file, and later feed them back on the same
+# frames as fast as possible (optionally without a window), so a run can be
+# reproduced exactly for profiling and regression timing.
+
+# Action kinds
+SLIDER = 1   # a = new slider value
+BUTTON = 2   # button press
+ROTATE = 3   # a, b = mouse movement (dx, dy) of a rotation drag
+DRAG = 4     # a = 1 when a rotation drag starts, 0 when it ends
+RESIZE = 5   # a, b = new window width and height
+
+_MAGIC = b"LSJR"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHIIH")  # magic, version, random seed, frame count, number of names
+_RECORD = struct.Struct("<IIBBdd")  # frame, time in ms, kind, name index, a, b
+
+
+def add_replay_arguments(parser):
+    """Add the --record/--replay/--headless options to an argparse parser."""
+    parser.add_argument("--record", metavar="FILE", help="record all input actions to FILE")
+    parser.add_argument("--replay", metavar="FILE", help="replay the input actions from FILE at full speed")
+    parser.add_argument("--headless", action="store_true", help="run without a window (use with --replay)")
+
+
+class InputSession:
+    def __init__(self, record_path=None, replay_path=None, headless=False):
+        if headless:
+            # Must happen before pygame.init()
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
+        self.record_path = record_path
+        self.names = []
+        self.name_index = {}
+        self.records = []
+        self.replay = {}
+        self.frame_count = None  # Number of frames to replay, None when not replaying
+        self.seed = random.randrange(2 ** 32)
+        if replay_path:
+            self._load(replay_path)
+        # The same seed makes buttons like "Randomize" reproducible
+        random.seed(self.seed)
+        self.start_time = time.perf_counter()
+
+    @classmethod
+    def from_args(cls, args):
+        return cls(args.record, args.replay, args.headless)
+
+    @property
+    def replaying(self):
+        return self.frame_count is not None
+
+    def actions(self, frame, live_actions):
+        """Return the actions to apply this frame and record them.
+
+        While replaying, the recorded actions for `frame` are returned
+        instead of `live_actions`. The apps must not handle live input
+        themselves then either (widgets update on their events), so they
+        check `replaying` before passing events to their panel.
+        """
+        if self.replaying:
+            return self.replay.get(frame, [])
+        if self.record_path:
+            ms = int((time.perf_counter() - self.start_time) * 1000)
+            for kind, name, a, b in live_actions:
+                if name not in self.name_index:
+                    self.name_index[name] = len(self.names)
+                    self.names.append(name)
+                self.records.append((frame, ms, kind, self.name_index[name], a, b))
+        return live_actions
+
+    def finished(self, frame):
+        """True once a replay has fed back all of its recorded frames."""
+        return self.replaying and frame >= self.frame_count
+
+    def close(self, frames):
+        """Save the recording and report the timing of a replay."""
+        elapsed = time.perf_counter() - self.start_time
+        if self.record_path:
+            self._save(self.record_path, frames)
+        if self.replaying:
+            print(f"Replayed {frames} frames in {elapsed:.3f} s ({frames / max(elapsed, 1e-9):.1f} frames/s)")
+
+    def _save(self, path, frames):
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, self.seed, frames, len(self.names)))
+            for name in self.names:
+                encoded = name.encode("utf-8")
+                f.write(struct.pack("<B", len(encoded)) + encoded)
+            for record in self.records:
+                f.write(_RECORD.pack(*record))
+
+    def _load(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, self.seed, self.frame_count, name_count = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path} is not a Lissajous input recording")
+        offset = _HEADER.size
+        names = []
+        for _ in range(name_count):
+            length = data[offset]
+            names.append(data[offset + 1:offset + 1 + length].decode("utf-8"))
+            offset += 1 + length
+        for frame, _ms, kind, name, a, b in _RECORD.iter_unpack(data[offset:]):
+            self.replay.setdefault(frame, []).append((kind, names[name], a, b))
@@ -0,0 +1,91 @@
+import math
+import numpy as np
+
+# Adaptive sampling of the 3D Lissajous line strip.
+#
+# Uniform sampling (t = t_offset + i * dt) spends as many vertices on the
+# straight stretches of the curve as on its tight turns. The AdaptiveSampler
+# starts from a coarse uniform grid and keeps splitting the segments whose
+# projected midpoint is further than `tolerance` pixels from the midpoint of
+# the projected chord, so the line strip gets just enough vertices to look
+# exact on screen.
+
+
+def lissajous_points(t, amplitudes, freqs, deltas):
+    """Evaluate the 3D Lissajous curve for an array of t values; returns an (n, 3) array."""
+    t = np.asarray(t, dtype=np.float64)
+    return np.stack([a * np.sin(f * t + d) for a, f, d in zip(amplitudes, freqs, deltas)], axis=-1)
+
+
+def rotate_points(points, rot_x, rot_y):
+    """Rotate (n, 3) points around Y and then around X (angles in radians)."""
+    cos_y, sin_y = math.cos(rot_y), math.sin(rot_y)
+    cos_x, sin_x = math.cos(rot_x), math.sin(rot_x)
+    x, y, z = points[:, 0], points[:, 1], points[:, 2]
+    x, z = x * cos_y + z * sin_y, -x * sin_y + z * cos_y
+    y, z = y * cos_x - z * sin_x, y * sin_x + z * cos_x
+    return np.stack((x, y, z), axis=-1)
+
+
+class SamplingStats:
+    def __init__(self):
+        self.frames = 0
+        self.vertices = 0        # vertices emitted in the last frame
+        self.total_vertices = 0
+        self.capped_frames = 0   # frames that hit the vertex cap
+
+    def record(self, vertices, capped):
+        self.frames += 1
+        self.vertices = vertices
+        self.total_vertices += vertices
+        self.capped_frames += capped
+
+    def report(self):
+        average = self.total_vertices / max(self.frames, 1)
+        return (f"adaptive sampling: {self.vertices} vertices last frame, "
+                f"{average:.0f} average over {self.frames} frames, {self.capped_frames} frames capped")
+
+
+class AdaptiveSampler:
+    def __init__(self, tolerance=0.5, initial_segments=64, max_vertices=4000, max_depth=16):
+        self.tolerance = tolerance            # Allowed screen-space error in pixels
+        self.initial_segments = initial_segments
+        self.max_vertices = max_vertices
+        self.max_depth = max_depth
+        self.stats = SamplingStats()
+
+    def sample(self, t_start, t_end, curve, project):
+        """Sample `curve` (t array -> (n, 3) points) between t_start and t_end.
+
+        Returns (t_values, screen_points) with screen_points an (n, 2) array
+        from `project`.
+        """
+        ts = np.linspace(t_start, t_end, self.initial_segments + 1)
+        screen = project(curve(ts))
+        active = np.arange(len(ts) - 1)   # Segments that may still need splitting
+        capped = False
+        for _ in range(self.max_depth):
+            if len(active) == 0:
+                break
+            t_mid = 0.5 * (ts[active] + ts[active + 1])
+            mid = project(curve(t_mid))
+            chord_mid = 0.5 * (screen[active] + screen[active + 1])
+            error = np.hypot(mid[:, 0] - chord_mid[:, 0], mid[:, 1] - chord_mid[:, 1])
+            split = np.nonzero(error > self.tolerance)[0]
+            budget = self.max_vertices - len(ts)
+            if len(split) > budget:
+                # Spend the remaining vertices on the worst segments
+                capped = True
+                split = np.sort(split[np.argsort(error[split])[::-1][:max(budget, 0)]])
+            if len(split) == 0:
+                break
+            segments = active[split]
+            ts = np.insert(ts, segments + 1, t_mid[split])
+            screen = np.insert(screen, segments + 1, mid[split], axis=0)
+            # Both halves of every split segment are checked in the next round
+            first_half = segments + np.arange(len(segments))
+            active = np.stack((first_half, first_half + 1), axis=-1).ravel()
+            if capped:
+                break
+        self.stats.record(len(ts), capped)
+        return ts, screen
@@ -0,0 +1,168 @@
+import time
+import numpy as np
+
+# Spatial index of the Lissajous curve for particle queries.
+#
+# The closed curve is cut into line segments and every segment is stored in
+# each cell of a uniform grid that its bounding box, grown by the query
+# radius, overlaps. A point then only has to be tested against the segments
+# listed in its own cell: one lookup instead of a loop over the whole curve.
+# The cell lists are stored back to back, sorted by cell, with a start and a
+# count per cell (compressed rows), so all particles are expanded into
+# (particle, candidate segment) pairs and measured with array operations; the
+# work is proportional to the candidates actually found, not to the fullest
+# cell. The grid only depends on the curve, so it is rebuilt when the
+# frequencies or phases change, not every frame.
+
+
+class SegmentGrid:
+    def __init__(self, vertices, radius, cell_size=None):
+        """Index the polyline `vertices` ((n, 3) array) for queries up to `radius` away."""
+        self.starts = np.ascontiguousarray(vertices[:-1], dtype=np.float32)
+        self.ends = np.ascontiguousarray(vertices[1:], dtype=np.float32)
+        self.radius = radius
+        if cell_size is None:
+            longest = np.linalg.norm(self.ends - self.starts, axis=1).max()
+            cell_size = max(radius, longest)
+        self.cell_size = cell_size
+        low = np.minimum(self.starts, self.ends) - radius
+        high = np.maximum(self.starts, self.ends) + radius
+        self.origin = low.min(axis=0)
+        self.shape = np.floor((high.max(axis=0) - self.origin) / cell_size).astype(int) + 1
+
+        # Cell range covered by every segment
+        first = np.floor((low - self.origin) / cell_size).astype(int)
+        last = np.floor((high - self.origin) / cell_size).astype(int)
+        span = (last - first).max(axis=0) + 1
+        cells, segments = [], []
+        for dx in range(span[0]):
+            for dy in range(span[1]):
+                for dz in range(span[2]):
+                    cell = first + (dx, dy, dz)
+                    inside = np.all(cell <= last, axis=1)
+                    cells.append(self._flat(cell[inside]))
+                    segments.append(np.nonzero(inside)[0])
+        cells = np.concatenate(cells)
+        segments = np.concatenate(segments)
+
+        # Segment lists of all cells back to back, with the start and length of each
+        order = np.argsort(cells, kind="stable")
+        self.segments = segments[order].astype(np.int32)
+        self.cell_count = np.bincount(cells, minlength=int(np.prod(self.shape)))
+        self.cell_start = np.cumsum(self.cell_count) - self.cell_count
+
+        # Segment start, direction and 1 / length^2 as separate columns for the distance tests
+        direction = self.ends - self.starts
+        self.start_columns = [np.ascontiguousarray(self.starts[:, c]) for c in range(3)]
+        self.direction_columns = [np.ascontiguousarray(direction[:, c]) for c in range(3)]
+        self.inverse_length2 = 1.0 / np.maximum(np.sum(direction * direction, axis=1), 1e-12)
+
+    def _flat(self, cell):
+        return (cell[:, 0] * self.shape[1] + cell[:, 1]) * self.shape[2] + cell[:, 2]
+
+    def nearest(self, points):
+        """Closest curve point for each of the (n, 3) `points` among the segments of its cell.
+
+        Returns (distances, closest_points); points without a segment within
+        `radius` get an infinite distance.
+        """
+        distances = np.full(len(points), np.inf, dtype=np.float32)
+        closest = np.zeros((len(points), 3), dtype=np.float32)
+        cell = np.floor((points - self.origin) / self.cell_size).astype(int)
+        index = np.nonzero(np.all((cell >= 0) & (cell < self.shape), axis=1))[0]
+        flat = self._flat(cell[index])
+        counts = self.cell_count[flat]
+        occupied = counts > 0
+        index, flat, counts = index[occupied], flat[occupied], counts[occupied]
+        if len(index) == 0:
+            return distances, closest
+
+        # One row per (point, candidate segment) pair, grouped by point
+        group_start = np.cumsum(counts) - counts
+        pair = np.arange(counts.sum()) - np.repeat(group_start, counts)
+        candidates = self.segments[np.repeat(self.cell_start[flat], counts) + pair]
+        # Offset from the segment start and direction of every pair, one column per axis
+        offsets = [np.repeat(points[index, c], counts) - self.start_columns[c].take(candidates) for c in range(3)]
+        directions = [self.direction_columns[c].take(candidates) for c in range(3)]
+        t = (offsets[0] * directions[0] + offsets[1] * directions[1] + offsets[2] * directions[2])
+        t = np.clip(t * self.inverse_length2.take(candidates), 0.0, 1.0)
+        d2 = sum((o - t * d) ** 2 for o, d in zip(offsets, directions))
+
+        # Closest candidate of every point: the first pair that reaches the group minimum
+        group_min = np.minimum.reduceat(d2, group_start)
+        is_min = d2 == np.repeat(group_min, counts)
+        best = np.nonzero(is_min)[0]
+        group = np.repeat(np.arange(len(index)), counts)[best]
+        first = np.concatenate(([True], group[1:] != group[:-1]))
+        best = best[first]
+        # A cell also lists segments that only come within `radius` of other points in it
+        within = group_min <= np.float32(self.radius) ** 2
+        index, best = index[within], best[within]
+        distances[index] = np.sqrt(group_min[within])
+        segment = candidates[best]
+        closest[index] = self.starts[segment] + t[best, None] * (self.ends[segment] - self.starts[segment])
+        return distances, closest
+
+
+class CurveProximity:
+    """Bounce and glow of particles near the curve, using a SegmentGrid of one curve period."""
+
+    def __init__(self, curve, period, segments=2000, collision_radius=4.0, glow_radius=12.0, restitution=0.6,
+                 bounce=True):
+        self.curve = curve                  # t array -> (n, 3) model-space points
+        self.period = period
+        self.segments = segments
+        self.bounce = bounce
+        self.collision_radius = collision_radius
+        self.glow_radius = glow_radius
+        self.restitution = restitution
+        self.key = None
+        self.grid = None
+        self.rebuilds = 0
+        self.bounces = 0
+        self.steps = 0
+        self.particles = 0
+        self.seconds = 0.0
+
+    def rebuild(self, key):
+        """Re-index the curve if `key` (e.g. the frequencies and phases) changed."""
+        if key != self.key:
+            self.key = key
+            vertices = self.curve(np.linspace(0.0, self.period, self.segments + 1))
+            self.grid = SegmentGrid(vertices, max(self.collision_radius, self.glow_radius))
+            self.rebuilds += 1
+
+    def apply(self, pool, model):
+        """Bounce the particles that hit the curve; returns their glow (0..1), one value per live particle.
+
+        Particles are in world space, the curve in model space; `model` is the
+        pure rotation between the two.
+        """
+        start = time.perf_counter()
+        n = pool.count
+        rotation = model[:3, :3].astype(np.float32)
+        # Row vectors: world = model_points @ R.T, so model_points = world @ R
+        positions = pool.positions[:n] @ rotation
+        distances, closest = self.grid.nearest(positions)
+
+        # Reflect the velocity component towards the curve
+        normals = positions - closest
+        hit = np.nonzero((distances < self.collision_radius) & (distances > 1e-3))[0]
+        if self.bounce and len(hit):
+            normals = (normals[hit] / distances[hit, None]) @ rotation.T
+            velocities = pool.velocities[hit]
+            approach = np.sum(velocities * normals, axis=1)
+            towards = approach < 0
+            velocities[towards] -= ((1 + self.restitution) * approach[towards])[:, None] * normals[towards]
+            pool.velocities[hit] = velocities
+            self.bounces += int(np.count_nonzero(towards))
+        self.steps += 1
+        self.particles += n
+        self.seconds += time.perf_counter() - start
+        return np.clip(1.0 - distances / self.glow_radius, 0.0, 1.0)
+
+    def report(self):
+        steps = max(self.steps, 1)
+        return (f"curve proximity: {len(self.grid.segments)} cell entries for {len(self.grid.starts)} segments, "
+                f"{self.rebuilds} rebuilds, {self.bounces} bounces, "
+                f"{self.particles / steps:.0f} particles in {1000 * self.seconds / steps:.3f} ms per step")
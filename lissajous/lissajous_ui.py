@@ -0,0 +1,214 @@
+from abc import ABC, abstractmethod
+import pygame
+
+# Shared widgets for the Lissajous apps.
+#
+# A WidgetPanel owns the sliders and buttons of one control area. Mouse events
+# are routed with a coarse grid lookup instead of testing every widget, each
+# widget keeps its rendered surface until its state changes, and drawing the
+# panel only redraws changed widgets and returns the screen regions to update.
+
+white = (255, 255, 255)
+black = (0, 0, 0)
+
+label_offset = 25  # Slider labels are drawn this many pixels above the slider
+
+
+# -------------------
+# Widgets
+# -------------------
+class Widget(ABC):
+    def __init__(self, rect):
+        self.rect = pygame.Rect(rect)  # Area that reacts to the mouse
+        self.dirty = True              # Cached surface must be re-rendered
+        self._surface = None
+
+    @property
+    def bounds(self):
+        """Screen area covered by the rendered widget."""
+        return self.rect
+
+    @abstractmethod
+    def render(self, font):
+        """Return the widget drawn on its own surface the size of `bounds`."""
+
+    def surface(self, font):
+        if self.dirty or self._surface is None:
+            self._surface = self.render(font)
+            self.dirty = False
+        return self._surface
+
+
+class Slider(Widget):
+    def __init__(self, x, y, w, h, min_val, max_val, initial, label):
+        super().__init__((x, y, w, h))
+        self.min_val = min_val
+        self.max_val = max_val
+        self.value = initial
+        self.label = label
+        self.handle_radius = h // 4  # 50% of previous size
+        self.dragging = False
+        self.update_handle()
+
+    # Keep the attribute names the apps have always used
+    x = property(lambda self: self.rect.x)
+    y = property(lambda self: self.rect.y)
+    w = property(lambda self: self.rect.w)
+    h = property(lambda self: self.rect.h)
+
+    @property
+    def bounds(self):
+        # Label above the bar, plus room for the handle at both ends
+        return pygame.Rect(self.x - self.handle_radius, self.y - label_offset,
+                           self.w + 2 * self.handle_radius, self.h + label_offset)
+
+    def render(self, font):
+        bounds = self.bounds
+        surf = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        ox, oy = -bounds.x, -bounds.y
+        # Draw the slider line as a red bar 2 pixels high
+        line_y = self.y + self.h // 2 - 1
+        pygame.draw.rect(surf, (255, 0, 0), (self.x + ox, line_y + oy, self.w, 2))
+        # Draw the handle as a yellow circle
+        pygame.draw.circle(surf, (255, 255, 0), (int(self.handle_x) + ox, self.y + self.h // 2 + oy), self.handle_radius)
+        # Draw the label and current value
+        text = font.render(f"{self.label}: {self.value:.2f}", True, white)
+        surf.blit(text, (self.x + ox, self.y - label_offset + oy))
+        return surf
+
+    def update(self, mouse_x):
+        self.handle_x = max(self.x, min(mouse_x, self.x + self.w))
+        ratio = (self.handle_x - self.x) / self.w
+        self.value = self.min_val + ratio * (self.max_val - self.min_val)
+        self.dirty = True
+
+    def update_handle(self):
+        self.handle_x = self.x + (self.value - self.min_val) / (self.max_val - self.min_val) * self.w
+        self.dirty = True
+
+    def set_value(self, value):
+        self.value = value
+        self.update_handle()
+
+    def move(self, x, y, w):
+        # Reposition the slider after a resize, keeping its value
+        self.rect = pygame.Rect(x, y, w, self.h)
+        self.update_handle()
+
+
+class Button(Widget):
+    def __init__(self, x, y, w, h, text):
+        super().__init__((x, y, w, h))
+        self._text = text
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, value):
+        if value != self._text:
+            self._text = value
+            self.dirty = True
+
+    def render(self, font):
+        surf = pygame.Surface(self.rect.size)
+        surf.fill((180, 180, 180))
+        text_surf = font.render(self.text, True, black)
+        surf.blit(text_surf, text_surf.get_rect(center=surf.get_rect().center))
+        return surf
+
+    def is_clicked(self, pos):
+        return self.rect.collidepoint(pos)
+
+    def move(self, x, y, w, h):
+        self.rect = pygame.Rect(x, y, w, h)
+        self.dirty = True
+
+
+# -------------------
+# Panel: ownership, event dispatch and cached drawing
+# -------------------
+class WidgetPanel:
+    def __init__(self, font, area, background=black, cell_size=64):
+        self.font = font
+        self.area = pygame.Rect(area)  # Control area owned by the panel
+        self.background = background
+        self.cell_size = cell_size
+        self.widgets = []
+        self.grid = {}                 # (cell_x, cell_y) -> widgets overlapping that cell
+        self.active = None             # Slider currently being dragged
+        self.needs_clear = True
+
+    def add(self, *widgets):
+        self.widgets.extend(widgets)
+        self.reindex()
+        return widgets[0] if len(widgets) == 1 else widgets
+
+    def reindex(self):
+        """Rebuild the hit-test grid; call after widgets have moved."""
+        self.grid = {}
+        cs = self.cell_size
+        for widget in self.widgets:
+            r = widget.rect
+            for cx in range(r.left // cs, (r.right - 1) // cs + 1):
+                for cy in range(r.top // cs, (r.bottom - 1) // cs + 1):
+                    self.grid.setdefault((cx, cy), []).append(widget)
+
+    def relayout(self, area):
+        """Take a new control area after a resize and redraw everything on the next draw."""
+        self.area = pygame.Rect(area)
+        self.reindex()
+        for widget in self.widgets:
+            widget.dirty = True
+        self.needs_clear = True
+
+    def widget_at(self, pos):
+        cell = (pos[0] // self.cell_size, pos[1] // self.cell_size)
+        for widget in self.grid.get(cell, ()):
+            if widget.rect.collidepoint(pos):
+                return widget
+        return None
+
+    def handle_event(self, event):
+        """Route a mouse event to the widgets.
+
+        Returns the button that was clicked or the slider whose value changed,
+        otherwise None.
+        """
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            widget = self.widget_at(event.pos)
+            if isinstance(widget, Slider):
+                widget.dragging = True
+                self.active = widget
+                return None
+            return widget
+        if event.type == pygame.MOUSEBUTTONUP:
+            if self.active is not None:
+                self.active.dragging = False
+                self.active = None
+        elif event.type == pygame.MOUSEMOTION:
+            if self.active is not None:
+                self.active.update(event.pos[0])
+                return self.active
+        return None
+
+    def draw(self, screen):
+        """Draw the widgets that changed and return the list of updated screen rects."""
+        full_redraw = self.needs_clear
+        if full_redraw:
+            screen.fill(self.background, self.area)
+            self.needs_clear = False
+        rects = [self.area] if full_redraw else []
+        for widget in self.widgets:
+            bounds = widget.bounds
+            # Widgets reaching outside the panel (slider labels) overlap content
+            # the app redraws every frame, so their cached surface is re-blitted
+            overlaps = not self.area.contains(bounds)
+            if full_redraw or widget.dirty or overlaps:
+                if widget.dirty and not full_redraw:
+                    screen.fill(self.background, bounds.clip(self.area))
+                screen.blit(widget.surface(self.font), bounds)
+                if not full_redraw:
+                    rects.append(bounds)
+        return rects
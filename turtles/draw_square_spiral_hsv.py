@@ -1,26 +1,24 @@
 import turtle
-import colorsys
+from polyspiral import SPIRALS, draw_spiral
 
 def draw_color_spiral():
     t = turtle.Turtle()
     screen = turtle.Screen()
     screen.bgcolor('black')
     turtle.colormode(255)
-    t.speed(15)
-    t.width(2)
+    screen.tracer(0)
     
     total_iterations = 255 * 2  # 510 iterations total
-    for i in range(total_iterations):
-        # Map i to a hue value between 0 and 1.
-        hue = i / total_iterations
-        # Convert the HSV color (with full saturation and value) to RGB.
-        r, g, b = colorsys.hsv_to_rgb(hue, 1, 1)
-        # Scale the values to 0-255.
-        r, g, b = int(r * 255), int(g * 255), int(b * 255)
-        
-        t.pencolor(r, g, b)
-        t.forward(50 + i)
-        t.right(91)
+    # forward(50 + i), right(91), with the hue i / total_iterations at full
+    # saturation and value; all moves and colors are computed at once
+    segments, colors, width = SPIRALS["hsv"](total_iterations)
+    draw_spiral(screen, segments, colors, width)
+    
+    t.penup()
+    t.goto(*segments[-1, 2:])
+    t.setheading(-91 * total_iterations)
+    t.pencolor(*colors[-1].tolist())
+    screen.update()
     
     screen.mainloop()
 
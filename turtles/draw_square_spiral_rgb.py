@@ -1,4 +1,5 @@
 import turtle
+from polyspiral import SPIRALS, draw_spiral
 
 def draw_color_spiral():
     """
@@ -6,6 +7,7 @@ def draw_color_spiral():
     
     The spiral increases in length on each iteration and rotates by 91°,
     while the pen color cycles through a range of colors.
+    All 510 segments and their colors are computed at once (see polyspiral.py).
     """
     # Create a turtle object and screen, then set up the screen.
     t = turtle.Turtle()
@@ -15,32 +17,21 @@ def draw_color_spiral():
     # Set the color mode to 255 to allow RGB values between 0-255.
     turtle.colormode(255)
     
-    # Set drawing speed.
-    t.speed(15)
+    # Draw everything in one screen update.
+    screen.tracer(0)
     
-    # Initialize color values: starting with red.
-    r, g, b = 255, 0, 0
+    # 510 moves: forward(50 + i), right(91). The color ramps from red through
+    # yellow, green, cyan, blue and magenta back to red and is set after each
+    # move, so the first line is drawn in the default black.
+    segments, colors, width = SPIRALS["rgb"](255 * 2)
+    draw_spiral(screen, segments, colors, width)
     
-    # Draw a spiral with 510 iterations.
-    for i in range(255 * 2):
-        # Adjust color based on the current iteration.
-        if i < 255 // 3:
-            g += 3
-        elif i < (255 * 2) // 3:
-            r -= 3
-        elif i < 255:
-            b += 3
-        elif i < (255 * 4) // 3:
-            g -= 3
-        elif i < (255 * 5) // 3:
-            r += 3
-        else:
-            b -= 3
-        
-        # Draw the spiral pattern: move forward with increasing length and turn.
-        t.forward(50 + i)
-        t.right(91)
-        t.pencolor(r, g, b)
+    # Leave the turtle where the walk ends.
+    t.penup()
+    t.goto(*segments[-1, 2:])
+    t.setheading(-91 * 255 * 2)
+    t.pencolor(255, 0, 0)
+    screen.update()
     
     # Keep the window open until manually closed.
     screen.mainloop()
@@ -1,4 +1,5 @@
 import turtle
+from polyspiral import SPIRALS, draw_spiral
 
 def draw_pattern(t):
     """
@@ -6,19 +7,21 @@ def draw_pattern(t):
     
     The turtle draws lines of increasing length while rotating by 121° each iteration,
     using a cycle of three colors for a dynamic visual effect.
+    The 300 lines and their colors are computed at once (see polyspiral.py).
     """
-    # Define the tuple of colors to cycle through.
-    colors = ('white', 'pink', 'cyan')
+    screen = t.getscreen()
+    screen.tracer(0)
     
-    # Set the pen width and speed.
-    t.width(2)
-    t.speed(15)
+    # 300 line segments: forward(i * 4), right(121), in white, pink and cyan.
+    segments, colors, width = SPIRALS["triangles"](300)
+    draw_spiral(screen, segments, colors, width)
     
-    # Draw 300 line segments, changing color and angle each time.
-    for i in range(300):
-        t.pencolor(colors[i % len(colors)])
-        t.forward(i * 4)
-        t.right(121)
+    # Leave the turtle where the walk ends.
+    t.penup()
+    t.goto(*segments[-1, 2:])
+    t.setheading(-121 * 300)
+    t.pencolor('cyan')
+    screen.update()
 
 def main():
     # Set up the screen with a black background.
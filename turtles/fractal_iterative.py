@@ -0,0 +1,221 @@
+import math
+import time
+from fractal_lod import FRACTALS, FixedDepth, LodStats, ScreenLod, star, tree
+from turtle_geometry import SegmentPen
+
+# Iterative versions of the recursive fractals.
+#
+# Each recursion becomes a loop over an explicit stack of small
+# (state, length, level[, step]) tuples. A tuple stands for a suspended call
+# and its state says where the call resumes: for the tree, ENTER draws the
+# trunk and descends into the left branch, SECOND turns and descends into the
+# right branch, and RETURN walks back down the trunk. Every pop does all the
+# pen work up to the next recursive call, so there is one small tuple per
+# pending call instead of a Python frame, and the depth is not limited by the
+# interpreter's recursion limit.
+#
+# The engines record into a SegmentPen (draw the result with
+# turtle_geometry.draw_segments). They keep the pen position and heading in
+# local variables (taken with SegmentPen.state and handed back with
+# SegmentPen.restore) and use the same arithmetic as SegmentPen.forward, so with
+# the same stop rule the segments, fills and statistics are identical to the
+# recursive versions of fractal_lod.
+#
+# Run this file to check them against the recursive versions and to time both
+# at increasing depths.
+
+ENTER, SECOND, RETURN = range(3)
+
+
+def tree_iterative(pen, length, rule, stats, ratio=3/4, angle=30):
+    """fractal_lod.tree on a SegmentPen."""
+    x, y, heading, down, fill, fill_start = pen.state()
+    segments, cos, sin, radians, stop = pen.segments, math.cos, math.sin, math.radians, rule.stop
+    drawn = culled = 0
+    deepest = stats.deepest
+    stack = [(ENTER, length, 0)]
+    pop, push = stack.pop, stack.append
+    while stack:
+        state, l, level = pop()
+        if state == ENTER:
+            if stop(l, level):
+                culled += 1
+                continue
+            drawn += 1
+            if level + 1 > deepest:
+                deepest = level + 1
+            a = radians(heading)
+            x1, y1 = x + l * cos(a), y + l * sin(a)
+            if down:
+                segments.append((x, y, x1, y1))
+            x, y = x1, y1
+            if fill is not None:
+                fill.append((x, y))
+            heading = (heading + angle) % 360
+            push((SECOND, l, level))
+            push((ENTER, l * ratio, level + 1))
+        elif state == SECOND:
+            heading = (heading + -2 * angle) % 360
+            push((RETURN, l, level))
+            push((ENTER, l * ratio, level + 1))
+        else:
+            heading = (heading + angle) % 360
+            # Back down the trunk with the pen up
+            a = radians(heading)
+            x, y = x + -l * cos(a), y + -l * sin(a)
+            if fill is not None:
+                fill.append((x, y))
+            down = True
+    pen.restore((x, y, heading, down, fill, fill_start))
+    stats.drawn += drawn
+    stats.culled += culled
+    stats.deepest = deepest
+
+
+def star_iterative(pen, size, rule, stats):
+    """fractal_lod.star on a SegmentPen; `arm` counts the arms of a suspended star."""
+    x, y, heading, down, fill, fill_start = pen.state()
+    segments, fills, fill_styles, fill_color = pen.segments, pen.fills, pen.fill_styles, pen.fillcolor()
+    cos, sin, radians, stop = math.cos, math.sin, math.radians, rule.stop
+    drawn = culled = 0
+    deepest = stats.deepest
+    stack = [(ENTER, size, 0, 0)]
+    pop, push = stack.pop, stack.append
+    while stack:
+        state, s, level, arm = pop()
+        if state == ENTER:
+            if stop(s, level):
+                culled += 1
+                continue
+            if level + 1 > deepest:
+                deepest = level + 1
+            if fill is None:
+                fill_start = len(segments)
+            fill = [(x, y)]
+        else:
+            # Back from the star at the tip of the arm
+            heading = (heading + 216) % 360
+            arm += 1
+            if arm == 5:
+                if fill is not None and len(fill) > 2:
+                    fills.append(fill)
+                    fill_styles.append((fill_start, fill_color))
+                fill = None
+                continue
+        a = radians(heading)
+        x1, y1 = x + s * cos(a), y + s * sin(a)
+        if down:
+            segments.append((x, y, x1, y1))
+        x, y = x1, y1
+        if fill is not None:
+            fill.append((x, y))
+        drawn += 1
+        push((RETURN, s, level, arm))
+        push((ENTER, s / 3, level + 1, 0))
+    pen.restore((x, y, heading, down, fill, fill_start))
+    stats.drawn += drawn
+    stats.culled += culled
+    stats.deepest = deepest
+
+
+KOCH_TURNS = (60, -120, 60)
+
+
+def koch_side_iterative(pen, length, rule, stats):
+    """fractal_lod.koch_side on a SegmentPen; `part` counts the finished thirds of a suspended side."""
+    x, y, heading, down, fill, fill_start = pen.state()
+    segments, cos, sin, radians, stop = pen.segments, math.cos, math.sin, math.radians, rule.stop
+    drawn = culled = 0
+    deepest = stats.deepest
+    stack = [(ENTER, length, 0, 0)]
+    pop, push = stack.pop, stack.append
+    while stack:
+        state, l, level, part = pop()
+        if state == ENTER:
+            if stop(l / 3.0, level):
+                culled += 1
+                if level > deepest:
+                    deepest = level
+                a = radians(heading)
+                x1, y1 = x + l * cos(a), y + l * sin(a)
+                if down:
+                    segments.append((x, y, x1, y1))
+                x, y = x1, y1
+                if fill is not None:
+                    fill.append((x, y))
+                drawn += 1
+                continue
+            l /= 3.0
+        else:
+            if part == 3:
+                continue
+            heading = (heading + KOCH_TURNS[part]) % 360
+            part += 1
+        push((RETURN, l, level, part))
+        push((ENTER, l, level + 1, 0))
+    pen.restore((x, y, heading, down, fill, fill_start))
+    stats.drawn += drawn
+    stats.culled += culled
+    stats.deepest = deepest
+
+
+def snowflake_iterative(pen, length, rule, stats):
+    for _ in range(3):
+        koch_side_iterative(pen, length, rule, stats)
+        pen.right(120)
+
+
+# name -> (recursive, iterative), with the start sizes and fixed rules of fractal_lod.FRACTALS
+ENGINES = {
+    "tree": (FRACTALS["tree"][0], lambda pen, size, rule, stats: tree_iterative(pen, size, rule, stats, ratio=6/7)),
+    "star": (star, star_iterative),
+    "snowflake": (FRACTALS["snowflake"][0], snowflake_iterative),
+}
+
+
+def _recorded(draw, size, rule):
+    pen = SegmentPen()
+    stats = LodStats()
+    draw(pen, size, rule, stats)
+    return pen, stats
+
+
+def self_check():
+    """The iterative engines must reproduce the recursive segments, fills and statistics exactly."""
+    for name, (recursive, iterative) in ENGINES.items():
+        _, size, fixed = FRACTALS[name]
+        for rule in (fixed, ScreenLod(0.5, 2.0), ScreenLod(3.0, 1.0, max_level=8)):
+            a, a_stats = _recorded(recursive, size, rule)
+            b, b_stats = _recorded(iterative, size, rule)
+            assert a.segments == b.segments, name
+            assert a.fills == b.fills and a.fill_styles == b.fill_styles, name
+            assert vars(a_stats) == vars(b_stats), name
+            assert (a.x, a.y, a.heading, a.down) == (b.x, b.y, b.heading, b.down), name
+    print("self-check passed: iterative segments, fills and stats match the recursive versions")
+
+
+def benchmark():
+    cases = [
+        ("tree", lambda pen, s, r, st: tree(pen, s, r, st, ratio=0.7),
+         lambda pen, s, r, st: tree_iterative(pen, s, r, st, ratio=0.7), 100, (10, 14, 17)),
+        ("star", star, star_iterative, 360, (4, 6, 8)),
+        ("snowflake", FRACTALS["snowflake"][0], snowflake_iterative, 300, (4, 6, 8)),
+    ]
+    for name, recursive, iterative, size, depths in cases:
+        for depth in depths:
+            rule = FixedDepth(max_level=depth)
+            timings = []
+            for draw in (recursive, iterative):
+                best = math.inf
+                for _ in range(3):
+                    start = time.perf_counter()
+                    pen, stats = _recorded(draw, size, rule)
+                    best = min(best, time.perf_counter() - start)
+                timings.append(best)
+            print(f"{name:>9} depth {depth:2}: {stats.drawn:8} segments, "
+                  f"recursive {timings[0]:.3f} s, iterative {timings[1]:.3f} s")
+
+
+if __name__ == "__main__":
+    self_check()
+    benchmark()
@@ -0,0 +1,172 @@
+import argparse
+import turtle
+from turtle_geometry import SegmentPen
+from tk_polylines import PolylineBatcher
+
+# Screen-space level of detail for the recursive fractals.
+#
+# The demos stop their recursion at fixed world-space sizes: `if l < 10` in
+# tree_of_life.py, `size <= 10` in recursion_demo.py and four levels in
+# fractal_snowflakes.py. Zoomed out, most of that work ends up below one
+# pixel; zoomed in, the detail runs out. Here every recursion asks a stop
+# rule instead, and the LOD rule stops as soon as a segment would be shorter
+# than `min_pixels` on screen at the current zoom. The same functions run
+# with the original fixed rules, so both can be compared, and they draw
+# with any turtle-like pen: a real turtle or a SegmentPen.
+#
+# Usage: python fractal_lod.py tree|star|snowflake [--zoom Z] [--min-pixels P] [--stats] [--turtle]
+
+
+class FixedDepth:
+    """The original world-space guards of the demos."""
+
+    def __init__(self, min_length=None, max_level=None, inclusive=False):
+        self.min_length = min_length
+        self.max_level = max_level
+        self.inclusive = inclusive    # `size <= 10` instead of `l < 10`
+
+    def stop(self, length, level):
+        if self.max_level is not None and level >= self.max_level:
+            return True
+        if self.min_length is None:
+            return False
+        return length <= self.min_length if self.inclusive else length < self.min_length
+
+
+class ScreenLod:
+    """Stops when a segment would be shorter than min_pixels on screen."""
+
+    def __init__(self, zoom=1.0, min_pixels=1.0, max_level=16):
+        self.zoom = zoom                  # Screen pixels per world unit
+        self.min_pixels = min_pixels
+        self.max_level = max_level        # Safety net for extreme zooms
+
+    def stop(self, length, level):
+        return length * self.zoom < self.min_pixels or level >= self.max_level
+
+
+class LodStats:
+    def __init__(self):
+        self.drawn = 0     # Segments drawn
+        self.culled = 0    # Recursive calls cut off by the stop rule
+        self.deepest = 0
+
+    def report(self, reference=None):
+        text = f"{self.drawn} segments drawn, {self.culled} branches culled, {self.deepest} levels deep"
+        if reference is not None:
+            text += f" (fixed depth: {reference.drawn} segments, {reference.deepest} levels)"
+        return text
+
+
+def tree(pen, length, rule, stats, ratio=3/4, angle=30, level=0):
+    """The fractal tree of tree_of_life.py."""
+    if rule.stop(length, level):
+        stats.culled += 1
+        return
+    stats.drawn += 1
+    stats.deepest = max(stats.deepest, level + 1)
+    pen.forward(length)
+    pen.left(angle)
+    tree(pen, length * ratio, rule, stats, ratio, angle, level + 1)
+    pen.right(2 * angle)
+    tree(pen, length * ratio, rule, stats, ratio, angle, level + 1)
+    pen.left(angle)
+    pen.penup()
+    pen.backward(length)
+    pen.pendown()
+
+
+def star(pen, size, rule, stats, level=0):
+    """The filled recursive star of recursion_demo.py."""
+    if rule.stop(size, level):
+        stats.culled += 1
+        return
+    stats.deepest = max(stats.deepest, level + 1)
+    pen.begin_fill()
+    for _ in range(5):
+        pen.forward(size)
+        stats.drawn += 1
+        star(pen, size / 3, rule, stats, level + 1)
+        pen.left(216)
+    pen.end_fill()
+
+
+def koch_side(pen, length, rule, stats, level=0):
+    """One side of the Koch snowflake of fractal_snowflakes.py; subdivides while the thirds are large enough."""
+    if rule.stop(length / 3.0, level):
+        stats.culled += 1
+        stats.deepest = max(stats.deepest, level)
+        pen.forward(length)
+        stats.drawn += 1
+        return
+    length /= 3.0
+    koch_side(pen, length, rule, stats, level + 1)
+    pen.left(60)
+    koch_side(pen, length, rule, stats, level + 1)
+    pen.right(120)
+    koch_side(pen, length, rule, stats, level + 1)
+    pen.left(60)
+    koch_side(pen, length, rule, stats, level + 1)
+
+
+def snowflake(pen, length, rule, stats):
+    for _ in range(3):
+        koch_side(pen, length, rule, stats)
+        pen.right(120)
+
+
+# name -> (draw function, start size, the demo's fixed rule)
+FRACTALS = {
+    "tree": (lambda pen, size, rule, stats: tree(pen, size, rule, stats, ratio=6/7), 60, FixedDepth(min_length=10)),
+    "star": (star, 360, FixedDepth(min_length=10, inclusive=True)),
+    "snowflake": (snowflake, 300, FixedDepth(max_level=4)),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recursive fractals with a screen-space level of detail")
+    parser.add_argument("fractal", choices=sorted(FRACTALS))
+    parser.add_argument("--zoom", type=float, default=1.0, help="screen pixels per turtle unit")
+    parser.add_argument("--min-pixels", type=float, default=1.0, help="smallest segment worth drawing, in pixels")
+    parser.add_argument("--size", type=float, help="start size (defaults to the demo's)")
+    parser.add_argument("--stats", action="store_true", help="only count the segments, do not draw")
+    parser.add_argument("--turtle", action="store_true",
+                        help="draw with the turtle itself instead of as coalesced canvas lines")
+    args = parser.parse_args()
+
+    draw, size, fixed = FRACTALS[args.fractal]
+    size = args.size or size
+    lod = ScreenLod(args.zoom, args.min_pixels)
+
+    # The fixed-depth recursion only runs on a recording pen for comparison
+    reference = LodStats()
+    draw(SegmentPen(), size, fixed, reference)
+    stats = LodStats()
+    if args.stats:
+        draw(SegmentPen(), size, lod, stats)
+    else:
+        screen = turtle.Screen()
+        screen.bgcolor("black")
+        # Zoom by shrinking the visible part of the turtle world
+        width, height = screen.window_width() / args.zoom, screen.window_height() / args.zoom
+        screen.setworldcoordinates(-width / 2, -height / 2, width / 2, height / 2)
+        screen.tracer(0)
+        pen = turtle.Turtle() if args.turtle else SegmentPen()
+        if args.turtle:
+            pen.hideturtle()
+        pen.color("red", "green")
+        if args.fractal == "tree":
+            pen.left(90)
+        draw(pen, size, lod, stats)
+        if not args.turtle:
+            lines = PolylineBatcher(screen)
+            lines.add_pen(pen)
+            print(lines.report())
+        screen.update()
+    print(f"{args.fractal} at zoom {args.zoom:g}, {args.min_pixels:g} px: {stats.report(reference)}")
+    if not args.stats:
+        turtle.mainloop()
+
+
+if __name__ == "__main__":
+    main()
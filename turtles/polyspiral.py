@@ -0,0 +1,125 @@
+import argparse
+import numpy as np
+
+# Polyspirals in closed form.
+#
+# The spiral scripts walk a turtle with forward(50 + i) / right(91) or
+# forward(i * 4) / right(121). Move i goes `length + growth * i` units along
+# the heading `heading + turn * i`, so the whole walk is one cumulative sum
+# of complex steps: the vertices are start + cumsum(l_i * exp(1j * a_i)).
+# The headings are reduced modulo 360 in integer-exact arithmetic before the
+# trigonometry, so even millions of segments do not drift. The color
+# sequences of the scripts (the RGB ramp, the HSV rainbow and a cycle of
+# names) are computed as arrays as well.
+#
+# Usage: python polyspiral.py rgb|hsv|triangles [--segments N] [--png FILE --size WxH]
+
+WHITE_PINK_CYAN = ((255, 255, 255), (255, 192, 203), (0, 255, 255))
+
+
+def polyspiral(n, length, growth, turn, start=(0.0, 0.0), heading=0.0):
+    """(n, 4) segments of n moves of length + growth * i, turning left by `turn` degrees after every move."""
+    i = np.arange(n)
+    headings = np.radians((heading + turn * i) % 360)
+    steps = (length + growth * i) * np.exp(1j * headings)
+    points = np.empty(n + 1, dtype=np.complex128)
+    points[0] = complex(*start)
+    np.cumsum(steps, out=points[1:])
+    points[1:] += points[0]
+    return np.column_stack((points[:-1].real, points[:-1].imag, points[1:].real, points[1:].imag))
+
+
+def rgb_ramp(n):
+    """The colors of draw_square_spiral_rgb.py: from red, raise green, lower red, raise blue, then back.
+
+    Each of the six phases takes n / 6 moves; for n = 510 these are the
+    script's steps of 3.
+    """
+    i = np.arange(n)
+    phase = i * 6 // n
+    step = 255 * 6 / n
+    deltas = np.zeros((n, 3))
+    channel = np.array([1, 0, 2, 1, 0, 2])[phase]    # g, r, b, g, r, b
+    sign = np.array([1, -1, 1, -1, 1, -1])[phase]
+    deltas[i, channel] = sign * step
+    return np.clip(np.rint(np.cumsum(deltas, axis=0) + (255, 0, 0)), 0, 255).astype(np.uint8)
+
+
+def hsv_rainbow(n):
+    """The colors of draw_square_spiral_hsv.py: colorsys.hsv_to_rgb(i / n, 1, 1), truncated to 0-255."""
+    h = np.arange(n) / n
+    sector = np.floor(h * 6.0)
+    f = h * 6.0 - sector
+    sector = sector.astype(np.int64) % 6
+    one, zero = np.ones_like(f), np.zeros_like(f)
+    # colorsys with s = v = 1, computing q and t the same way
+    q = 1.0 - f
+    t = 1.0 - (1.0 - f)
+    r = np.choose(sector, [one, q, zero, zero, t, one])
+    g = np.choose(sector, [t, one, one, q, zero, zero])
+    b = np.choose(sector, [zero, zero, t, one, one, q])
+    return (np.stack((r, g, b), axis=-1) * 255).astype(np.uint8)
+
+
+def cycle_colors(n, palette=WHITE_PINK_CYAN):
+    """The colors of draw_triangles.py: the palette repeated move by move."""
+    return np.asarray(palette, dtype=np.uint8)[np.arange(n) % len(palette)]
+
+
+def color_runs(colors):
+    """(start, end, (r, g, b)) for every run of equal consecutive colors."""
+    colors = np.asarray(colors)
+    starts = np.flatnonzero(np.r_[True, np.any(colors[1:] != colors[:-1], axis=1)])
+    ends = np.r_[starts[1:], len(colors)]
+    return [(int(s), int(e), tuple(int(c) for c in colors[s])) for s, e in zip(starts, ends)]
+
+
+def draw_spiral(screen, segments, colors, width=1):
+    """Draw the segments on a turtle screen, one canvas line per run of equal colors."""
+    from tk_polylines import PolylineBatcher
+    lines = PolylineBatcher(screen)
+    scale = screen.colormode() / 255
+    for start, end, color in color_runs(colors):
+        lines.add(segments[start:end], tuple(c * scale for c in color), width)
+    return lines
+
+
+# name -> (segments, colors, pen size) for n moves, as drawn by the scripts (n = 510, 510 and 300)
+SPIRALS = {
+    "rgb": lambda n: (polyspiral(n, 50, 1, -91), np.vstack(([(0, 0, 0)], rgb_ramp(n)[:-1])), 1),
+    "hsv": lambda n: (polyspiral(n, 50, 1, -91), hsv_rainbow(n), 2),
+    "triangles": lambda n: (polyspiral(n, 0, 4, -121), cycle_colors(n), 2),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the spiral patterns in closed form")
+    parser.add_argument("spiral", choices=sorted(SPIRALS))
+    parser.add_argument("--segments", type=int, help="number of moves (defaults to the script's)")
+    parser.add_argument("--png", help="render headless to this PNG instead of opening a window")
+    parser.add_argument("--size", default="960x810", help="PNG size WxH; the spiral is scaled to fit")
+    args = parser.parse_args()
+
+    n = args.segments or (300 if args.spiral == "triangles" else 510)
+    segments, colors, width = SPIRALS[args.spiral](n)
+    if args.png:
+        from raster_backend import RasterCanvas
+        w, h = (int(v) for v in args.size.lower().split("x"))
+        extent = np.abs(segments).max()
+        canvas = RasterCanvas(w, h, "black", zoom=min(1.0, 0.48 * min(w, h) / extent))
+        canvas.draw_lines(segments, colors, width)
+        canvas.save_png(args.png)
+        print(f"{args.png}: {n} segments at {w}x{h}")
+    else:
+        import turtle
+        screen = turtle.Screen()
+        screen.bgcolor("black")
+        screen.tracer(0)
+        lines = draw_spiral(screen, segments, colors, width)
+        screen.update()
+        print(lines.report())
+        screen.mainloop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import time
+import tkinter
+import turtle
+
+# Progressive, time-sliced drawing on a turtle screen.
+#
+# A script that draws in one long loop before mainloop() blocks Tk: the
+# window neither repaints nor reacts to being closed until the loop is done.
+# Here the drawing is split into jobs, generators that do a little work per
+# step and yield how many units (segments, usually) they finished. The
+# renderer runs the steps from the screen's timer for at most `budget_ms`
+# per slice, then updates the screen and hands control back to Tk until the
+# next slice, showing the progress in the window title. Closing the window
+# ends the jobs.
+
+
+class ProgressiveRenderer:
+    """Runs generator drawing jobs in time slices of budget_ms from the turtle screen's timer."""
+
+    def __init__(self, screen, budget_ms=20, pause_ms=1, title=None):
+        self.screen = screen
+        self.budget_ms = budget_ms   # Work per slice; smaller keeps the window more responsive
+        self.pause_ms = pause_ms     # Time left to Tk between slices
+        self.title = title
+        self.jobs = []
+        self.total = 0               # Units of work announced by the jobs
+        self.done = 0
+        self.slices = 0
+        self.started = None
+        self.on_done = None
+
+    def add(self, job, total=0):
+        """Queue a generator that yields the number of units it finished per step."""
+        self.jobs.append(job)
+        self.total += total
+
+    def start(self, on_done=None):
+        """Run the jobs from the timer; on_done(renderer) is called when all have finished."""
+        self.on_done = on_done
+        self.started = time.perf_counter()
+        self.screen.ontimer(self._slice, 0)
+
+    def _slice(self):
+        deadline = time.perf_counter() + self.budget_ms / 1000
+        try:
+            while self.jobs and time.perf_counter() < deadline:
+                try:
+                    self.done += next(self.jobs[0]) or 0
+                except StopIteration:
+                    self.jobs.pop(0)
+            self.slices += 1
+            self.screen.update()
+            if self.title is not None:
+                self.screen.title(f"{self.title} - {self.progress():.0%}" if self.jobs else self.title)
+        except (turtle.Terminator, tkinter.TclError):
+            # The window was closed
+            self.jobs = []
+            return
+        if self.jobs:
+            self.screen.ontimer(self._slice, self.pause_ms)
+        elif self.on_done is not None:
+            self.on_done(self)
+
+    def progress(self):
+        return self.done / self.total if self.total else 0.0
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        return f"{self.done} units in {self.slices} slices of up to {self.budget_ms} ms, {elapsed:.2f} s"
@@ -0,0 +1,602 @@
+import argparse
+import heapq
+import itertools
+import os
+import runpy
+import struct
+import sys
+import types
+import zlib
+import numpy as np
+from turtle_geometry import SegmentPen
+
+# A headless NumPy raster backend for turtle drawings.
+#
+# Segments are rasterized in bulk instead of one canvas item per move: for a
+# chunk of segments every covered pixel is generated at once (a DDA on the
+# integer end points, which picks Bresenham's pixels, widened by a round
+# brush stamp for thick lines). Every pixel keeps the segment drawn last:
+# the segment indices are scattered into a per-pixel owner buffer with
+# np.maximum.at, and the owners' colors are written with one fancy-indexed
+# assignment. With antialias=True thin lines are drawn with Xiaolin Wu's
+# two-pixel coverage and thick lines with a coverage computed from the
+# distance to the segment; the segments covering a pixel are blended over it
+# one after the other in drawing order. Filled shapes are scanline-filled
+# with the even-odd rule, like Tk's canvas polygons, by toggling at every
+# edge crossing and taking the running parity along the rows.
+#
+# The layout follows the Tk canvas of the turtle module: the origin is in the
+# middle of the image, y points up, pen sizes are in pixels, lines have round
+# caps and a fill lies below the lines drawn after its begin_fill.
+#
+# Run a turtle script without a display with
+#   python raster_backend.py [-o heart.png] [--size 960x810] [--antialias] draw_heart.py [script arguments]
+# The script gets a stand-in turtle module that records into SegmentPens;
+# they are rendered and saved when the script is done. Animation, turtle
+# shapes and text are not drawn.
+
+# Tk 8.6 color names (the web colors for green, gray and purple)
+TK_COLORS = {
+    "black": (0, 0, 0), "white": (255, 255, 255), "red": (255, 0, 0),
+    "green": (0, 128, 0), "blue": (0, 0, 255), "yellow": (255, 255, 0),
+    "cyan": (0, 255, 255), "magenta": (255, 0, 255), "orange": (255, 165, 0),
+    "purple": (128, 0, 128), "pink": (255, 192, 203), "brown": (165, 42, 42),
+    "gray": (128, 128, 128), "grey": (128, 128, 128), "gold": (255, 215, 0),
+    "violet": (238, 130, 238), "navy": (0, 0, 128), "lightgreen": (144, 238, 144),
+    "lightblue": (173, 216, 230), "darkgreen": (0, 100, 0), "darkblue": (0, 0, 139),
+    "lime": (0, 255, 0), "turquoise": (64, 224, 208),
+}
+
+PIXELS_PER_CHUNK = 2 ** 22    # Bounds the temporary pixel arrays of one rasterization pass
+
+
+def to_rgb(color, colormode=1.0):
+    """A turtle color (name, '#rrggbb' or an (r, g, b) tuple in colormode units) as 0-255 ints."""
+    if isinstance(color, str):
+        name = color.replace(" ", "").lower()
+        if name.startswith("#") and len(name) in (4, 7):
+            digits = name[1:] if len(name) == 7 else "".join(c * 2 for c in name[1:])
+            return tuple(int(digits[i:i + 2], 16) for i in (0, 2, 4))
+        if name in TK_COLORS:
+            return TK_COLORS[name]
+        raise ValueError(f"unknown color {color!r}")
+    return tuple(int(round(c * 255 / colormode)) for c in color)
+
+
+def write_png(path, image, level=6, band=256):
+    """Write an (h, w, 3) uint8 image (or memmap) as an 8-bit RGB PNG, compressing `band` rows at a time."""
+    height, width = image.shape[:2]
+    compressor = zlib.compressobj(level)
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(_png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        for start in range(0, height, band):
+            block = image[start:start + band]
+            rows = np.zeros((len(block), 1 + 3 * width), dtype=np.uint8)   # Filter byte 0 (none) per row
+            rows[:, 1:] = block.reshape(len(block), -1)
+            data = compressor.compress(rows.tobytes())
+            if data:
+                f.write(_png_chunk(b"IDAT", data))
+        f.write(_png_chunk(b"IDAT", compressor.flush()))
+        f.write(_png_chunk(b"IEND", b""))
+
+
+def _png_chunk(tag, data):
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+
+def read_png(path):
+    """Read an 8-bit RGB PNG without row filters, as written by write_png, into an (h, w, 3) array."""
+    with open(path, "rb") as f:
+        data = f.read()
+    position, idat = 8, []
+    while position < len(data):
+        length, tag = struct.unpack(">I4s", data[position:position + 8])
+        body = data[position + 8:position + 8 + length]
+        if tag == b"IHDR":
+            width, height, depth, kind, _, _, _ = struct.unpack(">IIBBBBB", body)
+            if (depth, kind) != (8, 2):
+                raise ValueError(f"{path}: only 8-bit RGB PNGs are supported")
+        elif tag == b"IDAT":
+            idat.append(body)
+        position += 12 + length
+    rows = np.frombuffer(zlib.decompress(b"".join(idat)), dtype=np.uint8).reshape(height, 1 + 3 * width)
+    if rows[:, 0].any():
+        raise ValueError(f"{path}: filtered PNG rows are not supported")
+    return rows[:, 1:].reshape(height, width, 3)
+
+
+def _stamp(width):
+    """Pixel offsets of a round brush `width` pixels across."""
+    radius = max(width, 1) / 2
+    shift = 0.5 if round(max(width, 1)) % 2 == 0 else 0.0   # Even brushes are centered on a pixel corner
+    k = int(np.ceil(radius)) + 1
+    dy, dx = np.mgrid[-k:k + 1, -k:k + 1]
+    inside = (dx + shift) ** 2 + (dy + shift) ** 2 <= radius ** 2
+    return dx[inside], dy[inside]
+
+
+def _runs(counts):
+    """For runs of the given lengths: the run of every element and its position in the run."""
+    run = np.repeat(np.arange(len(counts)), counts)
+    step = np.arange(len(run)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return run, step
+
+
+def _dda_pixels(p0, p1):
+    """Columns, rows and segment of every pixel on the segments p0-p1 (pixel coordinates)."""
+    c0, r0 = np.floor(p0).astype(np.int64).T
+    c1, r1 = np.floor(p1).astype(np.int64).T
+    dc, dr = c1 - c0, r1 - r0
+    n = np.maximum(np.abs(dc), np.abs(dr))
+    segment, t = _runs(n + 1)
+    n = np.maximum(n, 1)[segment]
+    # Rounded integer steps along the minor axis, as Bresenham's error term would choose them
+    columns = c0[segment] + (2 * dc[segment] * t + n) // (2 * n)
+    rows = r0[segment] + (2 * dr[segment] * t + n) // (2 * n)
+    return columns, rows, segment
+
+
+def _wu_pixels(p0, p1):
+    """Xiaolin Wu's lines: two pixels per step along the major axis, weighted by coverage."""
+    steep = np.abs(p1[:, 1] - p0[:, 1]) > np.abs(p1[:, 0] - p0[:, 0])
+    u0 = np.where(steep, p0[:, 1], p0[:, 0])
+    v0 = np.where(steep, p0[:, 0], p0[:, 1])
+    u1 = np.where(steep, p1[:, 1], p1[:, 0])
+    v1 = np.where(steep, p1[:, 0], p1[:, 1])
+    flip = u1 < u0
+    u0, u1 = np.where(flip, u1, u0), np.where(flip, u0, u1)
+    v0, v1 = np.where(flip, v1, v0), np.where(flip, v0, v1)
+    du = u1 - u0
+    slope = np.divide(v1 - v0, du, out=np.zeros_like(du), where=du > 0)
+    k0 = np.floor(u0).astype(np.int64)
+    segment, t = _runs(np.floor(u1).astype(np.int64) - k0 + 1)
+    major = k0[segment] + t
+    v = v0[segment] + slope[segment] * (major + 0.5 - u0[segment]) - 0.5
+    minor = np.floor(v).astype(np.int64)
+    coverage = v - minor
+    # Both pixels of a step stay next to each other so that the segment order is kept
+    major = np.repeat(major, 2)
+    minor = np.stack((minor, minor + 1), axis=1).ravel()
+    alpha = np.stack((1 - coverage, coverage), axis=1).ravel()
+    segment = np.repeat(segment, 2)
+    steep = steep[segment]
+    return np.where(steep, minor, major), np.where(steep, major, minor), segment, alpha
+
+
+class RasterCanvas:
+    """An RGB image addressed in turtle coordinates."""
+
+    def __init__(self, width=960, height=810, background="white", zoom=1.0, center=(0.0, 0.0),
+                 antialias=False, colormode=1.0, origin=None):
+        self.width, self.height = width, height
+        self.zoom = np.broadcast_to(np.asarray(zoom, dtype=np.float64), (2,))   # Pixels per turtle unit in x and y
+        self.center = np.asarray(center, dtype=np.float64)   # Turtle point shown at `origin`
+        # Pixel position of `center`; a tile of a larger image moves it
+        self.origin = np.array([width / 2, height / 2] if origin is None else origin, dtype=np.float64)
+        self.antialias = antialias
+        self.colormode = colormode
+        self.image = np.empty((height, width, 3), dtype=np.uint8)
+        self.image[:] = to_rgb(background, colormode)
+        self._owner = self._entry = None   # Per-pixel scratch buffers of _paint
+
+    def to_pixels(self, points):
+        """Turtle coordinates (..., 2) to pixel coordinates, y pointing down."""
+        pixels = (np.asarray(points, dtype=np.float64) - self.center) * self.zoom
+        pixels[..., 1] *= -1
+        return pixels + self.origin
+
+    def draw_lines(self, segments, colors, widths=1):
+        """Draw (n, 4) segments with per-segment (n, 3) uint8 colors (or one color) and pen sizes."""
+        segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+        if len(segments) == 0:
+            return
+        points = self.to_pixels(segments.reshape(-1, 2, 2))
+        self.draw_pixel_lines(points[:, 0], points[:, 1], colors, widths)
+
+    def draw_pixel_lines(self, p0, p1, colors, widths=1):
+        """draw_lines for (n, 2) start and end points given in pixel coordinates."""
+        if len(p0) == 0:
+            return
+        if isinstance(colors, np.ndarray) and colors.ndim == 2:
+            colors = colors.astype(np.uint8)
+        else:
+            colors = np.array([to_rgb(colors, self.colormode)], dtype=np.uint8)[[0] * len(p0)]
+        widths = np.broadcast_to(np.asarray(widths, dtype=np.float64), (len(p0),))
+        # Chunks of whole segments, small enough for the temporary pixel arrays
+        pixels = np.cumsum((np.abs(p1 - p0).max(axis=1) + 1) * (widths + 2) ** 2)
+        start = 0
+        while start < len(p0):
+            before = pixels[start - 1] if start else 0.0
+            end = max(int(np.searchsorted(pixels, before + PIXELS_PER_CHUNK, side="right")), start + 1)
+            self._draw_chunk(p0[start:end], p1[start:end], colors[start:end], widths[start:end])
+            start = end
+
+    def draw_batches(self, batches):
+        """Draw (segments, color, width) batches as recorded by SegmentPen.batches."""
+        for segments, color, width in batches:
+            self.draw_lines(segments, color, width)
+
+    def _draw_chunk(self, p0, p1, colors, widths):
+        columns, rows, segments, alphas = [], [], [], []
+        for width in np.unique(widths):
+            chosen = np.flatnonzero(widths == width)
+            if self.antialias and width <= 1:
+                c, r, s, a = _wu_pixels(p0[chosen], p1[chosen])
+            else:
+                c, r, s = _dda_pixels(p0[chosen], p1[chosen])
+                dx, dy = _stamp(width + 2 if self.antialias else width)
+                c = (c[:, None] + dx).ravel()
+                r = (r[:, None] + dy).ravel()
+                s = np.repeat(s, len(dx))
+                if self.antialias:
+                    a = self._coverage(c, r, p0[chosen][s], p1[chosen][s], width)
+                else:
+                    a = np.ones(len(c))
+            columns.append(c)
+            rows.append(r)
+            segments.append(chosen[s])
+            alphas.append(a)
+        self._paint(np.concatenate(columns), np.concatenate(rows), np.concatenate(segments),
+                    np.concatenate(alphas), colors)
+
+    @staticmethod
+    def _coverage(columns, rows, p0, p1, width):
+        """Coverage of pixels by a round-capped line `width` pixels wide, from the distance of their centers."""
+        centers = np.stack((columns + 0.5, rows + 0.5), axis=1)
+        d = p1 - p0
+        dd = (d ** 2).sum(axis=1)
+        t = np.clip(np.divide(((centers - p0) * d).sum(axis=1), dd, out=np.zeros_like(dd), where=dd > 0), 0, 1)
+        distance = np.hypot(*(centers - p0 - t[:, None] * d).T)
+        return np.clip(width / 2 + 0.5 - distance, 0, 1)
+
+    def _paint(self, columns, rows, segments, alphas, colors):
+        keep = (columns >= 0) & (columns < self.width) & (rows >= 0) & (rows < self.height) & (alphas > 0)
+        pixels = rows[keep] * self.width + columns[keep]
+        if len(pixels) == 0:
+            return
+        segments, alphas = segments[keep], alphas[keep]
+        if self.antialias:
+            self._blend(pixels, segments, alphas, colors)
+            return
+        if self._owner is None:
+            self._owner = np.full(self.width * self.height, -1, dtype=np.int64)
+            self._entry = np.empty(self.width * self.height, dtype=np.int64)
+        # Within a pixel the last segment (in drawing order) decides the color
+        np.maximum.at(self._owner, pixels, segments)
+        # One entry per pixel: whichever entry's index ends up in the scratch buffer
+        entries = np.arange(len(pixels))
+        self._entry[pixels] = entries
+        pixels = pixels[self._entry[pixels] == entries]
+        self.image.reshape(-1, 3)[pixels] = colors[self._owner[pixels]]
+        self._owner[pixels] = -1
+
+    def _blend(self, pixels, segments, alphas, colors):
+        # A segment covers a pixel with its strongest coverage, and the segments
+        # covering a pixel are blended over it one after the other in drawing
+        # order, so the result does not depend on how the segments are chunked
+        order = np.lexsort((segments, pixels))
+        pixels, segments, alphas = pixels[order], segments[order], alphas[order]
+        first = np.flatnonzero(np.r_[True, (pixels[1:] != pixels[:-1]) | (segments[1:] != segments[:-1])])
+        pixels, segments, alphas = pixels[first], segments[first], np.maximum.reduceat(alphas, first)
+        # Layer k holds the k-th segment of every pixel
+        new_pixel = np.r_[True, pixels[1:] != pixels[:-1]]
+        index = np.arange(len(pixels))
+        layer = index - np.maximum.accumulate(np.where(new_pixel, index, 0))
+        slot = np.cumsum(new_pixel) - 1
+        image = self.image.reshape(-1, 3)
+        unique = pixels[new_pixel]
+        value = image[unique].astype(np.float64)
+        by_layer = np.argsort(layer, kind="stable")
+        bounds = np.cumsum(np.bincount(layer))
+        for entries in np.split(by_layer, bounds[:-1]):
+            target = slot[entries]
+            value[target] += (colors[segments[entries]] - value[target]) * alphas[entries, None]
+        image[unique] = np.rint(value).astype(np.uint8)
+
+    def fill_polygon(self, vertices, color):
+        """Fill a closed polygon with the even-odd rule; pixels whose centers are inside are filled."""
+        points = self.to_pixels(np.asarray(vertices, dtype=np.float64).reshape(-1, 2))
+        xa, ya = points.T
+        xb, yb = np.roll(xa, -1), np.roll(ya, -1)
+        # Rows whose pixel centers lie in [min(ya, yb), max(ya, yb)) cross the edge
+        first = np.maximum(np.ceil(np.minimum(ya, yb) - 0.5), 0).astype(np.int64)
+        last = np.minimum(np.ceil(np.maximum(ya, yb) - 0.5) - 1, self.height - 1).astype(np.int64)
+        counts = np.maximum(last - first + 1, 0)
+        if counts.sum() == 0:
+            return
+        edge, step = _runs(counts)
+        row = first[edge] + step
+        x = xa[edge] + (row + 0.5 - ya[edge]) * (xb - xa)[edge] / (yb - ya)[edge]
+        column = np.clip(np.ceil(x - 0.5), 0, self.width).astype(np.int64)
+        # Toggle at every crossing; the running parity along a row is the inside
+        top, bottom = row.min(), row.max() + 1
+        left, right = column.min(), column.max() + 1
+        span = right - left
+        toggles = np.bincount((row - top) * span + (column - left), minlength=(bottom - top) * span)
+        inside = np.cumsum(toggles.reshape(bottom - top, span), axis=1) % 2 == 1
+        right = min(right, self.width)
+        self.image[top:bottom, left:right][inside[:, :right - left]] = to_rgb(color, self.colormode)
+
+    def draw_pen(self, pen):
+        """Draw everything a SegmentPen recorded, stacking the fills between the lines like Tk."""
+        segments = pen.array()
+        ends = [first for first, _, _ in pen.styles[1:]] + [len(segments)]
+        colors = np.zeros((len(segments), 3))
+        widths = np.ones(len(segments))
+        for (first, color, width), end in zip(pen.styles, ends):
+            colors[first:end] = to_rgb(color, self.colormode)
+            widths[first:end] = width
+        drawn = 0
+        for polygon, (start, color) in zip(pen.fills, pen.fill_styles):
+            if start > drawn:
+                self.draw_lines(segments[drawn:start], colors[drawn:start], widths[drawn:start])
+                drawn = start
+            self.fill_polygon(polygon, color)
+        self.draw_lines(segments[drawn:], colors[drawn:], widths[drawn:])
+
+    def save_png(self, path):
+        write_png(path, self.image)
+
+
+class HeadlessTurtle(SegmentPen):
+    """A turtle.Turtle stand-in that records into a SegmentPen.
+
+    SegmentPen keeps `heading` and `down` as attributes, so the turtle methods
+    of the same names are not available.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        HeadlessScreen.instance().turtles.append(self)
+
+    fd = SegmentPen.forward
+    bk = back = SegmentPen.backward
+    lt = SegmentPen.left
+    rt = SegmentPen.right
+    pu = up = SegmentPen.penup
+    pd = SegmentPen.pendown
+    setpos = setposition = SegmentPen.goto
+    seth = SegmentPen.setheading
+
+    def position(self):
+        return self.x, self.y
+
+    pos = position
+
+    def xcor(self):
+        return self.x
+
+    def ycor(self):
+        return self.y
+
+    def setx(self, x):
+        self.goto(x, self.y)
+
+    def sety(self, y):
+        self.goto(self.x, y)
+
+    def home(self):
+        self.goto(0.0, 0.0)
+        self.heading = 0.0
+
+    def isdown(self):
+        return self.down
+
+    def filling(self):
+        return self._fill is not None
+
+    def getscreen(self):
+        return HeadlessScreen.instance()
+
+    def _ignored(self, *args, **kwargs):
+        pass
+
+    speed = shape = hideturtle = ht = showturtle = st = stamp = write = shapesize = _ignored
+
+
+class HeadlessCanvas:
+    """The Tk canvas calls of tk_polylines.PolylineBatcher, recorded into a SegmentPen."""
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.pen = SegmentPen()
+        screen.turtles.append(self.pen)
+        self.items = 0
+
+    def _points(self, coords):
+        return (np.asarray(coords, dtype=np.float64).reshape(-1, 2) / (self.screen.xscale, -self.screen.yscale)).tolist()
+
+    def create_line(self, coords, fill="black", width=1, **options):
+        points = self._points(coords)
+        self.pen.pencolor(fill)
+        self.pen.pensize(width)
+        self.pen.segments.extend((*a, *b) for a, b in zip(points[:-1], points[1:]))
+        self.pen.x, self.pen.y = points[-1]
+        self.items += 1
+        return self.items
+
+    def create_polygon(self, coords, fill="black", **options):
+        points = self._points(coords)
+        self.pen.fillcolor(fill)
+        self.pen.x, self.pen.y = points[0]
+        # A polygon item has no outline (outline=""), so it is traced with the pen up
+        self.pen.penup()
+        self.pen.begin_fill()
+        for point in points[1:]:
+            self.pen.goto(point)
+        self.pen.end_fill()
+        self.pen.pendown()
+        self.items += 1
+        return self.items
+
+    def delete(self, item):
+        pass
+
+
+class HeadlessScreen:
+    """A turtle.Screen stand-in; callbacks from ontimer run once the script is done."""
+
+    _instance = None
+    screen_size = (1920, 1080)   # The screen the default turtle window is a part of
+
+    def __init__(self):
+        self.turtles = []
+        self.width, self.height = int(0.5 * self.screen_size[0]), int(0.75 * self.screen_size[1])
+        self.background = "white"
+        self.mode = 1.0
+        self.world = None
+        self.timers = []
+        self.timer_ids = itertools.count()
+        self.now = 0     # Milliseconds of simulated time, advanced by the timers
+        self.tracing = 1
+        self.xscale = self.yscale = 1.0
+        self._canvas = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def bgcolor(self, *color):
+        if not color:
+            return self.background
+        self.background = color[0] if len(color) == 1 else color
+
+    def colormode(self, mode=None):
+        if mode is None:
+            return self.mode
+        self.mode = float(mode)
+
+    def setup(self, width=0.5, height=0.75, startx=None, starty=None):
+        self.width = int(width * self.screen_size[0]) if width <= 1 else int(width)
+        self.height = int(height * self.screen_size[1]) if height <= 1 else int(height)
+
+    def window_width(self):
+        return self.width
+
+    def window_height(self):
+        return self.height
+
+    def setworldcoordinates(self, llx, lly, urx, ury):
+        self.world = (llx, lly, urx, ury)
+
+    def tracer(self, n=None, delay=None):
+        if n is None:
+            return self.tracing
+        self.tracing = n
+
+    def ontimer(self, fun, t=0):
+        heapq.heappush(self.timers, (self.now + t, next(self.timer_ids), fun))
+
+    def run_timers(self):
+        """Run the ontimer callbacks in order of their due time, without waiting."""
+        while self.timers:
+            self.now, _, fun = heapq.heappop(self.timers)
+            fun()
+
+    def render(self, antialias=False):
+        """A RasterCanvas of the window with everything the turtles recorded drawn on it."""
+        zoom, center = 1.0, (0.0, 0.0)
+        if self.world is not None:
+            llx, lly, urx, ury = self.world
+            zoom = (self.width / (urx - llx), self.height / (ury - lly))
+            center = ((llx + urx) / 2, (lly + ury) / 2)
+        canvas = RasterCanvas(self.width, self.height, self.background, zoom, center, antialias, self.mode)
+        for pen in self.turtles:
+            canvas.draw_pen(pen)
+        return canvas
+
+    def getcanvas(self):
+        if self._canvas is None:
+            self._canvas = HeadlessCanvas(self)
+        return self._canvas
+
+    def getturtle(self):
+        if not self.turtles:
+            HeadlessTurtle()
+        return self.turtles[0]
+
+    def _ignored(self, *args, **kwargs):
+        pass
+
+    title = update = mainloop = done = exitonclick = bye = delay = listen = _ignored
+    onclick = onscreenclick = onkey = onkeypress = onkeyrelease = screensize = _ignored
+
+
+TURTLE_FUNCTIONS = ("forward", "fd", "backward", "back", "bk", "left", "lt", "right", "rt", "penup",
+                    "pu", "up", "pendown", "pd", "goto", "setpos", "setposition", "setx", "sety",
+                    "setheading", "seth", "home", "circle", "begin_fill", "end_fill", "filling", "color",
+                    "pencolor", "fillcolor", "pensize", "width", "speed", "shape", "hideturtle", "ht",
+                    "showturtle", "st", "position", "pos", "xcor", "ycor", "isdown", "stamp", "write")
+SCREEN_FUNCTIONS = ("bgcolor", "getcanvas", "colormode", "setup", "window_width", "window_height",
+                    "setworldcoordinates", "tracer", "ontimer", "title", "update", "mainloop", "done",
+                    "exitonclick", "bye", "delay", "listen", "onclick", "onscreenclick", "onkey",
+                    "onkeypress", "onkeyrelease", "screensize")
+
+
+class Terminator(Exception):
+    pass
+
+
+def headless_turtle_module():
+    """A module that can stand in for `turtle`, including its module-level functions."""
+    module = types.ModuleType("turtle")
+    module.Terminator = Terminator
+    module.Turtle = module.Pen = module.RawTurtle = HeadlessTurtle
+    module.Screen = module.getscreen = HeadlessScreen.instance
+    module.getturtle = lambda: HeadlessScreen.instance().getturtle()
+    for name in TURTLE_FUNCTIONS:
+        setattr(module, name, lambda *args, _name=name, **kwargs:
+                getattr(HeadlessScreen.instance().getturtle(), _name)(*args, **kwargs))
+    for name in SCREEN_FUNCTIONS:
+        setattr(module, name, getattr(HeadlessScreen.instance(), name))
+    module.__all__ = ["Turtle", "Pen", "RawTurtle", "Screen", "getscreen", "getturtle",
+                      *TURTLE_FUNCTIONS, *SCREEN_FUNCTIONS]
+    return module
+
+
+def render_script(path, antialias=False, size=None, argv=()):
+    """Run a turtle script (with command line arguments `argv`) headless and return the RasterCanvas of its drawing."""
+    HeadlessScreen._instance = None
+    screen = HeadlessScreen.instance()
+    if size is not None:
+        screen.width, screen.height = size
+    real_turtle = sys.modules.get("turtle")
+    sys.modules["turtle"] = headless_turtle_module()
+    sys.path.insert(0, os.path.dirname(os.path.abspath(path)))
+    real_argv, sys.argv = sys.argv, [path, *argv]
+    try:
+        runpy.run_path(path, run_name="__main__")
+        screen.run_timers()
+    finally:
+        sys.argv = real_argv
+        sys.path.pop(0)
+        if real_turtle is None:
+            del sys.modules["turtle"]
+        else:
+            sys.modules["turtle"] = real_turtle
+    return screen.render(antialias)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a turtle script to a PNG without a display")
+    parser.add_argument("script")
+    parser.add_argument("script_args", nargs=argparse.REMAINDER, help="arguments passed on to the script")
+    parser.add_argument("-o", "--output", help="PNG file (defaults to the script name with .png)")
+    parser.add_argument("--size", help="window size WxH in pixels (defaults to turtle's 50%% x 75%% of 1920x1080)")
+    parser.add_argument("--antialias", action="store_true", help="antialiased lines (Tk draws them aliased)")
+    args = parser.parse_args()
+
+    size = tuple(int(v) for v in args.size.lower().split("x")) if args.size else None
+    output = args.output or os.path.splitext(os.path.basename(args.script))[0] + ".png"
+    canvas = render_script(args.script, args.antialias, size, args.script_args)
+    canvas.save_png(output)
+    lines = sum(len(pen.segments) for pen in HeadlessScreen.instance().turtles)
+    fills = sum(len(pen.fills) for pen in HeadlessScreen.instance().turtles)
+    print(f"{output}: {canvas.width}x{canvas.height}, {lines} segments, {fills} fills")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+import argparse
+import json
+import struct
+import time
+import numpy as np
+from raster_backend import to_rgb
+from turtle_geometry import SegmentPen
+
+# A memory-mapped segment store for very large fractals.
+#
+# A Koch curve has 4^n segments and a tree 2^n; as Python lists of tuples a
+# few tens of millions already fill the memory. A segment store keeps them
+# on disk as fixed-size records, four float32 end point coordinates and a
+# uint8 style index (17 bytes per segment), after a header that describes
+# the generator:
+#
+#   magic "TSEG", version (uint16), flags (uint16), segment count (uint64),
+#   bounds x_min, y_min, x_max, y_max (4 float64), JSON length (uint32),
+#   JSON {"generator", "params", "palette", "widths"}, zero padding to a
+#   multiple of 64 bytes, then the records.
+#
+# A SegmentWriter appends chunks as they are generated and fills in the
+# count and the bounds when it is closed, so a generator never holds more
+# than one chunk. A SegmentStore maps the records with np.memmap; readers
+# walk them chunk by chunk or index them, and only the pages touched are
+# read from disk.
+#
+# The snowflake is generated in closed form: the base-4 digits of a
+# segment's index say which quarter of which third it lies in, so both its
+# heading and its start point are sums over the digits, with no running
+# position that could drift. Trees and the other engines of
+# fractal_iterative record into a SegmentPen whose segment list is spooled
+# to the writer.
+#
+# Usage: python segment_store.py snowflake [--level 12] [-o snowflake.tseg]
+#        python segment_store.py tree [--depth 24] [-o tree.tseg]
+#        python segment_store.py info FILE
+# Render a store with tiled_render.py FILE.
+
+MAGIC = b"TSEG"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQ4dI")
+ALIGN = 64
+RECORD = np.dtype([("x0", "<f4"), ("y0", "<f4"), ("x1", "<f4"), ("y1", "<f4"), ("style", "u1")])
+
+# Unit steps at multiples of 60 degrees, the only headings of the snowflake
+SIXTHS = np.exp(1j * np.radians(60 * np.arange(6)))
+# Turns of the four quarters of a Koch side, in sixths, relative to the side
+KOCH_SIXTHS = np.array([0, 1, -1, 0])
+# Indexed by 4 * turn + quarter for a side turned by 0 to 5 sixths: where the
+# quarter starts, in thirds of the side, and the turn of the quarter
+KOCH_PREFIX = (SIXTHS[:, None] * np.concatenate(([0], np.cumsum(SIXTHS[KOCH_SIXTHS % 6])[:3]))).ravel()
+KOCH_TURN = ((np.arange(6)[:, None] + KOCH_SIXTHS) % 6).astype(np.uint8).ravel()
+
+
+class SegmentWriter:
+    """Writes segments to a store file chunk by chunk; use it as a context manager.
+
+    `palette` holds the colors the style indices refer to, `widths` the pen
+    size per style (1 for all by default).
+    """
+
+    def __init__(self, path, palette=("black",), widths=None, generator=None, params=None):
+        if len(palette) > 256:
+            raise ValueError("a segment store has at most 256 styles")
+        self.path = path
+        self.palette = [[int(c) for c in to_rgb(color)] for color in palette]
+        self.widths = [float(w) for w in (widths if widths is not None else [1] * len(palette))]
+        self.count = 0
+        self.low = np.full(2, np.inf)
+        self.high = np.full(2, -np.inf)
+        self.pens = []
+        info = json.dumps({"generator": generator, "params": params or {},
+                           "palette": self.palette, "widths": self.widths}).encode()
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0.0, 0.0, 0.0, 0.0, len(info)) + info)
+        self.file.write(bytes(-(HEADER.size + len(info)) % ALIGN))
+
+    def write(self, segments, styles=0):
+        """Append (n, 4) segments with one style index or one per segment."""
+        segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+        if len(segments) == 0:
+            return
+        records = np.empty(len(segments), dtype=RECORD)
+        for k, name in enumerate(("x0", "y0", "x1", "y1")):
+            records[name] = segments[:, k]
+        records["style"] = styles
+        points = segments.reshape(-1, 2)
+        self.low = np.minimum(self.low, points.min(axis=0))
+        self.high = np.maximum(self.high, points.max(axis=0))
+        self.file.write(records.tobytes())
+        self.count += len(segments)
+
+    def pen(self, x=0.0, y=0.0, heading=0.0, style=0, chunk=1 << 16):
+        """A SegmentPen whose segments go to the store in chunks of `chunk`, all in one style.
+
+        The pen's segment list only ever holds the last unwritten chunk.
+        """
+        pen = SegmentPen(x, y, heading)
+        pen.segments = _Spool(lambda segments: self.write(segments, style), chunk)
+        self.pens.append(pen)
+        return pen
+
+    def close(self):
+        if self.file.closed:
+            return
+        for pen in self.pens:
+            pen.segments.flush()
+        low, high = (self.low, self.high) if self.count else (np.zeros(2), np.zeros(2))
+        self.file.seek(struct.calcsize("<4sHH"))
+        self.file.write(struct.pack("<Q4d", self.count, *low, *high))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _Spool(list):
+    """A segment list that hands itself to `write` and empties whenever it holds `size` segments."""
+
+    def __init__(self, write, size):
+        super().__init__()
+        self.write = write
+        self.size = size
+
+    def append(self, segment):
+        list.append(self, segment)
+        if len(self) >= self.size:
+            self.flush()
+
+    def flush(self):
+        if self:
+            self.write(self)
+            self.clear()
+
+
+class SegmentStore:
+    """A store file opened read-only; `records` is an np.memmap of RECORD."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, _, count, *bounds, size = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a segment store")
+            if version > VERSION:
+                raise ValueError(f"{path}: store version {version} is newer than this reader")
+            info = json.loads(f.read(size))
+        self.count = count
+        self.low, self.high = np.array(bounds[:2]), np.array(bounds[2:])
+        self.generator = info["generator"]
+        self.params = info["params"]
+        self.palette = np.array(info["palette"], dtype=np.uint8).reshape(-1, 3)
+        self.widths = np.array(info["widths"], dtype=np.float64)
+        offset = HEADER.size + size
+        offset += -offset % ALIGN
+        # np.memmap cannot map zero records
+        self.records = (np.memmap(path, RECORD, "r", offset, (count,)) if count
+                        else np.zeros(0, dtype=RECORD))
+
+    def __len__(self):
+        return self.count
+
+    def segments(self, records):
+        """Records (a slice or fancy index of `records`) as (n, 4) float64 segments."""
+        return np.column_stack([records[name].astype(np.float64) for name in ("x0", "y0", "x1", "y1")])
+
+    def chunks(self, size=1 << 20):
+        """(first index, records) for consecutive chunks of at most `size` records."""
+        for start in range(0, self.count, size):
+            yield start, self.records[start:start + size]
+
+    def describe(self):
+        return (f"{self.path}: {self.count} segments from {self.generator} {self.params}, "
+                f"{len(self.palette)} styles, bounds {self.low.tolist()} to {self.high.tolist()}")
+
+
+def snowflake_chunks(level, length=300.0, start=(-150.0, 0.0), chunk=1 << 20):
+    """The snowflake of fractal_snowflakes.py, 3 * 4**level segments, as (n, 4) arrays of at most `chunk`.
+
+    Same segments as fractal_iterative.snowflake_iterative with
+    FixedDepth(max_level=level), up to rounding.
+    """
+    per_side = 4 ** level
+    corner = complex(*start) + length * np.concatenate(([0], np.cumsum(SIXTHS[[0, 4]])))
+    weights = length / 3.0 ** np.arange(1, level + 1)
+    for first in range(0, 3 * per_side, chunk):
+        index = np.arange(first, min(first + chunk, 3 * per_side), dtype=np.int64)
+        side, rest = np.divmod(index, per_side)
+        turn = (-2 * side % 6).astype(np.uint8)       # Right 120 degrees after every side
+        points = corner[side]
+        for k in range(level):
+            key = turn << 2 | (rest >> 2 * (level - 1 - k) & 3).astype(np.uint8)
+            points += (weights[k] * KOCH_PREFIX).take(key)
+            turn = KOCH_TURN.take(key)
+        ends = points + length / 3.0 ** level * SIXTHS[turn]
+        yield np.column_stack((points.real, points.imag, ends.real, ends.imag))
+
+
+def write_snowflake(path, level, length=300.0, color="red"):
+    with SegmentWriter(path, [color], generator="snowflake", params={"level": level, "length": length}) as store:
+        for segments in snowflake_chunks(level, length):
+            store.write(segments)
+    return store.count
+
+
+def write_tree(path, depth, length=100.0, ratio=0.7, angle=30, color="green"):
+    """A tree of 2**depth - 1 branches drawn by fractal_iterative.tree_iterative, growing up."""
+    from fractal_iterative import tree_iterative
+    from fractal_lod import FixedDepth, LodStats
+    params = {"depth": depth, "length": length, "ratio": ratio, "angle": angle}
+    with SegmentWriter(path, [color], generator="tree", params=params) as store:
+        pen = store.pen(0.0, 0.0, 90.0)
+        tree_iterative(pen, length, FixedDepth(max_level=depth), LodStats(), ratio, angle)
+    return store.count
+
+
+def self_check():
+    """The closed-form snowflake must match the turtle engine; a written store must read back."""
+    import os
+    import tempfile
+    from fractal_iterative import snowflake_iterative, tree_iterative
+    from fractal_lod import FixedDepth, LodStats
+    for level in range(6):
+        pen = SegmentPen(-150.0, 0.0)
+        snowflake_iterative(pen, 300.0, FixedDepth(max_level=level), LodStats())
+        closed = np.concatenate(list(snowflake_chunks(level, chunk=100)))
+        assert np.allclose(closed, pen.array(), rtol=0, atol=1e-9), level
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "check.tseg")
+        count = write_tree(path, 12)
+        pen = SegmentPen(0.0, 0.0, 90.0)
+        tree_iterative(pen, 100.0, FixedDepth(max_level=12), LodStats(), 0.7, 30)
+        store = SegmentStore(path)
+        assert count == len(store) == len(pen.segments) == 2 ** 12 - 1
+        assert np.array_equal(store.segments(store.records), pen.array().astype(np.float32))
+        assert store.generator == "tree" and store.params["depth"] == 12
+        assert np.allclose(store.low, pen.array().reshape(-1, 2).min(axis=0))
+        del store
+    print("self-check passed: closed-form snowflake matches the turtle engine, stores read back")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate fractals into memory-mapped segment stores")
+    commands = parser.add_subparsers(dest="command", required=True)
+    flake = commands.add_parser("snowflake", help="Koch snowflake in closed form")
+    flake.add_argument("--level", type=int, default=12, help="subdivisions (3 * 4**level segments)")
+    flake.add_argument("-o", "--output", default="snowflake.tseg")
+    grow = commands.add_parser("tree", help="binary tree of fractal_iterative")
+    grow.add_argument("--depth", type=int, default=24, help="levels (2**depth - 1 branches)")
+    grow.add_argument("-o", "--output", default="tree.tseg")
+    info = commands.add_parser("info", help="describe a store")
+    info.add_argument("path")
+    commands.add_parser("check", help="compare with the turtle engines")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        print(SegmentStore(args.path).describe())
+        return
+    if args.command == "check":
+        self_check()
+        return
+    start = time.perf_counter()
+    if args.command == "snowflake":
+        count = write_snowflake(args.output, args.level)
+    else:
+        count = write_tree(args.output, args.depth)
+    elapsed = time.perf_counter() - start
+    print(f"{args.output}: {count} segments, {count * RECORD.itemsize / 2 ** 20:.1f} MiB "
+          f"in {elapsed:.2f} s ({count / max(elapsed, 1e-9) / 1e6:.1f} M segments/s)")
+
+
+if __name__ == "__main__":
+    main()
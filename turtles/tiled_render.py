@@ -0,0 +1,283 @@
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+import numpy as np
+from raster_backend import RasterCanvas, read_png, to_rgb, write_png
+
+# Tiled, multi-process rasterization for poster-size renders.
+#
+# The poster is cut into square tiles. Every segment is binned into the
+# tiles its pixel bounding box (widened by the pen) overlaps, giving a
+# compressed index: the segments sorted by tile, in drawing order within a
+# tile, and the start of every tile's run. A pool of worker processes
+# rasterizes one tile at a time with the raster backend and writes it into
+# the output image, a memory-mapped file shared by all workers, so a worker
+# only ever holds one tile. The segment end points are converted to poster
+# pixels once, and a tile only shifts them by its integer corner, so every
+# tile picks exactly the pixels a single full-size render would: there are
+# no seams. The PNG is then compressed from the memory map band by band.
+# Aliased tiles match a full render exactly; antialiased coverage is
+# computed in floating point from shifted coordinates and can round one
+# color level differently in a few pixels.
+#
+# A segment store (segment_store.py) is rendered without loading it: it is
+# binned chunk by chunk into an on-disk order, and the workers map the store
+# and read only their tiles' segments.
+#
+# Usage: python tiled_render.py snowflake|tree_of_life|STORE.tseg [--size 16384] [--tile 1024]
+#                                [--workers N] [--level 7] [--antialias] [-o poster.png] [--check]
+
+
+def fit_transform(low, high, width, height, margin=0.05):
+    """(center, zoom) that scale and center the turtle box low..high into a width x height image."""
+    low, high = np.asarray(low, dtype=np.float64), np.asarray(high, dtype=np.float64)
+    zoom = (1 - 2 * margin) * min(width / max(high[0] - low[0], 1e-9), height / max(high[1] - low[1], 1e-9))
+    return (low + high) / 2, zoom
+
+
+def to_poster(points, center, zoom, width, height):
+    """Turtle points (..., 2) to poster pixels, y pointing down."""
+    pixels = (np.asarray(points, dtype=np.float64) - center) * zoom
+    pixels[..., 1] *= -1
+    return pixels + (width / 2, height / 2)
+
+
+def fit_pixels(segments, width, height, margin=0.05):
+    """Scale and center (n, 4) turtle segments into a width x height image; returns (n, 2, 2) pixel points."""
+    points = np.asarray(segments, dtype=np.float64).reshape(-1, 2, 2)
+    center, zoom = fit_transform(points.reshape(-1, 2).min(axis=0), points.reshape(-1, 2).max(axis=0),
+                                 width, height, margin)
+    return to_poster(points, center, zoom, width, height)
+
+
+def _tile_keys(points, widths, tile, columns, rows):
+    """(segment, tile) pairs for every tile the segments' widened pixel boxes overlap, segment by segment."""
+    pad = widths / 2 + 2
+    low = np.floor((points.min(axis=1) - pad[:, None]) / tile).astype(np.int64)
+    high = np.floor((points.max(axis=1) + pad[:, None]) / tile).astype(np.int64)
+    low = np.clip(low, 0, (columns - 1, rows - 1))
+    high = np.clip(high, 0, (columns - 1, rows - 1))
+    span = high - low + 1
+    inside = (points.max(axis=1) + pad[:, None] >= 0).all(axis=1) & \
+             (points.min(axis=1) - pad[:, None] < (columns * tile, rows * tile)).all(axis=1)
+    counts = np.where(inside, span[:, 0] * span[:, 1], 0)
+    segment = np.repeat(np.arange(len(points)), counts)
+    k = np.arange(len(segment)) - np.repeat(np.cumsum(counts) - counts, counts)
+    tile_x = low[segment, 0] + k % span[segment, 0]
+    tile_y = low[segment, 1] + k // span[segment, 0]
+    return segment, tile_y * columns + tile_x
+
+
+def bin_segments(points, widths, tile, columns, rows):
+    """Segments per tile as (order, starts): tile k draws order[starts[k]:starts[k + 1]]."""
+    segment, key = _tile_keys(points, widths, tile, columns, rows)
+    sort = np.argsort(key, kind="stable")      # Stable: drawing order within every tile
+    starts = np.concatenate(([0], np.cumsum(np.bincount(key, minlength=columns * rows))))
+    return segment[sort], starts
+
+
+def bin_store(store, center, zoom, width, height, tile, order_path, chunk=1 << 20):
+    """bin_segments for a SegmentStore, in two passes over its chunks; the order is written to order_path.
+
+    The first pass counts the segments of every tile, the second puts each
+    chunk's segments at the next free places of their tiles, so the order
+    array is filled in drawing order without ever being held in memory.
+    Returns (order memmap, starts).
+    """
+    columns, rows = -(-width // tile), -(-height // tile)
+
+    def chunk_keys(first, records):
+        points = to_poster(store.segments(records).reshape(-1, 2, 2), center, zoom, width, height)
+        segment, key = _tile_keys(points, store.widths[records["style"]], tile, columns, rows)
+        return segment + first, key
+
+    counts = np.zeros(columns * rows, dtype=np.int64)
+    for first, records in store.chunks(chunk):
+        counts += np.bincount(chunk_keys(first, records)[1], minlength=columns * rows)
+    starts = np.concatenate(([0], np.cumsum(counts)))
+    order = np.lib.format.open_memmap(order_path, mode="w+", dtype=np.int64, shape=(max(int(starts[-1]), 1),))
+    free = starts[:-1].copy()
+    for first, records in store.chunks(chunk):
+        segment, key = chunk_keys(first, records)
+        sort = np.argsort(key, kind="stable")
+        segment, key = segment[sort], key[sort]
+        # Rank of every pair within its tile in this chunk
+        tiles, begin, size = np.unique(key, return_index=True, return_counts=True)
+        rank = np.arange(len(key)) - np.repeat(begin, size)
+        order[free[key] + rank] = segment
+        free[tiles] += size
+    order.flush()
+    return order, starts
+
+
+# State of a worker process, loaded once by _start_worker
+_worker = {}
+
+
+def _start_worker(folder, settings):
+    _worker.update(settings)
+    names = ("order", "starts") if "store" in settings else ("points", "colors", "widths", "order", "starts")
+    for name in names:
+        _worker[name] = np.load(os.path.join(folder, name + ".npy"), mmap_mode="r")
+    if "store" in settings:
+        from segment_store import SegmentStore
+        _worker["segment_store"] = SegmentStore(settings["store"])
+    _worker["image"] = np.load(os.path.join(folder, "image.npy"), mmap_mode="r+")
+
+
+def _tile_segments(chosen):
+    """Pixel points, colors and widths of the chosen segments in the worker."""
+    w = _worker
+    if "segment_store" not in w:
+        return w["points"][chosen], w["colors"][chosen], w["widths"][chosen]
+    store = w["segment_store"]
+    records = store.records[chosen]
+    points = to_poster(store.segments(records).reshape(-1, 2, 2), w["center"], w["zoom"], w["width"], w["height"])
+    return points, store.palette[records["style"]], store.widths[records["style"]]
+
+
+def _render_tile(index):
+    w = _worker
+    columns, tile = w["columns"], w["tile"]
+    row0, col0 = index // columns * tile, index % columns * tile
+    height, width = min(tile, w["height"] - row0), min(tile, w["width"] - col0)
+    chosen = np.asarray(w["order"][w["starts"][index]:w["starts"][index + 1]])
+    canvas = RasterCanvas(width, height, w["background"], antialias=w["antialias"])
+    points, colors, widths = _tile_segments(chosen)
+    # Shifting by the integer tile corner keeps the pixel choice of the full image
+    points = points - (col0, row0)
+    canvas.draw_pixel_lines(points[:, 0], points[:, 1], colors, widths)
+    w["image"][row0:row0 + height, col0:col0 + width] = canvas.image
+    return index, len(chosen)
+
+
+def render_tiled(points, colors, widths, width, height, output, tile=1024, workers=None,
+                 background="black", antialias=False, progress=True):
+    """Rasterize (n, 2, 2) pixel segments tile by tile in a process pool and write the PNG `output`.
+
+    Returns the number of (tile, segment) pairs rasterized.
+    """
+    columns, rows = -(-width // tile), -(-height // tile)
+    widths = np.broadcast_to(np.asarray(widths, dtype=np.float64), (len(points),))
+    order, starts = bin_segments(points, widths, tile, columns, rows)
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output))) as folder:
+        for name, array in (("points", points), ("colors", colors), ("widths", widths),
+                            ("order", order), ("starts", starts)):
+            np.save(os.path.join(folder, name + ".npy"), array)
+        settings = {"tile": tile, "columns": columns, "width": width, "height": height,
+                    "background": background, "antialias": antialias}
+        _render_pool(folder, settings, starts, output, workers, progress)
+    return len(order)
+
+
+def render_store(store, width, height, output, tile=1024, workers=None, background="black",
+                 antialias=False, progress=True, margin=0.05):
+    """render_tiled for a SegmentStore, fitted to the poster by its bounds.
+
+    The workers map the store themselves, so no process holds all segments.
+    """
+    center, zoom = fit_transform(store.low, store.high, width, height, margin)
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output))) as folder:
+        order, starts = bin_store(store, center, zoom, width, height, tile, os.path.join(folder, "order.npy"))
+        del order
+        np.save(os.path.join(folder, "starts.npy"), starts)
+        settings = {"tile": tile, "columns": -(-width // tile), "width": width, "height": height,
+                    "background": background, "antialias": antialias,
+                    "store": os.path.abspath(store.path), "center": center, "zoom": zoom}
+        _render_pool(folder, settings, starts, output, workers, progress)
+    return int(starts[-1])
+
+
+def _render_pool(folder, settings, starts, output, workers, progress):
+    width, height, tile = settings["width"], settings["height"], settings["tile"]
+    busy = np.flatnonzero(np.diff(starts))
+    image = np.lib.format.open_memmap(os.path.join(folder, "image.npy"), mode="w+",
+                                      dtype=np.uint8, shape=(height, width, 3))
+    # Tiles without segments stay background
+    for start in range(0, height, tile):
+        image[start:start + tile] = to_rgb(settings["background"])
+    image.flush()
+    del image
+    with multiprocessing.Pool(workers, _start_worker, (folder, settings)) as pool:
+        for finished, _ in enumerate(pool.imap_unordered(_render_tile, busy.tolist()), 1):
+            if progress:
+                print(f"\r{finished}/{len(busy)} tiles", end="", flush=True)
+    if progress:
+        print()
+    image = np.load(os.path.join(folder, "image.npy"), mmap_mode="r")
+    write_png(output, image)
+    del image
+
+
+def snowflake_segments(level):
+    """The Koch snowflake of fractal_snowflakes.py with `level` subdivisions."""
+    from fractal_iterative import snowflake_iterative
+    from fractal_lod import FixedDepth, LodStats
+    from turtle_geometry import SegmentPen
+    pen = SegmentPen(-150.0, 0.0)
+    snowflake_iterative(pen, 300.0, FixedDepth(max_level=level), LodStats())
+    segments = pen.array()
+    return segments, np.array([to_rgb("red")], dtype=np.uint8)[[0] * len(segments)], np.ones(len(segments))
+
+
+def tree_of_life_segments():
+    from tree_of_life import tree_batches
+    batches = tree_batches()
+    segments = np.concatenate([s for s, _, _ in batches])
+    colors = np.concatenate([np.array([to_rgb(c)], dtype=np.uint8)[[0] * len(s)] for s, c, _ in batches])
+    widths = np.concatenate([np.full(len(s), w, dtype=np.float64) for s, _, w in batches])
+    return segments, colors, widths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a fractal poster tile by tile on all cores")
+    parser.add_argument("scene", help="snowflake, tree_of_life or a segment store file (see segment_store.py)")
+    parser.add_argument("--size", type=int, default=16384, help="poster width and height in pixels")
+    parser.add_argument("--tile", type=int, default=1024)
+    parser.add_argument("--workers", type=int, help="worker processes (defaults to the number of cores)")
+    parser.add_argument("--level", type=int, default=7, help="Koch subdivisions of the snowflake")
+    parser.add_argument("--antialias", action="store_true")
+    parser.add_argument("-o", "--output", help="PNG file (defaults to SCENE.png)")
+    parser.add_argument("--check", action="store_true", help="compare with a single full-size render, pixel by pixel")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    output = args.output or os.path.splitext(os.path.basename(args.scene))[0] + ".png"
+    if args.scene not in ("snowflake", "tree_of_life"):
+        from segment_store import SegmentStore
+        store = SegmentStore(args.scene)
+        pairs = render_store(store, args.size, args.size, output, args.tile, args.workers,
+                             antialias=args.antialias)
+        print(f"{output}: {len(store)} segments ({pairs} in tiles) on {args.size}x{args.size}, "
+              f"rendered in {time.perf_counter() - start:.2f} s")
+        if args.check:
+            center, zoom = fit_transform(store.low, store.high, args.size, args.size)
+            points = to_poster(store.segments(store.records).reshape(-1, 2, 2), center, zoom, args.size, args.size)
+            colors, widths = store.palette[store.records["style"]], store.widths[store.records["style"]]
+    else:
+        if args.scene == "snowflake":
+            segments, colors, widths = snowflake_segments(args.level)
+        else:
+            segments, colors, widths = tree_of_life_segments()
+        points = fit_pixels(segments, args.size, args.size)
+        generated = time.perf_counter()
+        pairs = render_tiled(points, colors, widths, args.size, args.size, output, args.tile,
+                             args.workers, antialias=args.antialias)
+        print(f"{output}: {len(segments)} segments ({pairs} in tiles) on {args.size}x{args.size}, "
+              f"generated in {generated - start:.2f} s, rendered in {time.perf_counter() - generated:.2f} s")
+
+    if args.check:
+        canvas = RasterCanvas(args.size, args.size, "black", antialias=args.antialias)
+        canvas.draw_pixel_lines(points[:, 0], points[:, 1], colors, widths)
+        tiled = read_png(output)
+        differ = np.abs(tiled.astype(np.int16) - canvas.image).max(axis=2)
+        if differ.any():
+            print(f"tiled and full render differ in {np.count_nonzero(differ)} pixels, by up to {differ.max()}")
+        else:
+            print("tiled and full render are identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import numpy as np
+
+# Large turtle drawings as few Tk canvas items.
+#
+# A turtle puts its lines into canvas line items of at most 42 points and
+# starts a new item at every pen-up, color or size change, and every move
+# also copies its item list into the undo buffer. A deep tree or a high Koch
+# level therefore leaves tens of thousands of items, and Tk slows down on
+# every redraw. A PolylineBatcher draws recorded segments (a SegmentPen or
+# (segments, color, width) batches) directly on the turtle screen's canvas:
+# consecutive segments of the same color and width that connect become one
+# multi-point line item. When a segment starts at a point the current line
+# has already passed through (a tree going back down to its last fork), the
+# line retraces its own path to that point instead of starting a new item;
+# with round joins the retraced part looks the same. Fills become polygon
+# items stacked between the lines like turtle's.
+
+
+class PolylineBatcher:
+    """Draws recorded segments on a turtle screen as multi-point line items."""
+
+    def __init__(self, screen, max_points=5000, retrace=True):
+        self.screen = screen
+        self.canvas = screen.getcanvas()
+        self.max_points = max_points   # Longer lines are split, so that Tk can still clip them
+        self.retrace = retrace
+        self.items = []
+        self.segments = 0
+        self.fills = 0
+
+    def _color(self, color):
+        if isinstance(color, str):
+            return color
+        scale = 255 / self.screen.colormode()
+        return "#%02x%02x%02x" % tuple(int(round(c * scale)) for c in color)
+
+    def _canvas_points(self, points):
+        return np.asarray(points, dtype=np.float64).reshape(-1, 2) * (self.screen.xscale, -self.screen.yscale)
+
+    def add(self, segments, color, width=1):
+        """Draw (n, 4) segments in one color and width; returns the number of items created."""
+        created = len(self.items)
+        for _ in self.add_steps(segments, color, width, step=None):
+            pass
+        return len(self.items) - created
+
+    def add_steps(self, segments, color, width=1, step=2000):
+        """Like add, but a generator that draws `step` segments at a time and yields how many it drew.
+
+        Every step ends the current line item and the next one continues from
+        its last point, so the drawing shows up step by step.
+        """
+        segments = np.asarray(segments, dtype=np.float64).reshape(-1, 4)
+        if len(segments) == 0:
+            return
+        points = self._canvas_points(segments).reshape(-1, 4)
+        # Points compared after rounding, as the copies of a figure can differ in the last bits
+        keys = np.round(points, 6).tolist()
+        points = points.tolist()
+        options = {"fill": self._color(color), "width": width, "capstyle": "round", "joinstyle": "round"}
+        step = step or len(points)
+        line = []          # Flat x, y list of the current item
+        path = []          # (key, x, y) of the points on the way from the item's start to its end
+        on_path = {}       # Key -> index in path
+        for n, ((x0, y0, x1, y1), (k0, l0, k1, l1)) in enumerate(zip(points, keys), 1):
+            start = (k0, l0)
+            if path and path[-1][0] != start:
+                if self.retrace and start in on_path and len(line) < 2 * self.max_points:
+                    # Walk back along the drawn path to the fork
+                    while path[-1][0] != start:
+                        del on_path[path.pop()[0]]
+                        line.extend(path[-1][1:])
+                else:
+                    path = []
+            if not path or len(line) >= 2 * self.max_points:
+                self._create_line(line, options)
+                line = [x0, y0]
+                path = [(start, x0, y0)]
+                on_path = {start: 0}
+            line.extend((x1, y1))
+            end = (k1, l1)
+            if end in on_path:
+                # The line came back to a point it passed: forget the loop in between
+                for key, _, _ in path[on_path[end] + 1:]:
+                    del on_path[key]
+                del path[on_path[end] + 1:]
+            else:
+                on_path[end] = len(path)
+                path.append((end, x1, y1))
+            if n % step == 0:
+                self._create_line(line, options)
+                line = line[-2:]
+                self.segments += step
+                yield step
+        self._create_line(line, options)
+        if len(points) % step:
+            self.segments += len(points) % step
+            yield len(points) % step
+
+    def _create_line(self, line, options):
+        if len(line) >= 4:
+            self.items.append(self.canvas.create_line(line, **options))
+
+    def fill(self, polygon, color):
+        points = self._canvas_points(polygon).ravel().tolist()
+        self.items.append(self.canvas.create_polygon(points, fill=self._color(color), outline=""))
+        self.fills += 1
+
+    def add_batches(self, batches):
+        for segments, color, width in batches:
+            self.add(segments, color, width)
+
+    def add_pen(self, pen):
+        """Draw everything a SegmentPen recorded, with the fills stacked like turtle's."""
+        segments = pen.array()
+        ends = [first for first, _, _ in pen.styles[1:]] + [len(segments)]
+        drawn = 0
+
+        def lines_until(stop):
+            for (first, color, width), end in zip(pen.styles, ends):
+                first, end = max(first, drawn), min(end, stop)
+                if end > first:
+                    self.add(segments[first:end], color, width)
+
+        for polygon, (start, color) in zip(pen.fills, pen.fill_styles):
+            if start > drawn:
+                lines_until(start)
+                drawn = start
+            self.fill(polygon, color)
+        lines_until(len(segments))
+
+    def clear(self):
+        for item in self.items:
+            self.canvas.delete(item)
+        self.items = []
+        self.segments = self.fills = 0
+
+    def report(self):
+        return (f"{self.segments} segments and {self.fills} fills in {len(self.items)} canvas items "
+                f"(one item per move: {self.segments + self.fills})")
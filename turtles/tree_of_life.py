@@ -1,261 +1,43 @@
 # Developer - Tonumoy Mukherjee
 # Source: https://github.com/Tonumoy/Fractal-Art/blob/master/Tree%20of%20life.py
 
+import sys
 import turtle as tu
-
-
-roo = tu.Turtle() #Turtle object
-wn = tu.Screen() #Screen Object
-wn.bgcolor("black") #Screen Bg color
-wn.title("Fractal Tree Pattern")
-roo.left(90) #moving the turtle 90 degrees towards left
-roo.speed(20)#setting the speed of the turtle
-
-
-def  draw(l): #recursive function taking length 'l' as argument
-    if(l<10):
-        return
-    else:
-
-        roo.pensize(2) #Setting Pensize
-        roo.pencolor("yellow") #Setting Pencolor as yellow
-        roo.forward(l) #moving turtle forward by 'l'
-        roo.left(30) #moving the turtle 30 degrees towards left
-        draw(3*l/4) #drawing a fractal on the left of the turtle object 'roo' with 3/4th of its length
-        roo.right(60) #moving the turtle 60 degrees towards right
-        draw(3*l/4) #drawing a fractal on the right of the turtle object 'roo' with 3/4th of its length
-        roo.left(30) #moving the turtle 30 degrees towards left
-        roo.pensize(2)
-        roo.backward(l) #returning the turtle back to its original psition
-
-draw (20) # drawing 20 times 
-
-roo.right(90)
-roo.speed(2000)
-
-#recursion
-def  draw(l):
-    if(l<10):
-        return
-    else:
-        roo.pensize(2)
-        roo.pencolor("magenta") #magenta
-        roo.forward(l)
-        roo.left(30)
-        draw(3*l/4)
-        roo.right(60)
-        draw(3*l/4)
-        roo.left(30)
-        roo.pensize(2)
-        roo.backward(l)
-
-draw (20)
-
-
-roo.left(270)
-roo.speed(2000)
-
-#recursion
-def  draw(l):
-    if(l<10):
-        return
-    else:
-        roo.pensize(2)
-        roo.pencolor("red") #red
-        roo.forward(l)
-        roo.left(30)
-        draw(3*l/4)
-        roo.right(60)
-        draw(3*l/4)
-        roo.left(30)
-        roo.pensize(2)
-        roo.backward(l)
-
-draw (20)
-
-roo.right(90)
-roo.speed(2000)
-
-#recursion
-def  draw(l):
-    if(l<10):
-        return
-    else:
-        roo.pensize(2)
-        roo.pencolor('#FFF8DC') #white
-        roo.forward(l)
-        roo.left(30)
-        draw(3*l/4)
-        roo.right(60)
-        draw(3*l/4)
-        roo.left(30)
-        roo.pensize(2)
-        roo.backward(l)
-
-draw(20)
-########################################################
-
-def  draw(l):
-    if(l<10):
-        return
-    else:
-
-        roo.pensize(3)
-        roo.pencolor("lightgreen") #lightgreen
-        roo.forward(l)
-        roo.left(30)
-        draw(4*l/5)
-        roo.right(60)
-        draw(4*l/5)
-        roo.left(30)
-        roo.pensize(3)
-        roo.backward(l)
-
-draw (40)
-
-roo.right(90)
-roo.speed(2000)
-
-#recursion
-def  draw(l):
-    if(l<10):
-        return
-    else:
-        roo.pensize(3)
-        roo.pencolor("red") #red
-        roo.forward(l)
-        roo.left(30)
-        draw(4*l/5)
-        roo.right(60)
-        draw(4*l/5)
-        roo.left(30)
-        roo.pensize(3)
-        roo.backward(l)
-
-draw (40)
-
-
-roo.left(270)
-roo.speed(2000)
-
-#recursion
-def  draw(l):
-    if(l<10):
-        return
-    else:
-        roo.pensize(3)
-        roo.pencolor("yellow") #yellow
-        roo.forward(l)
-        roo.left(30)
-        draw(4*l/5)
-        roo.right(60)
-        draw(4*l/5)
-        roo.left(30)
-        roo.pensize(3)
-        roo.backward(l)
-
-draw (40)
-
-roo.right(90)
-roo.speed(2000)
-
-#recursion
-def  draw(l):
-    if(l<10):
-        return
-    else:
-        roo.pensize(3)
-        roo.pencolor('#FFF8DC') #white
-        roo.forward(l)
-        roo.left(30)
-        draw(4*l/5)
-        roo.right(60)
-        draw(4*l/5)
-        roo.left(30)
-        roo.pensize(3)
-        roo.backward(l)
-
-draw (40)
-
-########################################################
-def  draw(l):
-    if(l<10):
-        return
-    else:
-        
-        roo.pensize(2)
-        roo.pencolor("cyan") #cyan
-        roo.forward(l)
-        roo.left(30)
-        draw(6*l/7)
-        roo.right(60)
-        draw(6*l/7)
-        roo.left(30)
-        roo.pensize(2)
-        roo.backward(l)
-        
-draw (60)
-
-roo.right(90)
-roo.speed(2000)
-
-#recursion
-def  draw(l):
-    if(l<10):
-        return
-    else:
-        roo.pensize(2)
-        roo.pencolor("yellow") #yellow
-        roo.forward(l)
-        roo.left(30)
-        draw(6*l/7)
-        roo.right(60)
-        draw(6*l/7)
-        roo.left(30)
-        roo.pensize(2)
-        roo.backward(l)
-        
-draw (60)
-
-
-roo.left(270)
-roo.speed(2000)
-
-#recursion
-def  draw(l):
-    if(l<10):
-        return
-    else:
-        roo.pensize(2)
-        roo.pencolor("magenta") #magenta
-        roo.forward(l)
-        roo.left(30)
-        draw(6*l/7)
-        roo.right(60)
-        draw(6*l/7)
-        roo.left(30)
-        roo.pensize(2)
-        roo.backward(l)
-        
-draw (60)
-
-roo.right(90)
-roo.speed(2000)
-
-#recursion
-def  draw(l):
-    if(l<10):
-        return
-    else:
-        roo.pensize(2)
-        roo.pencolor('#FFF8DC') #white
-        roo.forward(l)
-        roo.left(30)
-        draw(6*l/7)
-        roo.right(60)
-        draw(6*l/7)
-        roo.left(30)
-        roo.pensize(2)
-        roo.backward(l)
-draw(60)
-wn.exitonclick()
+from turtle_geometry import tree_segments, rotate_segments
+from tk_polylines import PolylineBatcher
+from progressive import ProgressiveRenderer
+
+# Every tree is drawn four times, turned by 90 degrees, in its own colors.
+# (branch ratio, start length, pensize, [(heading, color), ...]) in drawing order
+trees = [
+    (3/4, 20, 2, [(90, "yellow"), (0, "magenta"), (270, "red"), (180, '#FFF8DC')]),
+    (4/5, 40, 3, [(180, "lightgreen"), (90, "red"), (0, "yellow"), (270, '#FFF8DC')]),
+    (6/7, 60, 2, [(270, "cyan"), (180, "yellow"), (90, "magenta"), (0, '#FFF8DC')]),
+]
+
+
+def tree_batches():
+    """(segments, color, pensize) of all twelve trees in drawing order."""
+    batches = []
+    for ratio, length, size, copies in trees:
+        segments = tree_segments(length, ratio) # the branches are computed once per tree...
+        for heading, color in copies:
+            batches.append((rotate_segments(segments, heading), color, size)) # ...and rotated for every copy
+    return batches
+
+
+if __name__ == "__main__":
+    # Drawing time per slice in milliseconds: python tree_of_life.py [budget]
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    roo = tu.Turtle() #Turtle object
+    wn = tu.Screen() #Screen Object
+    wn.bgcolor("black") #Screen Bg color
+    wn.title("Fractal Tree Pattern")
+
+    lines = PolylineBatcher(wn) # every tree becomes a few canvas lines that retrace its branches
+    renderer = ProgressiveRenderer(wn, budget, title="Fractal Tree Pattern") # drawn a slice at a time, so the window stays responsive
+    for segments, color, size in tree_batches():
+        renderer.add(lines.add_steps(segments, color, size, step=500), len(segments))
+    renderer.start(lambda renderer: print(lines.report() + "; " + renderer.report()))
+    wn.exitonclick()
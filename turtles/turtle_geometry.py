@@ -0,0 +1,263 @@
+import math
+from collections import OrderedDict
+import numpy as np
+
+# Turtle drawings as arrays of line segments.
+#
+# A SegmentPen understands the usual turtle moves but, instead of drawing,
+# records every line it would draw as (x0, y0, x1, y1). A figure that is
+# drawn several times (like the four rotated trees of tree_of_life.py) only
+# has to be computed once: the copies are the same segment array turned by a
+# rotation matrix. Per copy only the color and pen size change, and all
+# copies are drawn in one batch with the screen updates switched off.
+#
+# The fractal tree is self-similar: a tree of depth k is its trunk plus two
+# copies of the depth k-1 tree, scaled by the branch ratio, turned by +-angle
+# and moved to the tip of the trunk. Trees are therefore built by doubling,
+# each level being two affine transforms of the previous level's array, and
+# the unit trees are cached per (ratio, angle, depth).
+#
+# Pen color and size changes are recorded as styles (the index of the first
+# segment they apply to), and every fill remembers how many segments were
+# drawn when its Tk polygon item would have been created, so a backend can
+# stack lines and fills the way the Tk canvas does.
+
+
+class SegmentPen:
+    """Records the lines a turtle would draw, in turtle coordinates (y up, headings in degrees)."""
+
+    def __init__(self, x=0.0, y=0.0, heading=0.0):
+        self.x, self.y = x, y
+        self.heading = heading
+        self.down = True
+        self.segments = []
+        self.fills = []       # Filled polygons as lists of (x, y) vertices
+        self.fill_styles = [] # (segments drawn before the fill, fill color) per fill
+        self.styles = [(0, "black", 1)]   # (first segment, pen color, pen size)
+        self._fill = None
+        self._fill_start = 0
+        self._fillcolor = "black"
+
+    def forward(self, distance):
+        angle = math.radians(self.heading)
+        x = self.x + distance * math.cos(angle)
+        y = self.y + distance * math.sin(angle)
+        if self.down:
+            self.segments.append((self.x, self.y, x, y))
+        self.x, self.y = x, y
+        if self._fill is not None:
+            self._fill.append((x, y))
+
+    def backward(self, distance):
+        self.forward(-distance)
+
+    def left(self, angle):
+        self.heading = (self.heading + angle) % 360
+
+    def right(self, angle):
+        self.left(-angle)
+
+    def penup(self):
+        self.down = False
+
+    def pendown(self):
+        self.down = True
+
+    def goto(self, x, y=None):
+        if y is None:
+            x, y = x
+        if self.down:
+            self.segments.append((self.x, self.y, x, y))
+        self.x, self.y = x, y
+        if self._fill is not None:
+            self._fill.append((x, y))
+
+    def setheading(self, angle):
+        self.heading = angle % 360
+
+    def circle(self, radius, extent=None, steps=None):
+        """An arc as the same inscribed polygon turtle.circle draws."""
+        if extent is None:
+            extent = 360
+        if steps is None:
+            steps = 1 + int(min(11 + abs(radius) / 6.0, 59.0) * abs(extent) / 360)
+        w = extent / steps
+        w2 = 0.5 * w
+        l = 2.0 * radius * math.sin(math.radians(w2))
+        if radius < 0:
+            l, w, w2 = -l, -w, -w2
+        self.left(w2)
+        for _ in range(steps):
+            self.forward(l)
+            self.left(w)
+        self.left(-w2)
+
+    def begin_fill(self):
+        # Like turtle, a begin_fill inside a fill restarts the polygon in the same canvas item
+        if self._fill is None:
+            self._fill_start = len(self.segments)
+        self._fill = [(self.x, self.y)]
+
+    def end_fill(self):
+        if self._fill is not None and len(self._fill) > 2:
+            self.fills.append(self._fill)
+            self.fill_styles.append((self._fill_start, self._fillcolor))
+        self._fill = None
+
+    def state(self):
+        """The pen state as (x, y, heading, down, fill, fill start) for restore().
+
+        `fill` is the vertex list of the open fill (None outside a fill) and
+        `fill start` the number of segments drawn when it was begun; callers
+        that draw on their own may append vertices to that list.
+        """
+        return self.x, self.y, self.heading, self.down, self._fill, self._fill_start
+
+    def restore(self, state):
+        """Set the pen state from a state() tuple."""
+        self.x, self.y, self.heading, self.down, self._fill, self._fill_start = state
+
+    def pencolor(self, *color):
+        if not color:
+            return self.styles[-1][1]
+        self._set_style(color[0] if len(color) == 1 else color, self.styles[-1][2])
+
+    def fillcolor(self, *color):
+        if not color:
+            return self._fillcolor
+        self._fillcolor = color[0] if len(color) == 1 else color
+
+    def color(self, *colors):
+        if not colors:
+            return self.pencolor(), self.fillcolor()
+        if len(colors) == 3:
+            colors = (colors,)
+        self.pencolor(colors[0])
+        self.fillcolor(colors[-1])
+
+    def pensize(self, width=None):
+        if width is None:
+            return self.styles[-1][2]
+        self._set_style(self.styles[-1][1], width)
+
+    width = pensize
+
+    def _set_style(self, color, width):
+        first = len(self.segments)
+        if self.styles[-1][0] == first:
+            self.styles.pop()
+        if not self.styles or self.styles[-1][1:] != (color, width):
+            self.styles.append((first, color, width))
+
+    def batches(self):
+        """The recorded segments as (segments, color, width) batches, one per pen style."""
+        segments = self.array()
+        ends = [first for first, _, _ in self.styles[1:]] + [len(segments)]
+        return [(segments[first:end], color, width)
+                for (first, color, width), end in zip(self.styles, ends) if end > first]
+
+    def array(self):
+        """The recorded segments as an (n, 4) float array."""
+        return np.array(self.segments, dtype=np.float64).reshape(-1, 4)
+
+
+class TreeCache:
+    """Unit trees (trunk from (0, 0) to (1, 0)) per (ratio, angle, depth).
+
+    Once the cached arrays take more than max_bytes, the least recently used
+    trees are dropped.
+    """
+
+    def __init__(self, max_bytes=256 * 2 ** 20):
+        self.max_bytes = max_bytes
+        self.trees = OrderedDict()
+        self.bytes = 0
+
+    def unit_tree(self, ratio, angle, depth):
+        """(2**depth - 1, 4) segments in pre-order: trunk, left subtree, right subtree."""
+        key = (ratio, angle, depth)
+        if key in self.trees:
+            self.trees.move_to_end(key)
+            return self.trees[key]
+        # Continue from the deepest cached tree of the same shape
+        start = max((d for r, a, d in self.trees if (r, a) == (ratio, angle) and d < depth), default=0)
+        tree = self.trees[(ratio, angle, start)] if start else np.empty((0, 4))
+        c = ratio * math.cos(math.radians(angle))
+        s = ratio * math.sin(math.radians(angle))
+        for _ in range(start, depth):
+            n = len(tree)
+            x, y = tree[:, 0::2], tree[:, 1::2]   # Both end points of every segment
+            cx, sx, cy, sy = c * x, s * x, c * y, s * y
+            doubled = np.empty((2 * n + 1, 4))
+            doubled[0] = (0.0, 0.0, 1.0, 0.0)    # The trunk
+            # Left subtree: turned by +angle, right subtree: by -angle, both moved to (1, 0)
+            doubled[1:n + 1, 0::2] = cx - sy + 1.0
+            doubled[1:n + 1, 1::2] = sx + cy
+            doubled[n + 1:, 0::2] = cx + sy + 1.0
+            doubled[n + 1:, 1::2] = cy - sx
+            tree = doubled
+        self._store(key, tree)
+        return tree
+
+    def _store(self, key, tree):
+        if tree.nbytes > self.max_bytes:
+            return
+        self.trees[key] = tree
+        self.bytes += tree.nbytes
+        while self.bytes > self.max_bytes:
+            _, dropped = self.trees.popitem(last=False)
+            self.bytes -= dropped.nbytes
+
+
+tree_cache = TreeCache()
+
+
+def tree_depth(length, ratio, min_length=10):
+    """Number of branch levels the recursion draws before the length drops below min_length."""
+    depth = 0
+    while length >= min_length:
+        depth += 1
+        length = length * ratio
+    return depth
+
+
+def tree_segments(length, ratio, angle=30, min_length=10):
+    """Segments of the fractal tree of tree_of_life.py, growing from (0, 0) towards heading 0.
+
+    Every branch forks into two branches `ratio` times as long, turned by
+    +-angle, until the length drops below min_length. The segments come in
+    the order the recursive turtle draws them (trunk, left subtree, right
+    subtree); the way back down each branch is not included.
+    """
+    return length * tree_cache.unit_tree(ratio, angle, tree_depth(length, ratio, min_length))
+
+
+def rotate_segments(segments, degrees, origin=(0.0, 0.0)):
+    """Rotate an (n, 4) segment array counterclockwise by `degrees` around `origin`."""
+    c, s = math.cos(math.radians(degrees)), math.sin(math.radians(degrees))
+    rotation = np.array([[c, -s], [s, c]])
+    points = segments.reshape(-1, 2, 2) - origin
+    return (points @ rotation.T + origin).reshape(-1, 4)
+
+
+def draw_segments(pen, screen, batches):
+    """Draw (segments, color, width) batches with a real turtle in a single screen update.
+
+    Connected segments (one starting where the previous one ended) are drawn
+    without lifting the pen.
+    """
+    tracer = screen.tracer()
+    screen.tracer(0)
+    for segments, color, width in batches:
+        pen.pencolor(color)
+        pen.pensize(width)
+        position = None
+        for x0, y0, x1, y1 in segments.tolist():
+            if position != (x0, y0):
+                pen.penup()
+                pen.goto(x0, y0)
+                pen.pendown()
+            pen.goto(x1, y1)
+            position = (x1, y1)
+    screen.update()
+    screen.tracer(tracer)